@@ -21,11 +21,22 @@ Copyright:
     along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+from bio_utils.blast_tools.b6_index import b6_index
+from bio_utils.blast_tools.b6_table import B6Table
+from bio_utils.blast_tools.b6_table import load_b6_table
+from bio_utils.blast_tools.best_hits import best_hits
 from bio_utils.blast_tools.blast_to_cigar import blast_to_cigar
 from bio_utils.blast_tools.filter_b6_evalue import b6_evalue_filter
+from bio_utils.blast_tools.filter_b6_evalue import parallel_b6_evalue_filter
+from bio_utils.blast_tools.merge_b6 import merge_b6
+from bio_utils.blast_tools.reciprocal_best_hits \
+    import reciprocal_best_hits
+from bio_utils.blast_tools.subject_coverage import read_length_table
+from bio_utils.blast_tools.subject_coverage import subject_coverage
+from bio_utils.blast_tools.top_n_hits import top_n_hits
 from bio_utils.blast_tools.retrieve_subject_sequences \
     import subject_sequence_retriever
 from bio_utils.blast_tools.retrieve_query_sequences \
     import query_sequence_retriever
 
-__version__ = '2.1.0'
+__version__ = '2.9.0'
@@ -0,0 +1,109 @@
+#! /usr/bin/env python3
+
+"""Write sidecar indexes of the query and subject IDs of a B6/M8 file
+
+Usage:
+
+    b6_index.py [--subjects] <B6 file>
+
+Copyright:
+
+    b6_index.py index B6/M8 files by query and subject ID
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import argparse
+from bio_utils.file_tools import id_index
+from bio_utils.iterators.b6 import DEFAULT_HEADER
+from bio_utils.iterators.b6 import QUERY_INDEX_SUFFIX
+from bio_utils.iterators.b6 import SUBJECT_INDEX_SUFFIX
+import sys
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.0.1'
+
+
+def b6_index(path, header=DEFAULT_HEADER, subjects=False):
+    """Index the byte ranges of each query, and optionally subject, ID
+
+    The query index is written to path + QUERY_INDEX_SUFFIX and the subject
+    index to path + SUBJECT_INDEX_SUFFIX, where B6Reader reads them to
+    iterate over the entries of given IDs.
+
+    Args:
+        path (str): path of uncompressed B6/M8 file
+
+        header (list): format specifiers of the B6/M8 columns, must include
+            'qaccver', and 'saccver' if subjects is True
+
+        subjects (bool): also index subject IDs
+
+    Returns:
+        tuple: IdIndex of queries and IdIndex of subjects, None if subjects
+            is False
+
+    Raises:
+        ValueError: If header lacks the query or subject format specifier
+
+    Example:
+        Note: These doctests will not pass, examples are only in doctest
+        format as per convention. bio_utils uses pytests for testing.
+
+        >>> b6_index('test.b6')
+        >>> b6_reader = B6Reader(open('test.b6'))
+        >>> for entry in b6_reader.iterate(query='read_123'):
+        ...     print(entry.write())  # Entries of read_123
+    """
+
+    if 'qaccver' not in header:
+        raise ValueError('header lacks the qaccver format specifier')
+    if subjects and 'saccver' not in header:
+        raise ValueError('header lacks the saccver format specifier')
+
+    query_index = id_index(path, path + QUERY_INDEX_SUFFIX,
+                           id_col=header.index('qaccver') + 1)
+    subject_index = id_index(path, path + SUBJECT_INDEX_SUFFIX,
+                             id_col=header.index('saccver') + 1) \
+        if subjects else None
+
+    return query_index, subject_index
+
+
+def main():
+    """Write query and subject indexes of a B6/M8 file"""
+
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.
+                                     RawDescriptionHelpFormatter)
+    parser.add_argument('b6',
+                        help='M8 (B6 in BLAST+) file to index')
+    parser.add_argument('-s', '--subjects',
+                        action='store_true',
+                        help='also index subject IDs')
+    args = parser.parse_args()
+
+    for index in b6_index(args.b6, subjects=args.subjects):
+        if index is not None:
+            index.close()
+
+
+if __name__ == '__main__':
+    main()
+    sys.exit(0)
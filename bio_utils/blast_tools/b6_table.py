@@ -0,0 +1,324 @@
+#! /usr/bin/env python3
+
+"""Load B6/M8 alignments into NumPy columns for vectorized filtering
+
+Copyright:
+
+    b6_table.py columnar table of B6/M8 alignments
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from bio_utils.file_tools.categorical import CategoricalColumn
+from bio_utils.iterators import B6Entry
+from bio_utils.iterators.b6 import FormatError
+from bio_utils.iterators.b6 import _DEFAULT_SPECS
+from bio_utils.iterators.b6 import DEFAULT_HEADER
+from collections import OrderedDict
+from itertools import islice
+import numpy as np
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.1.0'
+
+
+# B6Entry attribute names of default format specifiers
+_ATTRIBUTES = {spec: attr for spec, (attr, _) in _DEFAULT_SPECS.items()}
+
+# Column types of format specifiers, 'category' for repeated IDs and names,
+# specifiers not listed here are stored as str
+SPEC_TYPES = {'qseqid': 'category', 'qgi': 'category', 'qacc': 'category',
+              'qaccver': 'category', 'sseqid': 'category',
+              'sallseqid': 'category', 'sgi': 'category',
+              'sallgi': 'category', 'sacc': 'category',
+              'saccver': 'category', 'sallacc': 'category',
+              'stitle': 'category', 'salltitles': 'category',
+              'staxids': 'category', 'sscinames': 'category',
+              'scomnames': 'category', 'sblastnames': 'category',
+              'sskingdoms': 'category', 'sstrand': 'category',
+              'staxid': np.int32, 'qlen': np.int32, 'slen': np.int32,
+              'length': np.int32, 'mismatch': np.int32, 'gapopen': np.int32,
+              'gaps': np.int32, 'nident': np.int32, 'positive': np.int32,
+              'qstart': np.int32, 'qend': np.int32, 'sstart': np.int32,
+              'send': np.int32, 'qframe': np.int32, 'sframe': np.int32,
+              'score': np.int32, 'qcovs': np.int32, 'qcovhsp': np.int32,
+              'qcovus': np.int32, 'pident': np.float32, 'ppos': np.float32,
+              'bitscore': np.float32, 'evalue': np.float64}
+
+
+class B6Table:
+    """A simple class to store B6/M8 alignments as NumPy columns
+
+    Columns are named by the B6Entry attribute of default format specifiers,
+    e.g. "query" and "evalue", and by the format specifier otherwise, and
+    can be accessed as attributes of the table. Indexing a table with a
+    boolean mask, slice, or array of row numbers returns a new table of the
+    selected rows.
+
+    Attributes:
+        columns (OrderedDict): columns keyed by name in order of the header,
+            CategoricalColumn for IDs and names, numpy.ndarray otherwise.
+            Missing values ("-") are NaN in float columns, the minimum value
+            of the dtype in integer columns, e.g. numpy.iinfo(numpy.int32).min,
+            and None in str columns
+
+        header (list): format specifiers of columns
+    """
+
+    def __init__(self, header=None):
+        """Initialize variables to store B6/M8 columns"""
+
+        self.columns = OrderedDict()
+        self.header = header
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__['columns'][name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __len__(self):
+        for column in self.columns.values():
+            return len(column)
+        return 0
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            key = [key]
+        table = B6Table(self.header)
+        for name, column in self.columns.items():
+            table.columns[name] = column[key]
+        return table
+
+    def best_hits(self, score='bitscore', group='query'):
+        """Return the highest scoring alignment of each query
+
+        Args:
+            score (str): column to rank alignments by, the lowest value ranks
+                highest for 'evalue', ties keep the first alignment
+
+            group (str): categorical column to group alignments by, e.g.
+                'subject' for the best alignment to each subject
+
+        Returns:
+            B6Table: best alignment of each group in order of first
+                appearance of the group
+        """
+
+        values = self.columns[score]
+        if score != 'evalue':
+            values = -values.astype(np.float64)
+        group_codes = self.columns[group].codes
+
+        # Order rows by group, then score, then position in file
+        order = np.lexsort((np.arange(len(values)), values, group_codes))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = group_codes[order[1:]] != group_codes[order[:-1]]
+
+        return self[np.sort(order[first])]
+
+    def hits_per_subject(self):
+        """Return number of alignments to each subject
+
+        Returns:
+            OrderedDict: alignments keyed by subject ID
+        """
+
+        subject = self.columns['subject']
+        counts = np.bincount(subject.codes, minlength=len(subject.categories))
+
+        return OrderedDict((name, count) for name, count in
+                           zip(subject.categories, counts.tolist()) if count)
+
+    def entries(self):
+        """Yield each row as a B6Entry
+
+        Yields:
+            B6Entry: alignment of each row in order
+        """
+
+        names = list(self.columns)
+        fs_order = names
+        custom = [name for name in names
+                  if name not in _ATTRIBUTES.values()]
+        columns = []
+        for column in self.columns.values():
+            if isinstance(column, CategoricalColumn):
+                columns.append(column.tolist())
+            else:
+                if column.dtype == np.float32:  # Shortest float32 repr
+                    values = [float(value) for value in column.astype(str)]
+                else:
+                    values = column.tolist()
+                if column.dtype.kind == 'f':
+                    values = [None if value != value else value
+                              for value in values]
+                elif column.dtype.kind == 'i':
+                    missing = np.iinfo(column.dtype).min
+                    values = [None if value == missing else value
+                              for value in values]
+                columns.append(values)
+
+        for row in zip(*columns):
+            entry = B6Entry()
+            entry.fs_order = fs_order
+            values = dict(zip(names, row))
+            for name in names:
+                if name not in custom:
+                    setattr(entry, name, values[name])
+            if custom:
+                entry.custom_fs = OrderedDict((name, values[name])
+                                              for name in custom)
+            yield entry
+
+
+def _convert_column(values, spec_type):
+    """Convert a column of str values to an array
+
+    Args:
+        values (tuple): str values of column, "-" if missing
+
+        spec_type (type): NumPy dtype of column
+
+    Returns:
+        numpy.ndarray: converted values
+    """
+
+    if '-' in values:
+        if np.dtype(spec_type).kind == 'f':
+            missing = 'nan'
+        else:  # Minimum value, as -1 is a valid frame
+            missing = str(np.iinfo(spec_type).min)
+        values = [missing if value == '-' else value for value in values]
+
+    return np.array(values, dtype=spec_type)
+
+
+def load_b6_table(handle, header=DEFAULT_HEADER, chunk_size=100000):
+    """Load B6/M8 alignments into a table of NumPy columns
+
+    Lines are read and split in chunks, each chunk's columns are converted
+    to arrays at once, and the chunks are joined at the end. Repeated IDs
+    are stored once as categories, so a table uses far less memory than the
+    equivalent B6Entry instances.
+
+    Args:
+        handle (file): B6/M8 file handle, can be any iterator so long as it
+            it returns subsequent "lines" of a B6/M8 file as str or bytes
+
+        header (list): format specifiers of the B6/M8 columns, only the first
+            of duplicate specifiers is loaded
+
+        chunk_size (int): number of lines to convert at a time
+
+    Returns:
+        B6Table: columns of all alignments, comments are skipped
+
+    Raises:
+        FormatError: If a line has fewer columns than header, or a value
+            cannot be converted to the type of its column
+
+    Example:
+        Note: These doctests will not pass, examples are only in doctest
+        format as per convention. bio_utils uses pytests for testing.
+
+        >>> table = load_b6_table(open('test.b6'))
+        >>> good = table[(table.evalue < 1e-10) & (table.identity > 90)]
+        >>> best = good.best_hits()  # Best alignment of each query
+        >>> good.hits_per_subject()  # Alignments to each subject
+        >>> for entry in best.entries():
+        ...     print(entry.write())  # Write alignments back as B6
+    """
+
+    # Store first column of each format specifier
+    columns = OrderedDict()
+    for index, specifier in enumerate(header):
+        if specifier not in columns:
+            columns[specifier] = index
+    min_columns = max(columns.values()) + 1 if columns else 0
+
+    categories = {spec: OrderedDict() for spec in columns
+                  if SPEC_TYPES.get(spec) == 'category'}
+    parts = {spec: [] for spec in columns}
+    lines_read = 0
+
+    handle = iter(handle)
+    while True:
+        chunk = list(islice(handle, chunk_size))
+        if not chunk:  # End of file
+            break
+
+        rows = []
+        for line in chunk:
+            lines_read += 1
+            if isinstance(line, bytes):
+                line = line.decode('utf-8')
+            if line.startswith('#'):
+                continue
+            line = line.rstrip('\r\n')
+            if not line:
+                continue
+            row = line.split('\t')
+            if len(row) < min_columns:
+                raise FormatError('line {0}: the number of columns is less '
+                                  'than the number of specifiers'
+                                  .format(lines_read))
+            rows.append(row)
+
+        if not rows:  # Chunk of comments
+            continue
+
+        # Convert each column of chunk at once
+        fields = list(zip(*rows))
+        for spec, index in columns.items():
+            values = fields[index]
+            spec_type = SPEC_TYPES.get(spec, str)
+            if spec_type == 'category':
+                codes = categories[spec]
+                setdefault = codes.setdefault
+                parts[spec].append(np.array(
+                    [setdefault(value, len(codes)) for value in values],
+                    dtype=np.int32))
+            elif spec_type is str:
+                parts[spec].append(np.array(
+                    [None if value == '-' else value for value in values],
+                    dtype=object))
+            else:
+                try:
+                    parts[spec].append(_convert_column(values, spec_type))
+                except ValueError:
+                    raise FormatError('{0} column contains values that are '
+                                      'not {1}'.format(spec, np.dtype(
+                                          spec_type).name))
+
+    table = B6Table(list(columns))
+    for spec in columns:
+        name = _ATTRIBUTES.get(spec, spec)
+        spec_type = SPEC_TYPES.get(spec, str)
+        if spec_type == 'category':
+            codes = np.concatenate(parts[spec]) if parts[spec] else \
+                np.zeros(0, dtype=np.int32)
+            table.columns[name] = CategoricalColumn(codes,
+                                                    list(categories[spec]))
+        else:
+            dtype = object if spec_type is str else spec_type
+            table.columns[name] = np.concatenate(parts[spec]) \
+                if parts[spec] else np.zeros(0, dtype=dtype)
+
+    return table
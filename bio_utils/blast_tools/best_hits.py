@@ -0,0 +1,148 @@
+#! /usr/bin/env python3
+
+"""Yield the best alignment of each query from B6/M8 entries grouped by query
+
+Copyright:
+
+    best_hits.py stream best alignment of each query
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from bio_utils.iterators import B6Entry
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.1.1'
+
+
+# Scores where the lowest value is best
+LOWER_IS_BETTER = {'evalue'}
+
+
+def score_getter(key):
+    """Return a function giving the score of a B6Entry, higher being better
+
+    Args:
+        key (str): B6Entry attribute, e.g. 'bitscore', or custom format
+            specifier to rank alignments by, see LOWER_IS_BETTER
+
+    Returns:
+        function: takes a B6Entry and returns its score, scores of
+            LOWER_IS_BETTER keys are negated so the highest score is best.
+            Raises ValueError if key is neither an attribute nor a custom
+            format specifier of the entry.
+    """
+
+    sign = -1 if key in LOWER_IS_BETTER else 1
+
+    def get_score(entry):
+        try:
+            value = getattr(entry, key)
+        except AttributeError:
+            if entry.custom_fs is None or key not in entry.custom_fs:
+                raise ValueError('{0} is neither a B6Entry attribute nor a '
+                                 'custom format specifier of the entry'
+                                 .format(key))
+            value = entry.custom_fs[key]
+            if value is not None:
+                value = float(value)
+        if value is None:  # Missing value ranks last
+            return float('-inf')
+        return sign * value
+
+    return get_score
+
+
+def best_hits(entries, key='bitscore', ties='first', check_grouped=False):
+    """Yield best alignment of each query from entries grouped by query
+
+    Only the alignments of the current query are kept, and the best
+    alignments of a query are yielded once the next query begins. BLAST+ and
+    DIAMOND write all alignments of a query together.
+
+    Args:
+        entries (iterable): B6Entry instances, such as from
+            B6Reader.iterate(), in which all alignments of a query are
+            adjacent, comments are skipped
+
+        key (str): B6Entry attribute, e.g. 'bitscore', or custom format
+            specifier to rank alignments by, the lowest E-value is best
+
+        ties (str): 'first' yields only the first of tied best alignments,
+            'all' yields every tied best alignment in input order
+
+        check_grouped (bool): keep the IDs of finished queries to raise
+            ValueError if a query reappears, memory then grows with the
+            number of queries
+
+    Yields:
+        B6Entry: best alignment(s) of each query in input order
+
+    Raises:
+        ValueError: If ties is invalid, or check_grouped is True and the
+            alignments of a query are not adjacent in entries
+
+    Example:
+        Note: These doctests will not pass, examples are only in doctest
+        format as per convention. bio_utils uses pytests for testing.
+
+        >>> b6_reader = B6Reader(open('test.b6'))
+        >>> for entry in best_hits(b6_reader.iterate(), ties='all'):
+        ...     print(entry.write())  # Write best alignment(s) of query
+    """
+
+    if ties not in ('first', 'all'):
+        raise ValueError("ties must be 'first' or 'all', not {0!r}"
+                         .format(ties))
+    keep_ties = ties == 'all'
+    get_score = score_getter(key)
+
+    finished = set() if check_grouped else None  # Queries already yielded
+    query = None
+    best = []
+    best_score = None
+
+    for entry in entries:
+        if not isinstance(entry, B6Entry):  # Comment
+            continue
+
+        if not best or entry.query != query:
+            if best:
+                for hit in best:
+                    yield hit
+                if finished is not None:
+                    finished.add(query)
+            query = entry.query
+            if finished is not None and query in finished:
+                raise ValueError('alignments of query {0} are not adjacent, '
+                                 'entries must be grouped by query'
+                                 .format(query))
+            best = [entry]
+            best_score = get_score(entry)
+            continue
+
+        score = get_score(entry)
+        if score > best_score:
+            best = [entry]
+            best_score = score
+        elif score == best_score and keep_ties:
+            best.append(entry)
+
+    for hit in best:
+        yield hit
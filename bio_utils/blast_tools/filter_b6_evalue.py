@@ -1,13 +1,11 @@
 #! /usr/bin/env python3
 
-from __future__ import print_function
-
 """Writes lines from the B6/M8 file under the given E-value to output
 
 Usage:
 
-    b6_evalue_filter.py --b6 <b6 file> --e_value <max e_value>
-                        --output <output file>
+    filter_b6_evalue.py --b6 <b6 file> --e_value <max e_value>
+                        [--threads <int>] --output <output file>
 
 Copyright:
 
@@ -28,8 +26,19 @@ Copyright:
     along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+from __future__ import print_function
 import argparse
-from bio_utils.iterators import B6Reader
+from bio_utils.file_tools import line_byte_ranges
+from bio_utils.file_tools import ordered_map
+from bio_utils.file_tools import read_byte_range
+from bio_utils.iterators.b6 import compile_row_parser
+from bio_utils.iterators.b6 import DEFAULT_HEADER
+from bio_utils.iterators.b6 import FormatError
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import chain
+from itertools import islice
+import os
 import sys
 
 __author__ = 'William Brazelton, Alex Hyer'
@@ -37,24 +46,48 @@ __email__ = 'theonehyer@gmail.com'
 __license__ = 'GPLv3'
 __maintainer__ = 'Alex Hyer'
 __status__ = 'Production'
-__version__ = '2.0.1'
+__version__ = '2.2.2'
+
+
+# Approximate size of the byte ranges a file is filtered in
+RANGE_SIZE = 2 ** 24
 
 
-def b6_evalue_filter(handle, e_value, *args, **kwargs):
+def b6_evalue_filter(handle, e_value, start_line=None,
+                     header=DEFAULT_HEADER, comments=False, raw=False):
     """Yields lines from handle with E-value less than or equal to e_value
 
+    Only the E-value column is read from each line, so a B6Entry is built
+    for passing lines alone.
+
     Args:
         handle (file): B6/M8 file handle, can be any iterator so long as it
             it returns subsequent "lines" of a B6/M8 entry
 
         e_value (float): max E-value to return
 
-        *args: Variable length argument list for b6_iter
+        start_line (str): next line of handle if handle has been partially
+            read, see B6Reader.iterate
+
+        header (list): format specifiers of the B6/M8 columns, must include
+            'evalue'
 
-        **kwargs: Arbitrary keyword arguments for b6_iter
+        comments (bool): yield comments if True, else skip lines starting
+            with "#"
+
+        raw (bool): yield passing lines unchanged as str, including their
+            line endings, instead of B6Entry. A line ending is added to lines
+            without one, so lines can always be joined.
 
     Yields:
-        B6Entry: class containing all B6/M8 data
+        B6Entry: class containing all B6/M8 data, or str if raw is True.
+            Lines without an E-value ("-") are skipped.
+
+    Raises:
+        FormatError: If a line lacks the E-value column or its E-value is not
+            a float
+
+        ValueError: If header lacks 'evalue'
 
     Example:
         Note: These doctests will not pass, examples are only in doctest
@@ -63,34 +96,165 @@ def b6_evalue_filter(handle, e_value, *args, **kwargs):
         >>> b6_handle = open('test.b6')
         >>> for entry in b6_evalue_filter(b6_handle, 1e5)
         ...     print(entry.evalue)  # Print E-value of filtered entry
+
+        >>> b6_handle = open('test.b6')
+        >>> out_handle = open('filtered.b6', 'w')
+        >>> for line in b6_evalue_filter(b6_handle, 1e5, raw=True)
+        ...     out_handle.write(line)  # Write original line
     """
 
-    b6_reader = B6Reader(handle)
-    for entry in b6_reader.iterate(*args, **kwargs):
-        if entry.evalue <= e_value:
-            yield entry
+    if 'evalue' not in header:
+        raise ValueError('header lacks the evalue format specifier')
+    column = header.index('evalue')
+    max_split = column + 1
 
+    if not raw:
+        parse_row = compile_row_parser(header)[0]
 
-def main():
-    """Open B6/M8 file, filter entries by E-Value, and write said entries"""
+    if start_line is not None:
+        handle = chain([start_line], handle)
 
-    for entry in b6_evalue_filter(args.b6, args.e_value):
-        args.output.write(entry.write())
+    for current_line, line in enumerate(handle, start=1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
 
+        if raw and not line.endswith('\n'):  # E.g. last line of file
+            line += os.linesep
+
+        if line.startswith('#'):
+            if comments:
+                yield line if raw else line.strip()
+            continue
+
+        try:
+            value = line.split('\t', max_split)[column]
+        except IndexError:
+            if not line.strip():  # Skip blank lines
+                continue
+            raise FormatError('line {0}: the number of columns is less than '
+                              'the number of specifiers'.format(current_line))
+        if value == '-':
+            continue
+        try:
+            passed = float(value) <= e_value
+        except ValueError:
+            raise FormatError('line {0}: evalue is of wrong type'
+                              .format(current_line))
+
+        if passed:
+            yield line if raw else parse_row(line.strip(), current_line)
+
+
+def _filter_lines(lines, e_value, header):
+    """Return lines with E-value less than or equal to e_value
+
+    Args:
+        lines (iterable): lines of a B6/M8 file as str or bytes
+
+        e_value (float): max E-value to return
+
+        header (list): format specifiers of the B6/M8 columns
+
+    Returns:
+        str: passing lines joined unchanged
+    """
+
+    return ''.join(b6_evalue_filter(lines, e_value, header=header, raw=True))
+
+
+def _filter_range(byte_range, path, e_value, header):
+    """Return lines of part of a B6/M8 file with E-value <= e_value
+
+    Args:
+        byte_range (tuple): (start, end) byte offsets of lines to filter
+
+        path (str): path of B6/M8 file
+
+        e_value (float): max E-value to return
+
+        header (list): format specifiers of the B6/M8 columns
+
+    Returns:
+        str: passing lines joined unchanged
+    """
+
+    return _filter_lines(read_byte_range(path, *byte_range), e_value, header)
+
+
+def parallel_b6_evalue_filter(b6, e_value, threads=1, header=DEFAULT_HEADER,
+                              chunk_size=100000):
+    """Yields blocks of lines with E-value less than or equal to e_value
+
+    A file path is split into line-aligned byte ranges of about RANGE_SIZE
+    bytes, and other handles into chunks of chunk_size lines. Each range or
+    chunk is filtered by b6_evalue_filter in one of threads processes, and
+    the passing lines are yielded in their original order.
+
+    Args:
+        b6 (str): path of B6/M8 file, or file handle, can be any iterator so
+            long as it it returns subsequent "lines" of a B6/M8 file
+
+        e_value (float): max E-value to return
+
+        threads (int): number of processes to filter with
+
+        header (list): format specifiers of the B6/M8 columns
+
+        chunk_size (int): number of lines of a handle to filter per task
+
+    Yields:
+        str: passing lines of a range or chunk, unchanged and joined, in
+            order of the file. Comments are skipped.
+
+    Example:
+        Note: These doctests will not pass, examples are only in doctest
+        format as per convention. bio_utils uses pytests for testing.
+
+        >>> out_handle = open('filtered.b6', 'w')
+        >>> for lines in parallel_b6_evalue_filter('test.b6', 1e-10, 8):
+        ...     out_handle.write(lines)  # Write passing lines
+    """
+
+    threads = max(1, threads)
+
+    if isinstance(b6, str):
+        chunks = max(threads * 4, os.path.getsize(b6) // RANGE_SIZE)
+        items = line_byte_ranges(b6, chunks)
+        func = partial(_filter_range, path=b6, e_value=e_value,
+                       header=header)
+    else:
+        handle = iter(b6)
+        items = iter(lambda: list(islice(handle, chunk_size)), [])
+        func = partial(_filter_lines, e_value=e_value, header=header)
+
+    if threads == 1:
+        for lines in map(func, items):
+            yield lines
+    else:
+        with ProcessPoolExecutor(max_workers=threads) as pool:
+            for lines in ordered_map(pool, func, items, threads * 2):
+                yield lines
+
+
+def main():
+    """Open B6/M8 file, filter entries by E-Value, and write said entries"""
 
-if __name__ == '__main__':
     parser = argparse.ArgumentParser(description=__doc__,
                                      formatter_class=argparse.
                                      RawDescriptionHelpFormatter)
     parser.add_argument('-b', '--b6',
-                        nargs='?',
-                        type=argparse.FileType('rU'),
-                        default=sys.stdin,
-                        help='M8 (B6 in BLAST+) file with alignment data'
-                             '[Default: STDIN]')
+                        default='-',
+                        help='M8 (B6 in BLAST+) file with alignment data, '
+                             '"-" for STDIN [Default: STDIN]')
     parser.add_argument('-e', '--e_value',
                         type=float,
+                        required=True,
                         help='upper E-Value cutoff')
+    parser.add_argument('-t', '--threads',
+                        type=int,
+                        default=1,
+                        help='number of processes to filter with '
+                             '[Default: 1]')
     parser.add_argument('-o', '--output',
                         nargs='?',
                         type=argparse.FileType('w'),
@@ -98,5 +262,12 @@ if __name__ == '__main__':
                         help='optional output file [Default: STDOUT]')
     args = parser.parse_args()
 
+    b6 = sys.stdin if args.b6 == '-' else args.b6
+    for lines in parallel_b6_evalue_filter(b6, args.e_value,
+                                           threads=args.threads):
+        args.output.write(lines)
+
+
+if __name__ == '__main__':
     main()
     sys.exit(0)
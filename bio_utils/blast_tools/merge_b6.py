@@ -0,0 +1,306 @@
+#! /usr/bin/env python3
+
+"""Merge sorted B6/M8 files, such as BLAST shard outputs, into one order
+
+Usage:
+
+    merge_b6.py [--key <field>[:desc],...] [--max_open <int>]
+                [--tmp_dir <dir>] [--output <output file>]
+                <B6 file> [<B6 file> ...]
+
+Copyright:
+
+    merge_b6.py k-way merge of sorted B6/M8 files
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import argparse
+from bio_utils.iterators.b6 import _DEFAULT_SPECS
+from bio_utils.iterators.b6 import compile_row_parser
+from bio_utils.iterators.b6 import DEFAULT_HEADER
+from bio_utils.iterators.b6 import FormatError
+import heapq
+from operator import itemgetter
+import os
+import sys
+import tempfile
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.2.0'
+
+
+def _key_getter(key, header):
+    """Return a function giving the merge key of a B6/M8 line
+
+    Only the columns of key are split from a line and converted, so lines
+    are ordered without building a B6Entry for each.
+
+    Args:
+        key (tuple): B6Entry attributes or custom format specifiers, those
+            suffixed with ":desc", e.g. "bitscore:desc", sort in descending
+            order and must be numeric. A "-" prefix, e.g. "-bitscore", is
+            also read as descending.
+
+        header (list): format specifiers of the B6/M8 columns
+
+    Returns:
+        function: takes a line and its line number and returns a tuple to
+            compare, missing values sort last
+
+    Raises:
+        ValueError: If a field of key is not a column of header, or its
+            order is not "asc" or "desc"
+    """
+
+    specifiers = {attr: (spec, convert) for spec, (attr, convert)
+                  in _DEFAULT_SPECS.items()}
+    fields = []
+    for field in key:
+        name, _, order = field.partition(':')
+        if order not in ('', 'asc', 'desc'):
+            raise ValueError('order of key field {0} must be asc or desc, '
+                             'not {1}'.format(name, order))
+        descending = order == 'desc' or name.startswith('-')
+        name = name.lstrip('-')
+        spec, convert = specifiers.get(name, (name, str))
+        if spec not in header:
+            raise ValueError('key field {0} is not a column of the '
+                             'header'.format(name))
+        fields.append((header.index(spec), convert, descending, spec))
+    max_split = max(field[0] for field in fields) + 1 if fields else 0
+
+    def get_key(line, current_line):
+        split_line = line.rstrip('\r\n').split('\t', max_split)
+        values = []
+        for index, convert, descending, spec in fields:
+            try:
+                value = split_line[index]
+                if value == '-':
+                    values.append((1,))
+                elif descending:
+                    values.append((0, -float(value)))
+                else:
+                    values.append((0, convert(value)))
+            except IndexError:
+                raise FormatError('line {0}: the number of columns is less '
+                                  'than the number of specifiers'
+                                  .format(current_line))
+            except ValueError:
+                raise FormatError('line {0}: {1} is of wrong type'
+                                  .format(current_line, spec))
+        return tuple(values)
+
+    return get_key
+
+
+def _keyed_lines(path, get_key, parse_row=None):
+    """Yield (key, line) tuples of a sorted B6/M8 file
+
+    Args:
+        path (str): path of B6/M8 file sorted by key
+
+        get_key (function): takes a line and its line number and returns its
+            merge key
+
+        parse_row (function): row parser of the file's header, see
+            compile_row_parser, to yield B6Entry instances instead of lines
+
+    Yields:
+        tuple: (key, line) of each alignment, or (key, B6Entry) if parse_row
+            is given, comments are skipped
+
+    Raises:
+        ValueError: If the file is not sorted by key
+    """
+
+    previous = None
+    with open(path) as handle:
+        for current_line, line in enumerate(handle, start=1):
+            if line.startswith('#') or not line.strip():
+                continue
+            if not line.endswith('\n'):  # Last line lacks a line ending
+                line += os.linesep
+            key = get_key(line, current_line)
+            if previous is not None and key < previous:
+                raise ValueError('{0} is not sorted by key, line {1} '
+                                 'precedes line {2}'.format(path,
+                                                            current_line - 1,
+                                                            current_line))
+            previous = key
+            if parse_row is None:
+                yield key, line
+            else:
+                yield key, parse_row(line.strip(), current_line)
+
+
+def _merge_group(paths, get_key, tmp_dir):
+    """Merge sorted B6/M8 files into a temporary file
+
+    Args:
+        paths (list): paths of B6/M8 files sorted by key
+
+        get_key (function): takes a line and its line number and returns its
+            merge key
+
+        tmp_dir (str): directory to write merged file to
+
+    Returns:
+        str: path of the merged file
+    """
+
+    fd, path = tempfile.mkstemp(suffix='.b6', prefix='merge_b6.',
+                                dir=tmp_dir)
+    with os.fdopen(fd, 'w') as merged_handle:
+        write = merged_handle.write
+        for key, line in heapq.merge(*[_keyed_lines(group_path, get_key)
+                                       for group_path in paths],
+                                     key=itemgetter(0)):
+            write(line)
+
+    return path
+
+
+def merge_b6(paths, key=('query', 'bitscore:desc'), header=DEFAULT_HEADER,
+             max_open=64, raw=False, tmp_dir=None):
+    """Yield alignments of B6/M8 files that are each sorted by key, in order
+
+    All files are streamed through heapq.merge, so alignments with equal
+    keys keep the order of paths. If there are more files than max_open,
+    groups of max_open files are first merged into temporary files, and
+    these are merged again until at most max_open files remain.
+
+    Each file must already be sorted by key. For the default key, this
+    means sorted by query ID in lexicographic (code point) order, as by
+    "LC_ALL=C sort", then by descending bitscore within each query. BLAST+
+    writes the alignments of a query together, best bitscore first, but
+    writes queries in input order, which is rarely lexicographic. An
+    unsorted file raises ValueError when it is reached, which may be after
+    alignments have been yielded.
+
+    Args:
+        paths (list): paths of B6/M8 files, each sorted by key
+
+        key (tuple): B6Entry attributes or custom format specifiers to order
+            alignments by, those suffixed with ":desc" sort in descending
+            order and must be numeric. The default orders alignments by
+            query ID, then best bitscore first.
+
+        header (list): format specifiers of the B6/M8 columns
+
+        max_open (int): maximum number of files to read at once
+
+        raw (bool): yield lines unchanged as str instead of B6Entry
+
+        tmp_dir (str): directory to store merged groups in
+            [default: system temporary directory]
+
+    Yields:
+        B6Entry: alignments in key order, or str lines if raw is True.
+            Comments are skipped.
+
+    Raises:
+        FormatError: If a key column is missing or of the wrong type
+
+        ValueError: If a field of key is not a column of header, or a file
+            is not sorted by key
+
+    Example:
+        Note: These doctests will not pass, examples are only in doctest
+        format as per convention. bio_utils uses pytests for testing.
+
+        >>> from glob import glob
+        >>> out_handle = open('merged.b6', 'w')
+        >>> for line in merge_b6(sorted(glob('shard*.b6')), raw=True):
+        ...     out_handle.write(line)  # Write alignments in order
+    """
+
+    get_key = _key_getter(key, header)
+    parse_row = None if raw else compile_row_parser(header)[0]
+    max_open = max(2, max_open)
+    paths = list(paths)
+    temp_paths = []
+
+    try:
+        # Merge groups until few enough files remain
+        while len(paths) > max_open:
+            merged_paths = []
+            for i in range(0, len(paths), max_open):
+                group = paths[i:i + max_open]
+                if len(group) == 1:
+                    merged_paths.append(group[0])
+                    continue
+                merged_path = _merge_group(group, get_key, tmp_dir)
+                temp_paths.append(merged_path)
+                merged_paths.append(merged_path)
+                for path in group:
+                    if path in temp_paths:
+                        temp_paths.remove(path)
+                        os.remove(path)
+            paths = merged_paths
+
+        merged = heapq.merge(*[_keyed_lines(path, get_key, parse_row)
+                               for path in paths], key=itemgetter(0))
+        for merge_key, alignment in merged:
+            yield alignment
+
+    finally:
+        for path in temp_paths:
+            os.remove(path)
+
+
+def main():
+    """Merge sorted B6/M8 files and write alignments in order"""
+
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.
+                                     RawDescriptionHelpFormatter)
+    parser.add_argument('b6',
+                        nargs='+',
+                        help='B6/M8 files, each sorted by key')
+    parser.add_argument('-k', '--key',
+                        default='query,bitscore:desc',
+                        help='comma-separated fields to order alignments '
+                             'by, suffix ":desc" to sort descending '
+                             '[Default: query,bitscore:desc]')
+    parser.add_argument('-m', '--max_open',
+                        type=int,
+                        default=64,
+                        help='maximum number of files to read at once '
+                             '[Default: 64]')
+    parser.add_argument('--tmp_dir',
+                        default=None,
+                        help='directory to store temporary files in '
+                             '[Default: system temporary directory]')
+    parser.add_argument('-o', '--output',
+                        nargs='?',
+                        type=argparse.FileType('w'),
+                        default=sys.stdout,
+                        help='optional output file [Default: STDOUT]')
+    args = parser.parse_args()
+
+    key = [field for field in args.key.split(',') if field]
+    for line in merge_b6(args.b6, key=key, max_open=args.max_open,
+                         raw=True, tmp_dir=args.tmp_dir):
+        args.output.write(line)
+
+
+if __name__ == '__main__':
+    main()
+    sys.exit(0)
@@ -0,0 +1,262 @@
+#! /usr/bin/env python3
+
+"""Find reciprocal best hits between two sets of sequences from B6/M8 files
+
+Usage:
+
+    reciprocal_best_hits.py [--score <bitscore|evalue|pident>]
+                            [--output <output file>] <A vs B file>
+                            <B vs A file>
+
+Copyright:
+
+    reciprocal_best_hits.py reciprocal best hits from B6/M8 files
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from array import array
+import argparse
+from bio_utils.iterators.b6 import DEFAULT_HEADER
+from bio_utils.iterators.b6 import FormatError
+import os
+import sys
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.0.1'
+
+
+class _Interner:
+    """Assign consecutive integer codes to IDs
+
+    Attributes:
+        codes (dict): code of each ID
+
+        names (list): ID of each code
+    """
+
+    def __init__(self):
+        """Initialize variables to store IDs"""
+
+        self.codes = {}
+        self.names = []
+
+    def code(self, name):
+        """Return code of an ID, assigning the next code to new IDs"""
+
+        try:
+            return self.codes[name]
+        except KeyError:
+            code = self.codes[name] = len(self.names)
+            self.names.append(name)
+            return code
+
+
+def _best_hit_map(handle, queries, subjects, header, score):
+    """Return the best subject of each query of a B6/M8 file
+
+    Alignments are reduced per run of lines with the same query. When the
+    file is grouped by query, each query's best hit is stored once as its
+    group closes. Otherwise a query's later groups are compared with its
+    stored best hit, so any order of lines gives the same result.
+
+    Args:
+        handle (file): B6/M8 file handle, can be any iterator so long as it
+            it returns subsequent "lines" of a B6/M8 file
+
+        queries (_Interner): codes of query IDs
+
+        subjects (_Interner): codes of subject IDs
+
+        header (list): format specifiers of the B6/M8 columns
+
+        score (str): format specifier to rank alignments by, the lowest
+            'evalue' is best and the highest value of others
+
+    Returns:
+        tuple: array of the best subject code of each query code, -1 if the
+            query has no alignments, and array of the best scores, negated
+            for 'evalue'
+    """
+
+    query_col = header.index('qaccver')
+    subject_col = header.index('saccver')
+    score_col = header.index(score)
+    max_split = max(query_col, subject_col, score_col) + 1
+    sign = -1.0 if score == 'evalue' else 1.0
+
+    best_subjects = array('l')
+    best_scores = array('d')
+    query_code = queries.code
+    subject_code = subjects.code
+
+    def store(query, subject, value):
+        """Store best hit of a group of lines if it beats the stored one"""
+
+        code = query_code(query)
+        if code >= len(best_subjects):
+            missing = code + 1 - len(best_subjects)
+            best_subjects.extend([-1] * missing)
+            best_scores.extend([0.0] * missing)
+        if best_subjects[code] == -1 or value > best_scores[code]:
+            best_subjects[code] = subject_code(subject)
+            best_scores[code] = value
+
+    group_query = None
+    group_subject = None
+    group_score = None
+
+    for current_line, line in enumerate(handle, start=1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if line.startswith('#') or not line.strip():
+            continue
+
+        fields = line.rstrip('\r\n').split('\t', max_split)
+        try:
+            query = fields[query_col]
+            subject = fields[subject_col]
+            value = fields[score_col]
+        except IndexError:
+            raise FormatError('line {0}: the number of columns is less than '
+                              'the number of specifiers'.format(current_line))
+        if value == '-':
+            continue
+        try:
+            value = sign * float(value)
+        except ValueError:
+            raise FormatError('line {0}: {1} is of wrong type'
+                              .format(current_line, score))
+
+        if query == group_query:
+            if value > group_score:
+                group_subject = subject
+                group_score = value
+            continue
+
+        if group_query is not None:
+            store(group_query, group_subject, group_score)
+        group_query = query
+        group_subject = subject
+        group_score = value
+
+    if group_query is not None:
+        store(group_query, group_subject, group_score)
+
+    return best_subjects, best_scores
+
+
+def reciprocal_best_hits(b6_ab, b6_ba, score='bitscore',
+                         header=DEFAULT_HEADER):
+    """Yield pairs of sequences that are each other's best hit
+
+    Each file is read once and reduced to the best hit of each query, stored
+    as integer codes of interned IDs in arrays, so memory grows with the
+    number of sequences rather than alignments. Lines grouped by query, as
+    written by BLAST+ and DIAMOND, are reduced per group, and lines in any
+    other order are combined by query code. Ties keep the first alignment.
+
+    Args:
+        b6_ab (file): handle of B6/M8 alignments of set A queries to set B
+            subjects, can be any iterator so long as it it returns
+            subsequent "lines" of a B6/M8 file
+
+        b6_ba (file): handle of B6/M8 alignments of set B queries to set A
+            subjects
+
+        score (str): format specifier to rank alignments by, the lowest
+            'evalue' is best and the highest value of others
+
+        header (list): format specifiers of the B6/M8 columns of both files,
+            must include 'qaccver', 'saccver', and score
+
+    Yields:
+        tuple: (A ID, B ID, A to B score, B to A score) of each reciprocal
+            best hit, in order of first appearance of A IDs in b6_ab
+
+    Raises:
+        FormatError: If a line lacks a column of header or its score is not
+            a float
+
+        ValueError: If header lacks 'qaccver', 'saccver', or score
+
+    Example:
+        Note: These doctests will not pass, examples are only in doctest
+        format as per convention. bio_utils uses pytests for testing.
+
+        >>> pairs = reciprocal_best_hits(open('a_vs_b.b6'),
+        ...                              open('b_vs_a.b6'))
+        >>> for a_id, b_id, ab_score, ba_score in pairs:
+        ...     print(a_id, b_id)  # Print orthologous pair
+    """
+
+    for specifier in ('qaccver', 'saccver', score):
+        if specifier not in header:
+            raise ValueError('header lacks the {0} format specifier'
+                             .format(specifier))
+
+    a_ids = _Interner()
+    b_ids = _Interner()
+    ab_subjects, ab_scores = _best_hit_map(b6_ab, a_ids, b_ids, header, score)
+    ba_subjects, ba_scores = _best_hit_map(b6_ba, b_ids, a_ids, header, score)
+
+    sign = -1.0 if score == 'evalue' else 1.0
+    for a_code, b_code in enumerate(ab_subjects):
+        if b_code == -1 or b_code >= len(ba_subjects) or \
+                ba_subjects[b_code] != a_code:
+            continue
+        yield a_ids.names[a_code], b_ids.names[b_code], \
+            sign * ab_scores[a_code], sign * ba_scores[b_code]
+
+
+def main():
+    """Find reciprocal best hits and write them as a table"""
+
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.
+                                     RawDescriptionHelpFormatter)
+    parser.add_argument('b6_ab',
+                        type=argparse.FileType('r'),
+                        help='M8 (B6 in BLAST+) file of set A queries '
+                             'aligned to set B')
+    parser.add_argument('b6_ba',
+                        type=argparse.FileType('r'),
+                        help='M8 (B6 in BLAST+) file of set B queries '
+                             'aligned to set A')
+    parser.add_argument('-s', '--score',
+                        choices=['bitscore', 'evalue', 'pident'],
+                        default='bitscore',
+                        help='score to rank alignments by '
+                             '[Default: bitscore]')
+    parser.add_argument('-o', '--output',
+                        nargs='?',
+                        type=argparse.FileType('w'),
+                        default=sys.stdout,
+                        help='optional output file [Default: STDOUT]')
+    args = parser.parse_args()
+
+    for pair in reciprocal_best_hits(args.b6_ab, args.b6_ba,
+                                     score=args.score):
+        args.output.write('{0}\t{1}\t{2}\t{3}{4}'.format(*pair +
+                                                         (os.linesep,)))
+
+
+if __name__ == '__main__':
+    main()
+    sys.exit(0)
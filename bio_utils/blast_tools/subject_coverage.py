@@ -0,0 +1,119 @@
+#! /usr/bin/env python3
+
+"""Calculate per-base depth and coverage of subjects from B6/M8 alignments
+
+Copyright:
+
+    subject_coverage.py per-base depth and coverage of B6/M8 subjects
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from bio_utils.iterators import B6Entry
+from bio_utils.sam_tools.coverage import _depth_profiles
+from collections import OrderedDict
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.0.1'
+
+
+def read_length_table(handle):
+    """Read sequence lengths from a FASTA index or two column length table
+
+    Args:
+        handle (file): handle of a samtools FASTA index (.fai) or a table of
+            sequence names and lengths, tab-separated, lines starting with
+            "#" are skipped
+
+    Returns:
+        OrderedDict: sequence lengths keyed by sequence name in file order
+
+    Example:
+        Note: These doctests will not pass, examples are only in doctest
+        format as per convention. bio_utils uses pytests for testing.
+
+        >>> lengths = read_length_table(open('genes.fasta.fai'))
+        >>> lengths['gene1']  # Length of gene1
+    """
+
+    lengths = OrderedDict()
+    for line in handle:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if line.startswith('#') or not line.strip():
+            continue
+        fields = line.rstrip('\r\n').split('\t')
+        lengths[fields[0]] = int(fields[1])
+
+    return lengths
+
+
+def subject_coverage(entries, subject_lengths):
+    """Calculate per-base depth of subjects from B6/M8 alignments
+
+    The subject interval of each alignment is recorded as a start and end
+    event, with reversed coordinates of minus strand alignments swapped, and
+    counted into a difference array per subject with numpy.bincount. A
+    single cumulative sum of each array then gives the depth of every base.
+
+    Args:
+        entries (iterable): B6Entry instances, such as those yielded by
+            B6Reader.iterate, comments are ignored
+
+        subject_lengths (dict): lengths of subjects keyed by subject ID, such
+            as those returned by read_length_table, alignments to other
+            subjects are ignored
+
+    Returns:
+        OrderedDict: Coverage instances keyed by subject ID in the order of
+            subject_lengths
+
+    Example:
+        Note: These doctests will not pass, examples are only in doctest
+        format as per convention. bio_utils uses pytests for testing.
+
+        >>> lengths = read_length_table(open('genes.fasta.fai'))
+        >>> b6_reader = B6Reader(open('test.b6'))
+        >>> profiles = subject_coverage(b6_reader.iterate(), lengths)
+        >>> profiles['gene1'].mean()  # Mean depth of gene1
+        >>> profiles['gene1'].breadth()  # Fraction of gene1 covered
+        >>> profiles['gene1'].evenness()  # Evenness of depth along gene1
+    """
+
+    lengths = OrderedDict((name, int(length)) for name, length in
+                          subject_lengths.items())
+
+    def intervals():
+        """Yield 0-based, half-open subject intervals of alignments"""
+
+        for entry in entries:
+
+            if not isinstance(entry, B6Entry):  # Skip comments
+                continue
+
+            subject_start = entry.subject_start
+            subject_end = entry.subject_end
+            if subject_start is None or subject_end is None:
+                continue
+            if subject_start > subject_end:  # Minus strand
+                subject_start, subject_end = subject_end, subject_start
+
+            yield entry.subject, subject_start - 1, subject_end
+
+    return _depth_profiles(lengths, intervals())
@@ -0,0 +1,226 @@
+#! /usr/bin/env python3
+
+"""Yield the top N alignments of each query from unsorted B6/M8 entries
+
+Copyright:
+
+    top_n_hits.py select top alignments of each query with bounded memory
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from bio_utils.blast_tools.best_hits import score_getter
+from bio_utils.iterators import B6Entry
+from bio_utils.iterators.b6 import _DEFAULT_SPECS
+from bio_utils.iterators.b6 import compile_row_parser
+from collections import OrderedDict
+import heapq
+from itertools import chain
+import os
+import pickle
+from tempfile import TemporaryDirectory
+import zlib
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.1.0'
+
+
+# Format specifiers of B6Entry attributes, to parse written entries again
+_SPECIFIERS = {attr: spec for spec, (attr, _) in _DEFAULT_SPECS.items()}
+
+
+def _select(items, n, heaps=None, limit=None):
+    """Keep the top n items of each query in a min-heap per query
+
+    Args:
+        items (iterator): (query, score, order, value) tuples, the highest
+            score is best and order breaks ties in favor of the earlier item
+
+        n (int): number of items to keep per query
+
+        heaps (OrderedDict): heaps keyed by query to add to
+
+        limit (int): stop reading items once more than limit items are
+            held, None to read all items
+
+    Returns:
+        tuple: OrderedDict of heaps of (score, -order, value) tuples keyed
+            by query, the worst kept item of a query first in its heap, and
+            the number of items held
+    """
+
+    heaps = OrderedDict() if heaps is None else heaps
+    held = sum(len(heap) for heap in heaps.values())
+    limit = float('inf') if limit is None else limit
+    for query, score, order, value in items:
+        item = (score, -order, value)
+        try:
+            heap = heaps[query]
+        except KeyError:
+            heaps[query] = [item]
+            held += 1
+        else:
+            if len(heap) < n:
+                heapq.heappush(heap, item)
+                held += 1
+            elif item[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, item)
+        if held > limit:
+            break
+
+    return heaps, held
+
+
+def _sorted_hits(heaps):
+    """Yield values of each heap from best to worst
+
+    Args:
+        heaps (OrderedDict): heap of (score, -order, value) tuples keyed
+            by query
+
+    Yields:
+        object: values of the top items of each query
+    """
+
+    for heap in heaps.values():
+        heap.sort(key=lambda item: item[:2], reverse=True)
+        for item in heap:
+            yield item[2]
+
+
+def _read_partition(path):
+    """Yield pickled (query, score, order, line) tuples of a partition file
+
+    Args:
+        path (str): path of partition file
+
+    Yields:
+        tuple: (query, score, order, line) tuples in the order they were
+            written
+    """
+
+    with open(path, 'rb') as handle:
+        while True:
+            try:
+                yield pickle.load(handle)
+            except EOFError:
+                break
+
+
+def top_n_hits(entries, n=5, score='bitscore', max_entries=None,
+               partitions=64, temp_dir=None):
+    """Yield the top n alignments of each query from entries in any order
+
+    Each query keeps a heap of at most n alignments, so memory grows with
+    the number of queries rather than alignments. If max_entries is given
+    and more alignments than that are held, every alignment held and read
+    afterwards is written to one of several partition files chosen by a
+    hash of its query. Each partition is then reduced on its own, so only
+    the queries of one partition are held at a time.
+
+    Args:
+        entries (iterable): B6Entry instances, such as from
+            B6Reader.iterate(), in any order, comments are skipped
+
+        n (int): number of alignments to yield per query
+
+        score (str): B6Entry attribute, e.g. 'bitscore', or custom format
+            specifier to rank alignments by, the lowest E-value is best
+
+        max_entries (int): number of alignments to hold before writing
+            alignments to partition files, None to never write them
+
+        partitions (int): number of partition files to write
+
+        temp_dir (str): directory to create partition files in, default is
+            the system's temporary directory
+
+    Yields:
+        B6Entry: top alignments of each query from best to worst, ties keep
+            the earliest alignment. Queries are yielded in order of first
+            appearance, or grouped by partition if partitions were written.
+
+    Raises:
+        ValueError: If n is less than 1, or score is neither a B6Entry
+            attribute nor a custom format specifier of the first entry
+
+    Example:
+        Note: These doctests will not pass, examples are only in doctest
+        format as per convention. bio_utils uses pytests for testing.
+
+        >>> b6_reader = B6Reader(open('shards.b6'))
+        >>> for entry in top_n_hits(b6_reader.iterate(), n=10,
+        ...                         max_entries=10000000):
+        ...     print(entry.write())  # Write top alignments of query
+    """
+
+    if n < 1:
+        raise ValueError('n must be at least 1, not {0}'.format(n))
+
+    entries = (entry for entry in entries if isinstance(entry, B6Entry))
+    try:
+        first = next(entries)
+    except StopIteration:  # No alignments
+        return
+    if score not in vars(first) and (first.custom_fs is None or
+                                     score not in first.custom_fs):
+        raise ValueError('{0} is neither a B6Entry attribute nor a custom '
+                         'format specifier of entries'.format(score))
+
+    get_score = score_getter(score)
+    items = ((entry.query, get_score(entry), order, entry)
+             for order, entry in enumerate(chain([first], entries)))
+
+    # Select in memory until more than max_entries alignments are held
+    heaps, held = _select(items, n, limit=max_entries)
+    if max_entries is None or held <= max_entries:
+        for hit in _sorted_hits(heaps):
+            yield hit
+        return
+
+    # Write held and remaining alignments to partitions by query, as lines
+    # with their query and score, and parse them again when selected
+    fs_order = first.fs_order
+    parse_row = compile_row_parser([_SPECIFIERS.get(name, name)
+                                    for name in fs_order])[0]
+    with TemporaryDirectory(dir=temp_dir) as directory:
+        paths = [os.path.join(directory, 'partition{0}.pickle'.format(i))
+                 for i in range(partitions)]
+        handles = [open(path, 'wb') for path in paths]
+        try:
+            def write(query, entry_score, order, entry):
+                partition = zlib.crc32(query.encode('utf-8')) % partitions
+                pickle.dump((query, entry_score, order,
+                             entry.write().rstrip('\r\n')),
+                            handles[partition], pickle.HIGHEST_PROTOCOL)
+
+            for query, heap in heaps.items():
+                for entry_score, order, entry in heap:
+                    write(query, entry_score, -order, entry)
+            heaps = None
+            for item in items:
+                write(*item)
+        finally:
+            for handle in handles:
+                handle.close()
+
+        for path in paths:
+            partition_heaps = _select(_read_partition(path), n)[0]
+            for line in _sorted_hits(partition_heaps):
+                yield parse_row(line, 0)
@@ -0,0 +1,36 @@
+#! /usr/bin/env python3
+
+"""Package containing functions for reading parts of large files
+
+Copyright:
+
+    __init__.py functions for reading parts of large files
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from bio_utils.file_tools.bgzf import BgzfReader
+from bio_utils.file_tools.bgzf import BgzfWriter
+from bio_utils.file_tools.byte_ranges import line_byte_ranges
+from bio_utils.file_tools.byte_ranges import ordered_map
+from bio_utils.file_tools.byte_ranges import read_byte_range
+from bio_utils.file_tools.id_index import id_index
+from bio_utils.file_tools.id_index import IdIndex
+from bio_utils.file_tools.id_index import write_id_index
+from bio_utils.file_tools.tabix import read_tabix_index
+from bio_utils.file_tools.tabix import tabix_index
+from bio_utils.file_tools.tabix import TabixIndex
+
+__version__ = '1.3.0'
@@ -0,0 +1,327 @@
+#! /usr/bin/env python3
+
+"""Read and write blocked GNU Zip Format (BGZF) files with virtual offsets
+
+Copyright:
+
+    bgzf.py read and write BGZF files
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import struct
+import zlib
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.0.0'
+
+
+# Largest amount of uncompressed data stored in a block, as used by bgzip
+MAX_BLOCK_DATA = 0xff00
+
+# Empty block marking the end of a BGZF file
+EOF_BLOCK = b'\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff\x06\x00\x42\x43' \
+            b'\x02\x00\x1b\x00\x03\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+
+# gzip member header with the BGZF "BC" extra subfield, BSIZE follows
+_HEADER = b'\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff\x06\x00\x42\x43\x02\x00'
+_HEADER_STRUCT = struct.Struct('<4BI2BH')  # Magic to XLEN
+_FOOTER_STRUCT = struct.Struct('<II')  # CRC32 and ISIZE
+
+
+def make_virtual_offset(block_offset, within_offset):
+    """Combine a block's file offset and an offset within its data
+
+    Args:
+        block_offset (int): byte offset of the start of a compressed block
+
+        within_offset (int): byte offset within the block's uncompressed data
+
+    Returns:
+        int: 64-bit virtual offset
+    """
+
+    return block_offset << 16 | within_offset
+
+
+def split_virtual_offset(virtual_offset):
+    """Split a virtual offset into block and within-block offsets
+
+    Args:
+        virtual_offset (int): 64-bit virtual offset
+
+    Returns:
+        tuple: (block_offset, within_offset)
+    """
+
+    return virtual_offset >> 16, virtual_offset & 0xffff
+
+
+class BgzfReader:
+    """Class to read lines from a BGZF file and seek to virtual offsets
+
+    Only the block currently being read is held in memory, so seeking
+    within a block does not decompress it again.
+
+    Attributes:
+        name (str): path of the BGZF file
+
+        handle (file): binary file handle of the BGZF file
+    """
+
+    def __init__(self, name):
+        """Open BGZF file and read its first block"""
+
+        self.name = name
+        self.handle = open(name, 'rb')
+        self._block_offset = 0  # File offset of current block
+        self._next_offset = 0  # File offset of the block after it
+        self._data = b''  # Uncompressed data of current block
+        self._within = 0  # Position in current block's data
+        self._load_block(0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.readline()
+        if not line:
+            raise StopIteration
+        return line
+
+    def _load_block(self, block_offset):
+        """Decompress block beginning at block_offset
+
+        Args:
+            block_offset (int): byte offset of the start of the block
+
+        Raises:
+            ValueError: If the block is not a valid BGZF block
+        """
+
+        handle = self.handle
+        handle.seek(block_offset)
+        header = handle.read(_HEADER_STRUCT.size)
+
+        self._block_offset = block_offset
+        self._within = 0
+
+        if not header:  # End of file
+            self._data = b''
+            self._next_offset = block_offset
+            return
+
+        fields = _HEADER_STRUCT.unpack(header)
+        if fields[0] != 31 or fields[1] != 139 or not fields[3] & 4:
+            raise ValueError('{0} is not a BGZF file, no BGZF block at offset '
+                             '{1}'.format(self.name, block_offset))
+
+        # Find BSIZE in the extra subfields
+        extra = handle.read(fields[7])
+        block_size = None
+        position = 0
+        while position + 4 <= len(extra):
+            subfield_length = struct.unpack_from('<H', extra, position + 2)[0]
+            if extra[position:position + 2] == b'BC':
+                block_size = struct.unpack_from('<H', extra, position + 4)[0]
+                break
+            position += 4 + subfield_length
+        if block_size is None:
+            raise ValueError('{0} is not a BGZF file, block at offset {1} '
+                             'lacks a BSIZE field'.format(self.name,
+                                                         block_offset))
+
+        # Compressed data lies between the header and 8 byte footer
+        remaining = block_size + 1 - _HEADER_STRUCT.size - fields[7]
+        cdata = handle.read(remaining)
+        self._data = zlib.decompress(cdata[:-_FOOTER_STRUCT.size], -15)
+        self._next_offset = block_offset + block_size + 1
+
+    def close(self):
+        """Close BGZF file handle"""
+
+        self.handle.close()
+
+    def read(self, size=-1):
+        """Read uncompressed data, which may span several blocks
+
+        Args:
+            size (int): number of bytes to read, negative to read to the end
+                of the file
+
+        Returns:
+            bytes: data read, shorter than size at end of file
+        """
+
+        pieces = []
+        while size:
+            data = self._data
+            within = self._within
+            if within >= len(data):
+                if self._next_offset == self._block_offset:  # End of file
+                    break
+                self._load_block(self._next_offset)
+                continue
+            if size < 0:
+                piece = data[within:]
+            else:
+                piece = data[within:within + size]
+                size -= len(piece)
+            pieces.append(piece)
+            self._within = within + len(piece)
+
+        return b''.join(pieces)
+
+    def readline(self):
+        """Read the next line, which may span several blocks
+
+        Returns:
+            bytes: line including its line ending, empty at end of file
+        """
+
+        pieces = []
+        while True:
+            data = self._data
+            within = self._within
+            if within >= len(data):
+                if self._next_offset == self._block_offset:  # End of file
+                    break
+                self._load_block(self._next_offset)
+                continue
+            newline = data.find(b'\n', within)
+            if newline == -1:
+                pieces.append(data[within:])
+                self._within = len(data)
+            else:
+                pieces.append(data[within:newline + 1])
+                self._within = newline + 1
+                break
+
+        return b''.join(pieces)
+
+    def seek(self, virtual_offset):
+        """Move to a virtual offset
+
+        Args:
+            virtual_offset (int): 64-bit virtual offset, such as one returned
+                by tell()
+        """
+
+        block_offset, within = split_virtual_offset(virtual_offset)
+        if block_offset != self._block_offset:
+            self._load_block(block_offset)
+        self._within = within
+
+    def tell(self):
+        """Return virtual offset of the current position
+
+        Returns:
+            int: 64-bit virtual offset
+        """
+
+        if self._within >= len(self._data) and \
+                self._next_offset != self._block_offset:
+            return make_virtual_offset(self._next_offset, 0)
+
+        return make_virtual_offset(self._block_offset, self._within)
+
+
+class BgzfWriter:
+    """Class to write data to a BGZF file
+
+    Attributes:
+        name (str): path of the BGZF file
+
+        handle (file): binary file handle of the BGZF file
+
+        level (int): zlib compression level
+    """
+
+    def __init__(self, name, level=6):
+        """Open BGZF file for writing"""
+
+        self.name = name
+        self.handle = open(name, 'wb')
+        self.level = level
+        self._buffer = bytearray()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _write_block(self, data):
+        """Compress data and write it as a single block
+
+        Args:
+            data (bytes): at most MAX_BLOCK_DATA bytes of data
+        """
+
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15)
+        cdata = compressor.compress(data) + compressor.flush()
+        block_size = len(_HEADER) + 2 + len(cdata) + _FOOTER_STRUCT.size
+        self.handle.write(_HEADER + struct.pack('<H', block_size - 1) + cdata +
+                          _FOOTER_STRUCT.pack(zlib.crc32(data) & 0xffffffff,
+                                              len(data)))
+
+    def write(self, data):
+        """Buffer data, writing each full block of it
+
+        Args:
+            data (str): data to write, str is encoded as UTF-8 and bytes are
+                written as is
+        """
+
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+
+        buffer = self._buffer
+        buffer.extend(data)
+        if len(buffer) >= MAX_BLOCK_DATA:
+            position = 0
+            while len(buffer) - position >= MAX_BLOCK_DATA:
+                self._write_block(bytes(buffer[position:position +
+                                               MAX_BLOCK_DATA]))
+                position += MAX_BLOCK_DATA
+            del buffer[:position]
+
+    def flush(self):
+        """Write buffered data as a block so the next write starts a block"""
+
+        if self._buffer:
+            self._write_block(bytes(self._buffer))
+            self._buffer = bytearray()
+        self.handle.flush()
+
+    def close(self):
+        """Write buffered data and the end of file block, then close file"""
+
+        if self.handle.closed:
+            return
+
+        self.flush()
+        self.handle.write(EOF_BLOCK)
+        self.handle.close()
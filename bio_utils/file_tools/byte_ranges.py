@@ -0,0 +1,163 @@
+#! /usr/bin/env python3
+
+"""Split files into byte ranges that begin and end at line boundaries
+
+These functions let separate processes read disjoint parts of one large text
+file without any line being read twice or split between ranges.
+
+    line_byte_ranges: split a file into ranges aligned to line starts
+
+    read_byte_range: yield the lines of one range
+
+    ordered_map: apply a function to ranges in a pool, in order of the file
+
+Copyright:
+
+    byte_ranges.py split files into line-aligned byte ranges
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from collections import deque
+import os
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.1.0'
+
+
+def line_byte_ranges(path, chunks, start=0, end=None):
+    """Split a file into byte ranges that each begin at the start of a line
+
+    Args:
+        path (str): path of file to split
+
+        chunks (int): number of ranges to split file into, fewer ranges are
+            returned if the file has fewer lines
+
+        start (int): byte offset to begin splitting at, must be a line start
+
+        end (int): byte offset to stop splitting at [default: end of file]
+
+    Returns:
+        list: (start, end) tuples of byte offsets, ends are exclusive and
+            equal to the start of the next range
+
+    Example:
+        Note: These doctests will not pass, examples are only in doctest
+        format as per convention. bio_utils uses pytests for testing.
+
+        >>> line_byte_ranges('test.sam', 4)
+        [(0, 2514), (2514, 5023), (5023, 7540), (7540, 10031)]
+    """
+
+    if end is None:
+        end = os.path.getsize(path)
+
+    chunks = max(1, chunks)
+    size = end - start
+
+    bounds = [start]
+    with open(path, 'rb') as handle:
+        for chunk in range(1, chunks):
+            target = start + size * chunk // chunks
+            if target <= bounds[-1]:
+                continue
+
+            # Move to the first line start at or after target
+            handle.seek(target - 1)
+            handle.readline()
+            bound = min(handle.tell(), end)
+
+            if bound > bounds[-1]:
+                bounds.append(bound)
+
+    if end > bounds[-1] or not size:
+        bounds.append(end)
+
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def read_byte_range(path, start, end):
+    """Yield each line beginning within a byte range of a file
+
+    Args:
+        path (str): path of file to read
+
+        start (int): byte offset of first line, must be a line start
+
+        end (int): byte offset to stop at, exclusive
+
+    Yields:
+        bytes: lines of file, including line endings
+
+    Example:
+        Note: These doctests will not pass, examples are only in doctest
+        format as per convention. bio_utils uses pytests for testing.
+
+        >>> for line in read_byte_range('test.sam', 2514, 5023):
+        ...     print(line.decode('utf-8'))  # Print line
+    """
+
+    with open(path, 'rb') as handle:
+        handle.seek(start)
+        position = start
+        for line in handle:
+            if position >= end:
+                break
+            position += len(line)
+            yield line
+
+
+def ordered_map(pool, func, items, window):
+    """Yield func applied to each item by pool, in order of items
+
+    Unlike Executor.map, at most window items are submitted ahead of the
+    result being yielded, so items are read and results held as needed.
+    Finished results wait in the queue until all earlier results are
+    yielded.
+
+    Args:
+        pool (Executor): executor to run func in
+
+        func (function): function applied to each item
+
+        items (iterable): arguments of func, may be a lazy iterator
+
+        window (int): number of items submitted but not yet yielded
+
+    Yields:
+        object: return value of func for each item in order
+
+    Example:
+        Note: These doctests will not pass, examples are only in doctest
+        format as per convention. bio_utils uses pytests for testing.
+
+        >>> ranges = line_byte_ranges('test.sam', 1000)
+        >>> with ProcessPoolExecutor(max_workers=4) as pool:
+        ...     for count in ordered_map(pool, count_range, ranges, 8):
+        ...         print(count)  # Result of each range in file order
+    """
+
+    futures = deque()
+    for item in items:
+        futures.append(pool.submit(func, item))
+        if len(futures) >= window:
+            yield futures.popleft().result()
+    while futures:
+        yield futures.popleft().result()
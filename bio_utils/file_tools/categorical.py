@@ -0,0 +1,94 @@
+#! /usr/bin/env python3
+
+"""Column of repeated strings stored as integer codes
+
+Copyright:
+
+    categorical.py column of repeated strings stored as integer codes
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import numpy as np
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.0.0'
+
+
+class CategoricalColumn:
+    """A column of strings stored as integer codes into a list of categories
+
+    Comparing the column to a string returns a boolean NumPy array, so it can
+    be used to build masks of tables such as GFF3Table and B6Table.
+
+    Attributes:
+        codes (numpy.ndarray): int32 index of each value in categories
+
+        categories (list): distinct values of the column
+    """
+
+    def __init__(self, codes, categories):
+        """Initialize variables to store column"""
+
+        self.codes = codes
+        self.categories = categories
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return self.categories[self.codes[key]]
+        return CategoricalColumn(self.codes[key], self.categories)
+
+    def __iter__(self):
+        categories = self.categories
+        return (categories[code] for code in self.codes.tolist())
+
+    def __eq__(self, value):
+        try:
+            return self.codes == self.categories.index(value)
+        except ValueError:  # Value not in column
+            return np.zeros(len(self.codes), dtype=bool)
+
+    def __ne__(self, value):
+        return ~(self == value)
+
+    __hash__ = None
+
+    def isin(self, values):
+        """Return mask of rows whose value is one of values
+
+        Args:
+            values (iterable): strings to match
+
+        Returns:
+            numpy.ndarray: boolean mask of matching rows
+        """
+
+        values = set(values)
+        codes = [i for i, category in enumerate(self.categories)
+                 if category in values]
+
+        return np.isin(self.codes, codes)
+
+    def tolist(self):
+        """Return values of column as a list of strings"""
+
+        return list(self)
@@ -0,0 +1,323 @@
+#! /usr/bin/env python3
+
+"""Build and query sorted, memory-mapped indexes of IDs in tabular files
+
+Copyright:
+
+    id_index.py map IDs of tabular files to byte ranges
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import heapq
+import mmap
+import shutil
+import struct
+import tempfile
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.1.0'
+
+
+# Magic number of index files
+ID_INDEX_MAGIC = b'IDX\x01'
+
+# Magic number and number of records
+_HEADER = struct.Struct('<4sQ')
+
+# Offset and length of ID in name block, then start and end of byte range
+_RECORD = struct.Struct('<QIQQ')
+
+# Length of ID, then start and end of byte range, of runs in sorted chunks
+_RUN = struct.Struct('<IQQ')
+
+
+class IdIndex:
+    """Class to look up the byte ranges of IDs in a memory-mapped index
+
+    An index file holds a header, fixed-size records sorted by ID and then
+    byte offset, and a block of the records' IDs. IDs are found by binary
+    search of the records, so only the pages read are loaded into memory.
+
+    Attributes:
+        path (str): path of the index file
+    """
+
+    def __init__(self, path):
+        """Open and memory-map an index file
+
+        Raises:
+            ValueError: If the file is not an ID index
+        """
+
+        self.path = path
+        self._handle = open(path, 'rb')
+        self._data = mmap.mmap(self._handle.fileno(), 0,
+                               access=mmap.ACCESS_READ)
+        magic, self._count = _HEADER.unpack_from(self._data, 0)
+        if magic != ID_INDEX_MAGIC:
+            self.close()
+            raise ValueError('{0} is not an ID index'.format(path))
+        self._names_start = _HEADER.size + self._count * _RECORD.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, name):
+        return bool(self.ranges(name))
+
+    def _record(self, i):
+        """Return ID and byte range of a record
+
+        Args:
+            i (int): number of record
+
+        Returns:
+            tuple: (ID as bytes, start, end)
+        """
+
+        name_offset, name_length, start, end = _RECORD.unpack_from(
+            self._data, _HEADER.size + i * _RECORD.size)
+        name_offset += self._names_start
+
+        return self._data[name_offset:name_offset + name_length], start, end
+
+    def close(self):
+        """Close memory map and file handle of index"""
+
+        self._data.close()
+        self._handle.close()
+
+    def ranges(self, name):
+        """Return byte ranges of lines with an ID
+
+        Args:
+            name (str): ID to look up
+
+        Returns:
+            list: (start, end) byte offsets of each run of lines with the ID
+                in file order, empty if the ID is absent
+        """
+
+        name = name.encode('utf-8')
+
+        # Find first record of name
+        low = 0
+        high = self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._record(middle)[0] < name:
+                low = middle + 1
+            else:
+                high = middle
+
+        ranges = []
+        for i in range(low, self._count):
+            record_name, start, end = self._record(i)
+            if record_name != name:
+                break
+            ranges.append((start, end))
+
+        return ranges
+
+
+def _write_chunk(runs, tmp_dir):
+    """Sort runs and write them to a temporary file
+
+    Args:
+        runs (list): (ID as bytes, start, end) tuples, sorted in place
+
+        tmp_dir (str): directory to create file in
+
+    Returns:
+        file: temporary file of runs positioned at its start
+    """
+
+    runs.sort()
+    pack = _RUN.pack
+    handle = tempfile.TemporaryFile(dir=tmp_dir)
+    handle.write(b''.join(pack(len(name), start, end) + name
+                          for name, start, end in runs))
+    handle.seek(0)
+
+    return handle
+
+
+def _read_chunk(handle):
+    """Yield runs of a file written by _write_chunk
+
+    Args:
+        handle (file): temporary file of runs
+
+    Yields:
+        tuple: (ID as bytes, start, end) in sorted order
+    """
+
+    read = handle.read
+    unpack = _RUN.unpack
+    size = _RUN.size
+    while True:
+        data = read(size)
+        if not data:
+            break
+        length, start, end = unpack(data)
+        yield read(length), start, end
+
+
+def _write_records(index_path, records, tmp_dir=None):
+    """Write an ID index of sorted records
+
+    Records are written as they are read and IDs are collected in a
+    temporary file, which is appended to the index once all records are
+    written, so neither is held in memory.
+
+    Args:
+        index_path (str): path to write index to
+
+        records (iterable): (ID as bytes, start, end) tuples sorted by ID
+            and then start
+
+        tmp_dir (str): directory to store IDs in until they are appended
+    """
+
+    count = 0
+    name_offset = 0
+    previous = None
+    pack = _RECORD.pack
+    with open(index_path, 'wb') as handle, \
+            tempfile.TemporaryFile(dir=tmp_dir) as names:
+        write = handle.write
+        write(_HEADER.pack(ID_INDEX_MAGIC, 0))  # Count is known at end
+        for name, start, end in records:
+            if name != previous:
+                if previous is not None:
+                    name_offset += len(previous)
+                names.write(name)
+                previous = name
+            write(pack(name_offset, len(name), start, end))
+            count += 1
+
+        names.seek(0)
+        shutil.copyfileobj(names, handle)
+        handle.seek(0)
+        write(_HEADER.pack(ID_INDEX_MAGIC, count))
+
+
+def write_id_index(index_path, ranges):
+    """Write an ID index of byte ranges
+
+    Args:
+        index_path (str): path to write index to
+
+        ranges (dict): lists of (start, end) byte offsets keyed by ID as
+            bytes or str
+    """
+
+    records = []
+    for name, name_ranges in ranges.items():
+        encoded = name.encode('utf-8') if isinstance(name, str) else name
+        records.extend((encoded, start, end) for start, end in name_ranges)
+    records.sort()
+
+    _write_records(index_path, records)
+
+
+def id_index(path, index_path=None, id_col=1, meta='#', max_runs=1000000,
+             tmp_dir=None):
+    """Index the byte ranges of each ID in a column of a tabular file
+
+    Adjacent lines with the same ID are stored as a single byte range, so a
+    file grouped by ID has one range per ID. Ranges are sorted in chunks of
+    max_runs, which are written to temporary files and merged into the
+    index, so memory does not grow with the number of IDs.
+
+    Args:
+        path (str): path of uncompressed tabular file
+
+        index_path (str): path to write index to [default: path + '.idx']
+
+        id_col (int): 1-based column of IDs
+
+        meta (str): character beginning lines that are not records
+
+        max_runs (int): number of ranges to sort in memory at once
+
+        tmp_dir (str): directory to store sorted chunks in
+            [default: system temporary directory]
+
+    Returns:
+        IdIndex: memory-mapped index of the file
+
+    Example:
+        Note: These doctests will not pass, examples are only in doctest
+        format as per convention. bio_utils uses pytests for testing.
+
+        >>> index = id_index('test.b6')
+        >>> index.ranges('query1')  # Byte ranges of lines of query1
+    """
+
+    if index_path is None:
+        index_path = path + '.idx'
+
+    meta = meta.encode('utf-8')
+    id_col -= 1
+    max_runs = max(1, max_runs)
+    runs = []
+    chunks = []
+    run_name = None
+    run_start = run_end = 0
+
+    try:
+        with open(path, 'rb') as handle:
+            offset = 0
+            for line in handle:
+                line_start = offset
+                offset += len(line)
+                if line.startswith(meta) or not line.strip():
+                    continue
+                name = line.rstrip(b'\r\n').split(b'\t', id_col + 1)[id_col]
+                if name == run_name and run_end == line_start:  # Extend run
+                    run_end = offset
+                    continue
+                if run_name is not None:
+                    runs.append((run_name, run_start, run_end))
+                    if len(runs) >= max_runs:
+                        chunks.append(_write_chunk(runs, tmp_dir))
+                        runs = []
+                run_name = name
+                run_start = line_start
+                run_end = offset
+            if run_name is not None:
+                runs.append((run_name, run_start, run_end))
+
+        runs.sort()
+        records = heapq.merge(*[_read_chunk(chunk) for chunk in chunks] +
+                              [iter(runs)])
+        _write_records(index_path, records, tmp_dir)
+    finally:
+        for chunk in chunks:
+            chunk.close()
+
+    return IdIndex(index_path)
@@ -0,0 +1,404 @@
+#! /usr/bin/env python3
+
+"""Build and query tabix indexes of sorted, BGZF compressed tabular files
+
+Copyright:
+
+    tabix.py tabix compatible indexes of BGZF files
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from bio_utils.file_tools.bgzf import BgzfReader
+from bio_utils.file_tools.bgzf import BgzfWriter
+from bio_utils.file_tools.bgzf import split_virtual_offset
+from collections import OrderedDict
+import struct
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.0.0'
+
+
+# Bit shift of the smallest bins and of linear index windows, 16 kb
+_MIN_SHIFT = 14
+
+# Pseudo-bin htslib uses to store metadata, ignored when reading
+_META_BIN = 37450
+
+_INT = struct.Struct('<i')
+_CHUNK = struct.Struct('<QQ')
+
+
+def reg2bin(beg, end):
+    """Return the smallest bin containing a region
+
+    Args:
+        beg (int): 0-based start of region
+
+        end (int): 0-based, exclusive end of region
+
+    Returns:
+        int: bin number in the UCSC binning scheme used by tabix
+    """
+
+    end -= 1
+    if beg >> 14 == end >> 14:
+        return 4681 + (beg >> 14)
+    if beg >> 17 == end >> 17:
+        return 585 + (beg >> 17)
+    if beg >> 20 == end >> 20:
+        return 73 + (beg >> 20)
+    if beg >> 23 == end >> 23:
+        return 9 + (beg >> 23)
+    if beg >> 26 == end >> 26:
+        return 1 + (beg >> 26)
+    return 0
+
+
+def reg2bins(beg, end):
+    """Return all bins that may contain records overlapping a region
+
+    Args:
+        beg (int): 0-based start of region
+
+        end (int): 0-based, exclusive end of region
+
+    Returns:
+        list: bin numbers in the UCSC binning scheme used by tabix
+    """
+
+    end -= 1
+    bins = [0]
+    for offset, shift in ((1, 26), (9, 23), (73, 20), (585, 17),
+                          (4681, 14)):
+        bins.extend(range(offset + (beg >> shift), offset + (end >> shift) +
+                          1))
+
+    return bins
+
+
+class TabixIndex:
+    """A simple class to store a tabix index
+
+    The index and its file format are those of tabix, so indexes written
+    here can be read by tabix and htslib and vice versa.
+
+    Attributes:
+        format (int): tabix format code, 0 for generic tab-delimited files,
+            0x10000 is added if coordinates are 0-based and half-open
+
+        seq_col (int): 1-based column of sequence names
+
+        start_col (int): 1-based column of region starts
+
+        end_col (int): 1-based column of region ends, 0 if there is none
+
+        meta (str): character beginning lines that are not records
+
+        skip (int): number of lines to skip at the beginning of the file
+
+        names (list): sequence names in order of appearance
+
+        bins (list): dict per sequence of chunk lists keyed by bin, each
+            chunk is a (start, end) tuple of virtual offsets
+
+        linear (list): list per sequence of the smallest virtual offset of a
+            record overlapping each 16 kb window
+    """
+
+    def __init__(self):
+        """Initialize variables to store tabix index"""
+
+        self.format = 0
+        self.seq_col = None
+        self.start_col = None
+        self.end_col = None
+        self.meta = '#'
+        self.skip = 0
+        self.names = []
+        self.bins = []
+        self.linear = []
+        self._ids = None
+
+    def chunks(self, name, beg, end):
+        """Return chunks of a file that may contain records in a region
+
+        Args:
+            name (str): sequence name
+
+            beg (int): 0-based start of region
+
+            end (int): 0-based, exclusive end of region
+
+        Returns:
+            list: (start, end) tuples of virtual offsets, sorted and merged
+        """
+
+        if self._ids is None or len(self._ids) != len(self.names):
+            self._ids = {seq: i for i, seq in enumerate(self.names)}
+
+        try:
+            ref_id = self._ids[name]
+        except KeyError:
+            return []
+
+        beg = max(0, beg)
+        if end <= beg:
+            return []
+
+        # Chunks ending before the first record in the window are skipped
+        linear = self.linear[ref_id]
+        if linear:
+            window = beg >> _MIN_SHIFT
+            min_offset = linear[min(window, len(linear) - 1)]
+        else:
+            min_offset = 0
+
+        bins = self.bins[ref_id]
+        found = []
+        for bin_number in reg2bins(beg, end):
+            for chunk in bins.get(bin_number, ()):
+                if chunk[1] > min_offset:
+                    found.append((max(chunk[0], min_offset), chunk[1]))
+
+        found.sort()
+        merged = []
+        for chunk in found:
+            if merged and chunk[0] <= merged[-1][1]:
+                if chunk[1] > merged[-1][1]:
+                    merged[-1] = (merged[-1][0], chunk[1])
+            else:
+                merged.append(chunk)
+
+        return merged
+
+    def write(self, path):
+        """Write index to a BGZF compressed tabix file
+
+        Args:
+            path (str): path of index file, typically ending in ".tbi"
+        """
+
+        names = b''.join([name.encode('utf-8') + b'\x00'
+                          for name in self.names])
+        with BgzfWriter(path) as handle:
+            handle.write(b'TBI\x01' + struct.pack(
+                '<8i', len(self.names), self.format, self.seq_col,
+                self.start_col, self.end_col, ord(self.meta), self.skip,
+                len(names)) + names)
+            for bins, linear in zip(self.bins, self.linear):
+                handle.write(_INT.pack(len(bins)))
+                for bin_number, chunks in bins.items():
+                    handle.write(struct.pack('<Ii', bin_number, len(chunks)))
+                    handle.write(b''.join([_CHUNK.pack(*chunk)
+                                           for chunk in chunks]))
+                handle.write(_INT.pack(len(linear)))
+                handle.write(struct.pack('<{0}Q'.format(len(linear)),
+                                         *linear))
+
+
+def read_tabix_index(path):
+    """Read a tabix index written by tabix_index or tabix
+
+    Args:
+        path (str): path of index file, typically ending in ".tbi"
+
+    Returns:
+        TabixIndex: index stored in the file
+
+    Raises:
+        ValueError: If path is not a tabix index
+
+    Example:
+        Note: These doctests will not pass, examples are only in doctest
+        format as per convention. bio_utils uses pytests for testing.
+
+        >>> index = read_tabix_index('test.gff3.gz.tbi')
+        >>> index.chunks('contig1', 9999, 20000)  # Virtual offsets to read
+    """
+
+    with BgzfReader(path) as handle:
+        data = handle.read()
+
+    if data[:4] != b'TBI\x01':
+        raise ValueError('{0} is not a tabix index'.format(path))
+
+    index = TabixIndex()
+    n_ref, index.format, index.seq_col, index.start_col, index.end_col, \
+        meta, index.skip, names_length = struct.unpack_from('<8i', data, 4)
+    index.meta = chr(meta)
+    position = 36
+    names = data[position:position + names_length].split(b'\x00')
+    index.names = [name.decode('utf-8') for name in names[:n_ref]]
+    position += names_length
+
+    for _ in range(n_ref):
+        bins = OrderedDict()
+        n_bin = _INT.unpack_from(data, position)[0]
+        position += 4
+        for _ in range(n_bin):
+            bin_number, n_chunk = struct.unpack_from('<Ii', data, position)
+            position += 8
+            chunks = [_CHUNK.unpack_from(data, position + 16 * i)
+                      for i in range(n_chunk)]
+            position += 16 * n_chunk
+            if bin_number != _META_BIN:
+                bins[bin_number] = chunks
+        n_intv = _INT.unpack_from(data, position)[0]
+        position += 4
+        linear = list(struct.unpack_from('<{0}Q'.format(n_intv), data,
+                                         position))
+        position += 8 * n_intv
+        index.bins.append(bins)
+        index.linear.append(linear)
+
+    return index
+
+
+def tabix_index(path, index_path=None, seq_col=1, start_col=4, end_col=5,
+                meta='#', skip=0, zero_based=False, stop=None):
+    """Index a sorted, BGZF compressed tabular file like tabix
+
+    Each record is added to the chunk list of the smallest bin containing it
+    and to the 16 kb windows of the linear index it overlaps. The defaults
+    index GFF3 files, equivalent to "tabix -p gff".
+
+    Args:
+        path (str): path of BGZF compressed file sorted by sequence name and
+            start, such as one written with BgzfWriter or bgzip
+
+        index_path (str): path to write index to, None to not write it
+            [default: None]
+
+        seq_col (int): 1-based column of sequence names
+
+        start_col (int): 1-based column of region starts
+
+        end_col (int): 1-based column of region ends, 0 if there is none
+
+        meta (str): character beginning lines that are not records
+
+        skip (int): number of lines to skip at the beginning of the file
+
+        zero_based (bool): starts are 0-based and ends exclusive, as in BED,
+            rather than 1-based and inclusive, as in GFF3
+
+        stop (str): stop indexing at a line beginning with this prefix,
+            such as "##FASTA" in GFF3 files
+
+    Returns:
+        TabixIndex: index of the file
+
+    Raises:
+        ValueError: If the file is not sorted by sequence name and start
+
+    Example:
+        Note: These doctests will not pass, examples are only in doctest
+        format as per convention. bio_utils uses pytests for testing.
+
+        >>> tabix_index('test.gff3.gz', 'test.gff3.gz.tbi', stop='##FASTA')
+    """
+
+    index = TabixIndex()
+    index.format = 0x10000 if zero_based else 0
+    index.seq_col = seq_col
+    index.start_col = start_col
+    index.end_col = end_col
+    index.meta = meta
+    index.skip = skip
+
+    meta_byte = meta.encode('utf-8')
+    stop = stop.encode('utf-8') if stop is not None else None
+    split_count = max(seq_col, start_col, end_col)
+    seq_col -= 1
+    start_col -= 1
+    end_col -= 1
+    offset = 0 if zero_based else 1
+
+    ids = {}
+    bins = linear = None
+    last_start = -1
+
+    with BgzfReader(path) as handle:
+        for _ in range(skip):
+            handle.readline()
+
+        record_start = handle.tell()
+        for line in handle:
+            record_end = handle.tell()
+            if line.startswith(meta_byte) or not line.strip():
+                if stop is not None and line.startswith(stop):
+                    break
+                record_start = record_end
+                continue
+
+            fields = line.rstrip(b'\r\n').split(b'\t', split_count)
+            name = fields[seq_col].decode('utf-8')
+            beg = int(fields[start_col]) - offset
+            end = int(fields[end_col]) if end_col >= 0 else beg + 1
+            if end <= beg:  # Zero length features overlap one base
+                end = beg + 1
+
+            if name not in ids:
+                ids[name] = len(index.names)
+                index.names.append(name)
+                bins = OrderedDict()
+                linear = []
+                index.bins.append(bins)
+                index.linear.append(linear)
+                last_start = -1
+            elif ids[name] != len(index.names) - 1 or beg < last_start:
+                raise ValueError('{0} is not sorted by sequence name and '
+                                 'start at {1}:{2}'.format(path, name,
+                                                           beg + offset))
+            last_start = beg
+
+            # Extend last chunk of bin if this record directly follows it
+            chunks = bins.setdefault(reg2bin(beg, end), [])
+            if chunks and chunks[-1][1] == record_start:
+                chunks[-1] = (chunks[-1][0], record_end)
+            elif chunks and split_virtual_offset(chunks[-1][1])[0] == \
+                    split_virtual_offset(record_start)[0]:
+                chunks[-1] = (chunks[-1][0], record_end)  # Same block
+            else:
+                chunks.append((record_start, record_end))
+
+            # Record first offset of each window the record overlaps
+            last_window = (end - 1) >> _MIN_SHIFT
+            if len(linear) <= last_window:
+                linear.extend([None] * (last_window + 1 - len(linear)))
+            for window in range(beg >> _MIN_SHIFT, last_window + 1):
+                if linear[window] is None:
+                    linear[window] = record_start
+
+            record_start = record_end
+
+    # Windows without records begin at the next record
+    for linear in index.linear:
+        following = linear[-1] if linear else 0
+        for window in range(len(linear) - 1, -1, -1):
+            if linear[window] is None:
+                linear[window] = following
+            else:
+                following = linear[window]
+
+    if index_path is not None:
+        index.write(index_path)
+
+    return index
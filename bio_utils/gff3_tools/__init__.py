@@ -0,0 +1,31 @@
+#! /usr/bin/env python3
+
+"""Package containing functions for indexing and comparing GFF3 features
+
+Copyright:
+
+    __init__.py functions for indexing and comparing GFF3 features
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from bio_utils.gff3_tools.feature_graph import GFF3Graph
+from bio_utils.gff3_tools.gff3_table import GFF3Table
+from bio_utils.gff3_tools.gff3_table import load_gff3_table
+from bio_utils.gff3_tools.interval_index import GFF3IntervalIndex
+from bio_utils.gff3_tools.overlap_join import gff3_overlap_join
+from bio_utils.gff3_tools.parallel_map import parallel_gff3_map
+
+__version__ = '1.4.0'
@@ -0,0 +1,290 @@
+#! /usr/bin/env python3
+
+"""Index the ID/Parent hierarchy of GFF3 features
+
+Copyright:
+
+    feature_graph.py index the ID/Parent hierarchy of GFF3 features
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from collections import OrderedDict
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.0.0'
+
+
+def _attribute_list(entry, tag):
+    """Return values of an attribute as a list
+
+    Args:
+        entry (GFF3Entry): feature with parsed attributes
+
+        tag (str): name of attribute
+
+    Returns:
+        list: values of attribute, empty if entry lacks the attribute
+    """
+
+    value = entry.attributes.get(tag)
+    if value is None:
+        return []
+    elif type(value) is list:
+        return value
+    else:
+        return [value]
+
+
+class GFF3Graph:
+    """Index GFF3 features by ID and link them to their parents and children
+
+    The graph is built in one pass over the features. Features sharing an ID,
+    such as a CDS split over several lines, are stored together. Features
+    are linked to their parents through the Parent attribute, and Parent
+    values that do not match the ID of any feature are recorded in
+    unresolved rather than raising an error.
+
+    Attributes:
+        features (list): all GFF3Entry instances in original order
+
+        ids (OrderedDict): lists of GFF3Entry instances keyed by ID
+
+        unresolved (list): (GFF3Entry, Parent ID) tuples for Parent values
+            that match no ID
+    """
+
+    def __init__(self, entries):
+        """Build graph from GFF3 features
+
+        Args:
+            entries (iterable): GFF3Entry instances with parsed attributes,
+                such as those yielded by GFF3Reader.iterate, headers and
+                comments are ignored
+
+        Raises:
+            TypeError: If entries were read with parse_attr=False
+        """
+
+        self.features = []
+        self.ids = OrderedDict()
+        self.unresolved = []
+        self._children = {}  # Child entries keyed by parent ID
+
+        for entry in entries:
+            if type(entry) is str:  # Skip headers and comments
+                continue
+            if type(entry.attributes) is str:
+                raise TypeError('GFF3Graph requires parsed attributes, read '
+                                'features with parse_attr=True')
+
+            self.features.append(entry)
+            for feature_id in _attribute_list(entry, 'ID'):
+                self.ids.setdefault(feature_id, []).append(entry)
+            for parent_id in _attribute_list(entry, 'Parent'):
+                self._children.setdefault(parent_id, []).append(entry)
+
+        # Parents may be defined after their children, so resolve at end
+        for entry in self.features:
+            for parent_id in _attribute_list(entry, 'Parent'):
+                if parent_id not in self.ids:
+                    self.unresolved.append((entry, parent_id))
+
+    def __getitem__(self, feature_id):
+        """Return features with an ID
+
+        Args:
+            feature_id (str): ID attribute of feature
+
+        Returns:
+            list: GFF3Entry instances with ID
+
+        Raises:
+            KeyError: If no feature has ID
+        """
+
+        return self.ids[feature_id]
+
+    def __contains__(self, feature_id):
+        """Return True if a feature has this ID"""
+
+        return feature_id in self.ids
+
+    def __len__(self):
+        """Return number of features in graph"""
+
+        return len(self.features)
+
+    def roots(self):
+        """Return features without a resolvable parent
+
+        Returns:
+            list: GFF3Entry instances without a Parent attribute or whose
+                Parent values match no ID, in original order
+        """
+
+        return [entry for entry in self.features
+                if not any(parent_id in self.ids for parent_id in
+                           _attribute_list(entry, 'Parent'))]
+
+    def children(self, feature):
+        """Return the direct children of a feature
+
+        Args:
+            feature (GFF3Entry): feature or ID of feature, all features
+                sharing an ID share children
+
+        Returns:
+            list: GFF3Entry instances whose Parent matches the feature's ID,
+                in original order
+        """
+
+        ids = [feature] if type(feature) is str \
+            else _attribute_list(feature, 'ID')
+
+        found = []
+        seen = set()
+        for feature_id in ids:
+            for child in self._children.get(feature_id, []):
+                if id(child) not in seen:
+                    seen.add(id(child))
+                    found.append(child)
+
+        return found
+
+    def parents(self, feature):
+        """Return the direct parents of a feature
+
+        Args:
+            feature (GFF3Entry): feature to find parents of
+
+        Returns:
+            list: GFF3Entry instances whose ID matches a Parent of feature
+        """
+
+        return [parent for parent_id in _attribute_list(feature, 'Parent')
+                for parent in self.ids.get(parent_id, [])]
+
+    def _ordered(self, members):
+        """Order features so that parents precede their children
+
+        Args:
+            members (list): GFF3Entry instances to order, parents outside of
+                members are ignored
+
+        Returns:
+            list: members in topological order, features in Parent cycles
+                are appended in their given order
+        """
+
+        member_ids = set(id(entry) for entry in members)
+        indegree = {}
+        for entry in members:
+            indegree[id(entry)] = sum(1 for parent in self.parents(entry)
+                                      if id(parent) in member_ids)
+
+        # Depth-first so each parent is followed closely by its children
+        found = []
+        pending = [entry for entry in reversed(members)
+                   if not indegree[id(entry)]]
+        while pending:
+            entry = pending.pop()
+            found.append(entry)
+            ready = []
+            for child in self.children(entry):
+                if id(child) in member_ids:
+                    indegree[id(child)] -= 1
+                    if not indegree[id(child)]:
+                        ready.append(child)
+            pending.extend(reversed(ready))
+
+        if len(found) < len(members):  # Features in Parent cycles
+            found_ids = set(id(entry) for entry in found)
+            found.extend(entry for entry in members
+                         if id(entry) not in found_ids)
+
+        return found
+
+    def descendants(self, feature):
+        """Return all features below a feature, parents before children
+
+        Args:
+            feature (GFF3Entry): feature or ID of feature
+
+        Returns:
+            list: GFF3Entry instances in topological order, each feature is
+                listed once and after all of its parents below feature
+
+        Example:
+            Note: These doctests will not pass, examples are only in doctest
+            format as per convention. bio_utils uses pytests for testing.
+
+            >>> graph = GFF3Graph(GFF3Reader(open('test.gff3')).iterate())
+            >>> for feature in graph.descendants('gene1'):
+            ...     print(feature.type)  # mRNA, exon, CDS, etc.
+        """
+
+        members = []
+        seen = set()
+        pending = list(reversed(self.children(feature)))
+        while pending:
+            child = pending.pop()
+            if id(child) in seen:  # Reached through another parent or cycle
+                continue
+            seen.add(id(child))
+            members.append(child)
+            pending.extend(reversed(self.children(child)))
+
+        return self._ordered(members)
+
+    def ancestors(self, feature):
+        """Return all features above a feature, nearest first
+
+        Args:
+            feature (GFF3Entry): feature to find ancestors of
+
+        Returns:
+            list: GFF3Entry instances in breadth-first order from the
+                feature's parents up to its roots
+        """
+
+        found = []
+        seen = set([id(feature)])
+        pending = self.parents(feature)
+        while pending:
+            parents = []
+            for parent in pending:
+                if id(parent) not in seen:
+                    seen.add(id(parent))
+                    found.append(parent)
+                    parents.extend(self.parents(parent))
+            pending = parents
+
+        return found
+
+    def traverse(self):
+        """Return every feature with parents before their children
+
+        Returns:
+            list: all GFF3Entry instances in topological order, starting
+                from roots in original order, features in Parent cycles are
+                appended in original order
+        """
+
+        return self._ordered(self.features)
@@ -0,0 +1,243 @@
+#! /usr/bin/env python3
+
+"""Load GFF3 features into NumPy columns for vectorized filtering
+
+Copyright:
+
+    gff3_table.py columnar table of GFF3 features
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from bio_utils.file_tools.categorical import CategoricalColumn
+from bio_utils.iterators import GFF3Attributes
+from bio_utils.iterators import GFF3Entry
+import numpy as np
+from urllib.parse import unquote
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.0.1'
+
+
+# Codes of the strand column
+STRAND_CODES = {'+': 1, '-': -1, '.': 0, '?': 2}
+_STRANDS = {code: strand for strand, code in STRAND_CODES.items()}
+
+
+class GFF3Table:
+    """A simple class to store GFF3 features as NumPy columns
+
+    Indexing a table with a boolean mask, slice, or array of row numbers
+    returns a new table of the selected rows.
+
+    Attributes:
+        seqid (CategoricalColumn): sequence ID of each feature
+
+        source (CategoricalColumn): source of each feature
+
+        type (CategoricalColumn): type of each feature
+
+        start (numpy.ndarray): int64 1-based start of each feature
+
+        end (numpy.ndarray): int64 1-based, inclusive end of each feature
+
+        score (numpy.ndarray): float64 score of each feature, NaN if absent
+
+        strand (numpy.ndarray): int8 strand of each feature, see STRAND_CODES
+
+        phase (numpy.ndarray): int8 phase of each feature, -1 if absent
+
+        attributes (numpy.ndarray): raw attributes column of each feature
+
+        ids (numpy.ndarray): ID attribute of each feature, None where absent,
+            or None if IDs were not loaded
+    """
+
+    def __init__(self):
+        """Initialize variables to store GFF3 columns"""
+
+        self.seqid = None
+        self.source = None
+        self.type = None
+        self.start = None
+        self.end = None
+        self.score = None
+        self.strand = None
+        self.phase = None
+        self.attributes = None
+        self.ids = None
+
+    def __len__(self):
+        return len(self.start)
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            key = [key]
+        table = GFF3Table()
+        for name in ('seqid', 'source', 'type', 'start', 'end', 'score',
+                     'strand', 'phase', 'attributes', 'ids'):
+            column = getattr(self, name)
+            if column is not None:
+                setattr(table, name, column[key])
+        return table
+
+    def entries(self, parse_attr=True):
+        """Yield each row as a GFF3Entry
+
+        Args:
+            parse_attr (bool): store attributes as GFF3Attributes, parsed on
+                first access, rather than str
+
+        Yields:
+            GFF3Entry: feature of each row in order
+        """
+
+        columns = zip(self.seqid, self.source, self.type,
+                      self.start.tolist(), self.end.tolist(),
+                      self.score.tolist(), self.strand.tolist(),
+                      self.phase.tolist(), self.attributes.tolist())
+        for seqid, source, feature_type, start, end, score, strand, phase, \
+                attributes in columns:
+            entry = GFF3Entry()
+            entry.seqid = seqid
+            entry.source = source
+            entry.type = feature_type
+            entry.start = start
+            entry.end = end
+            if score != score:  # NaN
+                entry.score = '.'
+                entry._score_str = '.'
+            else:
+                entry.score = score
+                entry._score_str = repr(score)
+                if entry._score_str.endswith('.0'):
+                    entry._score_str = entry._score_str[:-2]
+            entry.strand = _STRANDS[strand]
+            entry.phase = phase if phase >= 0 else '.'
+            entry.attributes = GFF3Attributes(attributes) if parse_attr \
+                else attributes
+            yield entry
+
+
+def _raw_id(attributes):
+    """Return ID attribute from a raw attributes column without parsing it
+
+    Args:
+        attributes (str): raw attributes column
+
+    Returns:
+        str: percent-decoded ID, None if absent
+    """
+
+    if attributes.startswith('ID='):
+        start = 3
+    else:
+        start = attributes.find(';ID=')
+        if start == -1:
+            return None
+        start += 4
+    end = attributes.find(';', start)
+    value = attributes[start:] if end == -1 else attributes[start:end]
+
+    return unquote(value) if '%' in value else value
+
+
+def load_gff3_table(handle, ids=False):
+    """Load GFF3 features into a table of NumPy columns
+
+    Each column is collected in a list while the file is read once, then
+    converted to an array. Repeated strings in the seqid, source, and type
+    columns are stored once as categories, and attributes are kept as the
+    raw strings from the file.
+
+    Args:
+        handle (file): GFF3 file handle, can be any iterator so long as it
+            it returns subsequent "lines" of a GFF3 file as str or bytes
+
+        ids (bool): also load the ID attribute of each feature
+
+    Returns:
+        GFF3Table: columns of all features before any "##FASTA" directive
+
+    Example:
+        Note: These doctests will not pass, examples are only in doctest
+        format as per convention. bio_utils uses pytests for testing.
+
+        >>> table = load_gff3_table(open('test.gff3'))
+        >>> long_cds = table[(table.type == 'CDS') &
+        ...                  (table.end - table.start > 300)]
+        >>> len(long_cds)  # Number of CDS longer than 300 bp
+        >>> for entry in long_cds.entries():
+        ...     print(entry.write())  # Write features back as GFF3
+    """
+
+    seqids = {}
+    sources = {}
+    types = {}
+    seqid_codes = []
+    source_codes = []
+    type_codes = []
+    starts = []
+    ends = []
+    scores = []
+    strands = []
+    phases = []
+    attributes = []
+    strand_codes = STRAND_CODES
+
+    for line in handle:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if line.startswith('#'):
+            if line.startswith('##FASTA'):
+                break
+            continue
+        line = line.rstrip('\r\n')
+        if not line:
+            continue
+
+        fields = line.split('\t')
+        seqid_codes.append(seqids.setdefault(fields[0], len(seqids)))
+        source_codes.append(sources.setdefault(fields[1], len(sources)))
+        type_codes.append(types.setdefault(fields[2], len(types)))
+        starts.append(fields[3])
+        ends.append(fields[4])
+        scores.append(fields[5] if fields[5] != '.' else 'nan')
+        strands.append(strand_codes[fields[6]])
+        phases.append(fields[7] if fields[7] != '.' else '-1')
+        attributes.append(fields[8])
+
+    table = GFF3Table()
+    table.seqid = CategoricalColumn(np.array(seqid_codes, dtype=np.int32),
+                                    list(seqids))
+    table.source = CategoricalColumn(np.array(source_codes, dtype=np.int32),
+                                     list(sources))
+    table.type = CategoricalColumn(np.array(type_codes, dtype=np.int32),
+                                   list(types))
+    table.start = np.array(starts, dtype=np.int64)
+    table.end = np.array(ends, dtype=np.int64)
+    table.score = np.array(scores, dtype=np.float64)
+    table.strand = np.array(strands, dtype=np.int8)
+    table.phase = np.array(phases, dtype=np.int8)
+    table.attributes = np.array(attributes, dtype=object)
+    if ids:
+        table.ids = np.array([_raw_id(column) for column in attributes],
+                             dtype=object)
+
+    return table
@@ -0,0 +1,243 @@
+#! /usr/bin/env python3
+
+"""Index GFF3 features by position for fast overlap queries
+
+Copyright:
+
+    interval_index.py index GFF3 features by position
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from bisect import bisect_left
+from bisect import bisect_right
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.0.0'
+
+
+class _NCList:
+    """Nested containment list of the features on one sequence
+
+    Features are sorted by start and any feature contained within another is
+    moved to a sublist of the feature containing it. Within each list, both
+    starts and ends are therefore sorted, so the first overlapping feature of
+    a list can be found by binary search on ends.
+
+    Attributes:
+        features (list): GFF3Entry instances sorted by start, then by
+            descending end
+
+        lists (dict): sublists keyed by the index of their parent feature,
+            the top-level list is keyed by -1, each sublist is a tuple of
+            lists of starts, ends, and feature indices
+    """
+
+    def __init__(self, features):
+        """Build nested containment list from features"""
+
+        self.features = sorted(features, key=lambda f: (f.start, -f.end))
+
+        children = {-1: []}
+        stack = []  # Indices of features that may contain the next feature
+        for index, feature in enumerate(self.features):
+            while stack and self.features[stack[-1]].end < feature.end:
+                stack.pop()
+            parent = stack[-1] if stack else -1
+            children.setdefault(parent, []).append(index)
+            stack.append(index)
+
+        self.lists = {}
+        for parent, indices in children.items():
+            self.lists[parent] = ([self.features[i].start for i in indices],
+                                  [self.features[i].end for i in indices],
+                                  indices)
+
+    def overlapping(self, start, end):
+        """Return indices of features overlapping an inclusive interval"""
+
+        found = []
+        pending = [-1]
+        while pending:
+            starts, ends, indices = self.lists[pending.pop()]
+            position = bisect_left(ends, start)
+            while position < len(starts) and starts[position] <= end:
+                index = indices[position]
+                found.append(index)
+                if index in self.lists:
+                    pending.append(index)
+                position += 1
+
+        return sorted(found)
+
+
+class GFF3IntervalIndex:
+    """Index GFF3 features by sequence and position for overlap queries
+
+    Features are grouped by seqid, and optionally by strand, into nested
+    containment lists. A query costs a binary search per list visited plus
+    the number of overlapping features, rather than a comparison against
+    every feature.
+
+    Coordinates are 1-based and inclusive on both ends, as in GFF3 files.
+
+    Attributes:
+        stranded (bool): features are grouped by strand as well as seqid
+
+        size (int): number of features in index
+    """
+
+    def __init__(self, entries, stranded=False):
+        """Build index from GFF3 features
+
+        Args:
+            entries (iterable): GFF3Entry instances, such as those yielded by
+                GFF3Reader.iterate, headers and comments are ignored
+
+            stranded (bool): group features by strand so that queries can be
+                limited to one strand
+        """
+
+        self.stranded = stranded
+        self.size = 0
+
+        groups = {}
+        for entry in entries:
+            if type(entry) is str:  # Skip headers and comments
+                continue
+            key = (entry.seqid, entry.strand) if stranded else entry.seqid
+            groups.setdefault(key, []).append(entry)
+            self.size += 1
+
+        self._lists = {key: _NCList(features) for key, features in
+                       groups.items()}
+
+    def __len__(self):
+        """Return number of features in index"""
+
+        return self.size
+
+    def _groups(self, seqid, strand):
+        """Return nested containment lists to query"""
+
+        if not self.stranded:
+            keys = [seqid]
+        elif strand is None:
+            keys = [key for key in self._lists if key[0] == seqid]
+        else:
+            keys = [(seqid, strand)]
+
+        return [self._lists[key] for key in keys if key in self._lists]
+
+    def overlapping(self, seqid, start, end, strand=None):
+        """Return features overlapping an interval
+
+        Args:
+            seqid (str): ID of sequence to query
+
+            start (int): first base of interval
+
+            end (int): last base of interval
+
+            strand (str): [+, -, .] only return features on this strand,
+                requires an index built with stranded=True
+
+        Returns:
+            list: GFF3Entry instances overlapping the interval, sorted by
+                start
+
+        Raises:
+            ValueError: If strand is given for an unstranded index
+
+        Example:
+            Note: These doctests will not pass, examples are only in doctest
+            format as per convention. bio_utils uses pytests for testing.
+
+            >>> gff3_reader = GFF3Reader(open('test.gff3'))
+            >>> index = GFF3IntervalIndex(gff3_reader.iterate())
+            >>> for feature in index.overlapping('contig1', 1000, 2000):
+            ...     print(feature.attributes['ID'])  # Print feature ID
+        """
+
+        if strand is not None and not self.stranded:
+            raise ValueError('strand given but index is not stranded')
+
+        found = []
+        for nclist in self._groups(seqid, strand):
+            found.extend(nclist.features[index] for index in
+                         nclist.overlapping(start, end))
+
+        return sorted(found, key=lambda f: (f.start, -f.end))
+
+    def nearest(self, seqid, start, end, strand=None):
+        """Return features nearest to an interval
+
+        Args:
+            seqid (str): ID of sequence to query
+
+            start (int): first base of interval
+
+            end (int): last base of interval
+
+            strand (str): [+, -, .] only return features on this strand,
+                requires an index built with stranded=True
+
+        Returns:
+            list: features overlapping the interval if any, else the closest
+                feature upstream and/or downstream of the interval; both are
+                returned if they are equally distant, empty if the sequence
+                has no features
+
+        Raises:
+            ValueError: If strand is given for an unstranded index
+
+        Example:
+            Note: These doctests will not pass, examples are only in doctest
+            format as per convention. bio_utils uses pytests for testing.
+
+            >>> index = GFF3IntervalIndex(gff3_reader.iterate())
+            >>> feature = index.nearest('contig1', 1000, 1000)[0]
+        """
+
+        found = self.overlapping(seqid, start, end, strand=strand)
+        if found:
+            return found
+
+        # Contained features never end later or start earlier than their
+        # parents, so only the top-level list of each group is searched
+        candidates = []
+        for nclist in self._groups(seqid, strand):
+            starts, ends, indices = nclist.lists[-1]
+            before = bisect_left(ends, start) - 1
+            if before >= 0:
+                candidates.append((start - ends[before],
+                                   nclist.features[indices[before]]))
+            after = bisect_right(starts, end)
+            if after < len(starts):
+                candidates.append((starts[after] - end,
+                                   nclist.features[indices[after]]))
+
+        if not candidates:
+            return []
+
+        distance = min(candidate[0] for candidate in candidates)
+
+        return sorted([feature for gap, feature in candidates
+                       if gap == distance],
+                      key=lambda f: (f.start, -f.end))
@@ -0,0 +1,157 @@
+#! /usr/bin/env python3
+
+"""Find overlapping features of two sorted GFF3 files in a single pass
+
+Copyright:
+
+    overlap_join.py find overlapping features of two sorted GFF3 files
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import heapq
+from itertools import count
+from operator import itemgetter
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.0.1'
+
+
+def _sorted_features(entries, side, rank):
+    """Yield features tagged with their sort key, checking sort order
+
+    Args:
+        entries (iterable): GFF3Entry instances, headers and comments are
+            skipped
+
+        side (int): 0 for the first input, 1 for the second
+
+        rank (function): converts a seqid into a sortable value
+
+    Yields:
+        tuple: (sort key, side, GFF3Entry)
+
+    Raises:
+        ValueError: If features are not sorted by seqid and start
+    """
+
+    last = None
+    for entry in entries:
+        if type(entry) is str:  # Skip headers and comments
+            continue
+
+        try:
+            key = (rank(entry.seqid), entry.start)
+        except KeyError:
+            raise ValueError('seqid {0} is not in seqid_order'
+                             .format(entry.seqid))
+
+        if last is not None and key < last[0]:
+            raise ValueError('input {0} is not sorted by seqid and start: '
+                             '{1}:{2} follows {3}:{4}'
+                             .format(side + 1, entry.seqid, entry.start,
+                                     last[1].seqid, last[1].start))
+        last = (key, entry)
+
+        yield key, side, entry
+
+
+def gff3_overlap_join(reader_a, reader_b, stranded=False, seqid_order=None):
+    """Yield pairs of overlapping features from two sorted GFF3 inputs
+
+    Both inputs are read once, in the style of "bedtools intersect -sorted".
+    Features are merged by position and each side keeps only the features
+    that can still overlap a later feature, i.e. those ending at or after
+    the start of the current feature. Memory therefore depends on the
+    number of features overlapping any one position rather than file size.
+
+    Coordinates are 1-based and inclusive, as in GFF3 files.
+
+    Args:
+        reader_a (iterable): GFF3Entry instances sorted by seqid then start,
+            such as GFF3Reader.iterate(), or a GFF3Reader
+
+        reader_b (iterable): second input, sorted the same way as reader_a
+
+        stranded (bool): only pair features on the same strand, features
+            with an unknown strand (".") are never paired
+
+        seqid_order (list): order of seqids in both inputs
+            [default: lexicographic order]
+
+    Yields:
+        tuple: overlapping (GFF3Entry from reader_a, GFF3Entry from reader_b),
+            in order of the start of the later feature of each pair
+
+    Raises:
+        ValueError: If either input is not sorted
+
+    Example:
+        Note: These doctests will not pass, examples are only in doctest
+        format as per convention. bio_utils uses pytests for testing.
+
+        >>> genes = GFF3Reader(open('genes.sorted.gff3'))
+        >>> repeats = GFF3Reader(open('repeats.sorted.gff3'))
+        >>> for gene, repeat in gff3_overlap_join(genes, repeats):
+        ...     print(gene.attributes['ID'], repeat.attributes['ID'])
+    """
+
+    if seqid_order is None:
+        def rank(seqid):
+            return seqid
+    else:
+        rank = {seqid: index for index, seqid in
+                enumerate(seqid_order)}.__getitem__
+
+    inputs = []
+    for side, reader in enumerate((reader_a, reader_b)):
+        if hasattr(reader, 'iterate'):  # GFF3Reader given
+            reader = reader.iterate()
+        inputs.append(_sorted_features(reader, side, rank))
+
+    # Heaps of (end, tiebreaker, feature) for features that may still overlap
+    active = ([], [])
+    tiebreaker = count()
+    seqid = None
+
+    for key, side, feature in heapq.merge(*inputs, key=itemgetter(0)):
+
+        if feature.seqid != seqid:  # Features on new seqid
+            active = ([], [])
+            seqid = feature.seqid
+
+        # Remove features of both inputs that end before this one starts,
+        # later features start at or after it so cannot overlap them
+        start = feature.start
+        for heap in active:
+            while heap and heap[0][0] < start:
+                heapq.heappop(heap)
+        others = active[1 - side]
+
+        strand = feature.strand
+        for end, _, other in others:
+            if stranded and (strand == '.' or other.strand != strand):
+                continue
+            if side == 0:
+                yield feature, other
+            else:
+                yield other, feature
+
+        heapq.heappush(active[side], (feature.end, next(tiebreaker),
+                                      feature))
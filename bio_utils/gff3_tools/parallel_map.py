@@ -0,0 +1,160 @@
+#! /usr/bin/env python3
+
+"""Apply a function to each feature of a GFF3 file using several processes
+
+Copyright:
+
+    parallel_map.py parse GFF3 byte ranges in parallel
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from bio_utils.file_tools import line_byte_ranges
+from bio_utils.file_tools import ordered_map
+from bio_utils.file_tools import read_byte_range
+from bio_utils.iterators import GFF3Reader
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import mmap
+import os
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.1.0'
+
+
+def _find_fasta(byte_range, path):
+    """Return offset of a "##FASTA" directive in part of a GFF3 file
+
+    Args:
+        byte_range (tuple): (start, end) byte offsets to search, start must
+            be a line start
+
+        path (str): path of GFF3 file
+
+    Returns:
+        int: byte offset of first "##FASTA" line in range, None if absent
+    """
+
+    start, end = byte_range
+    if start == end:
+        return None
+
+    with open(path, 'rb') as handle, \
+            mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        position = start
+        while True:
+            position = data.find(b'##FASTA', position, end)
+            if position == -1:
+                return None
+            if position == 0 or data[position - 1] == 10:  # Line start
+                return position
+            position += 1
+
+
+def _map_range(byte_range, path, func, parse_attr):
+    """Apply a function to each feature in part of a GFF3 file
+
+    Args:
+        byte_range (tuple): (start, end) byte offsets of lines to parse
+
+        path (str): path of GFF3 file
+
+        func (function): function applied to each GFF3Entry
+
+        parse_attr (bool): parse attributes column of each entry
+
+    Returns:
+        list: return value of func for each feature in byte range
+    """
+
+    reader = GFF3Reader(read_byte_range(path, *byte_range))
+
+    return [func(entry) for entry in reader.iterate(parse_attr=parse_attr)]
+
+
+def parallel_gff3_map(path, func, workers=1, parse_attr=True,
+                      chunk_size=2 ** 24):
+    """Apply a function to each feature of a GFF3 file in worker processes
+
+    The file is split into byte ranges of about chunk_size bytes aligned to
+    line starts. Each worker first searches its ranges for a "##FASTA"
+    directive, and the features before the first one are then split again
+    and parsed by GFF3Reader in the workers. Directives and comments are
+    skipped. At most two ranges per worker are submitted ahead of the range
+    being yielded, so memory is bounded by the results of a few ranges
+    rather than by the size of the file.
+
+    Args:
+        path (str): path of uncompressed GFF3 file
+
+        func (function): function applied to each GFF3Entry, must be
+            picklable, i.e. defined at module level, if workers > 1
+
+        workers (int): number of processes to parse with
+
+        parse_attr (bool): parse attributes column of each entry
+
+        chunk_size (int): approximate number of bytes per range, the results
+            of a range are held in memory until they are yielded
+
+    Yields:
+        object: return value of func for each feature, in file order
+
+    Example:
+        Note: These doctests will not pass, examples are only in doctest
+        format as per convention. bio_utils uses pytests for testing.
+
+        >>> from operator import attrgetter
+        >>> types = parallel_gff3_map('test.gff3', attrgetter('type'), 8)
+        >>> from collections import Counter
+        >>> Counter(types)  # Number of features of each type
+    """
+
+    workers = max(1, workers)
+    chunk_size = max(1, chunk_size)
+    byte_ranges = line_byte_ranges(path, max(workers * 4,
+                                             os.path.getsize(path) //
+                                             chunk_size))
+    find_fasta = partial(_find_fasta, path=path)
+    map_range = partial(_map_range, path=path, func=func,
+                        parse_attr=parse_attr)
+
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+    def map_func(function, items):
+        if pool is None:
+            return map(function, items)
+        return ordered_map(pool, function, items, workers * 2)
+
+    try:
+        # Stop at the first "##FASTA" directive
+        for offset in map_func(find_fasta, byte_ranges):
+            if offset is not None:
+                byte_ranges = line_byte_ranges(path, max(workers * 4,
+                                                         offset // chunk_size),
+                                               end=offset)
+                break
+
+        for results in map_func(map_range, byte_ranges):
+            for result in results:
+                yield result
+
+    finally:
+        if pool is not None:
+            pool.shutdown()
@@ -26,15 +26,19 @@ from bio_utils.iterators.fasta import FastaEntry
 from bio_utils.iterators.fastq import fastq_iter
 from bio_utils.iterators.fastq import FastqEntry
 from bio_utils.iterators.gff3 import GFF3Reader
+from bio_utils.iterators.gff3 import GFF3Attributes
 from bio_utils.iterators.gff3 import GFF3Entry
+from bio_utils.iterators.gff3 import GFF3Writer
 from bio_utils.iterators.b6 import B6Reader
 from bio_utils.iterators.b6 import B6Entry
+from bio_utils.iterators.sam import sam_header
 from bio_utils.iterators.sam import sam_iter
 from bio_utils.iterators.sam import SamEntry
+from bio_utils.iterators.sam import SamHeader
 
 __author__ = 'Alex Hyer'
 __email__ = 'theonehyer@gmail.com'
 __license__ = 'GPLv3'
 __maintainer__ = 'Alex Hyer'
 __status__ = 'Production'
-__version__ = '3.1.1'
+__version__ = '3.4.0'
@@ -21,6 +21,7 @@ Copyright:
     along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+from bio_utils.file_tools.id_index import IdIndex
 from collections import OrderedDict
 import os
 import sys
@@ -30,7 +31,12 @@ __email__ = 'theonehyer@gmail.com'
 __license__ = 'GPLv3'
 __maintainer__ = 'Alex Hyer'
 __status__ = 'Production'
-__version__ = '5.0.1'
+__version__ = '5.3.2'
+
+
+# Suffixes of the query and subject ID indexes of a B6/M8 file
+QUERY_INDEX_SUFFIX = '.qidx'
+SUBJECT_INDEX_SUFFIX = '.sidx'
 
 
 class FormatError(Exception):
@@ -125,6 +131,123 @@ class B6Entry:
         return '{}{}'.format(fstr, os.linesep)
 
 
+# Attribute name and type of each default format specifier
+_DEFAULT_SPECS = OrderedDict([('qaccver', ('query', str)),
+                              ('saccver', ('subject', str)),
+                              ('pident', ('identity', float)),
+                              ('length', ('length', int)),
+                              ('mismatch', ('mismatches', int)),
+                              ('gapopen', ('gaps', int)),
+                              ('qstart', ('query_start', int)),
+                              ('qend', ('query_end', int)),
+                              ('sstart', ('subject_start', int)),
+                              ('send', ('subject_end', int)),
+                              ('evalue', ('evalue', float)),
+                              ('bitscore', ('bitscore', float))])
+
+# Format specifiers of the default BLAST+ B6/M8 columns
+DEFAULT_HEADER = list(_DEFAULT_SPECS)
+
+
+def compile_row_parser(header=DEFAULT_HEADER):
+    """Compile a function that parses B6/M8 lines with the columns of header
+
+    The column, attribute, and converter of each format specifier are fixed
+    by the header, so they are written into the source of a function once,
+    like collections.namedtuple does. Each line then costs a single split
+    and the type conversions.
+
+    Args:
+        header (list): format specifiers of the B6/M8 columns, only the first
+            of duplicate specifiers is used
+
+    Returns:
+        tuple: function taking a line and its line number, or another
+            position to name in errors, that returns a B6Entry of the line's
+            values, and the attribute name or custom
+            specifier of each unique column in order
+
+    Example:
+        Note: These doctests will not pass, examples are only in doctest
+        format as per convention. bio_utils uses pytests for testing.
+
+        >>> parse_row, spec_order = compile_row_parser(['qseqid', 'sseqid'])
+        >>> entry = parse_row('read_1\tcontig_7', 1)  # Line number for errors
+        >>> entry.query  # 'read_1'
+    """
+
+    # Store first column of each format specifier
+    columns = OrderedDict()
+    for index, specifier in enumerate(header):
+        if specifier not in columns:  # Ignore duplicate columns
+            columns[specifier] = index
+
+    spec_order = [_DEFAULT_SPECS[i][0] if i in _DEFAULT_SPECS else i
+                  for i in columns]
+    default_specs = [i for i in _DEFAULT_SPECS if i in columns]
+    custom_specs = [i for i in columns if i not in _DEFAULT_SPECS]
+    min_columns = max(columns.values()) + 1 if columns else 0
+
+    # Attributes of an empty entry, copied for each line
+    template = B6Entry().__dict__
+    template['fs_order'] = spec_order
+
+    def column_error(current_line):
+        """Raise FormatError for a line with too few columns"""
+
+        raise FormatError("line {!s}: the number of columns is less than the "
+                          "number of specifiers".format(current_line))
+
+    def type_error(split_line, current_line):
+        """Raise FormatError naming the first column of the wrong type"""
+
+        for spec in default_specs:
+            value = split_line[columns[spec]]
+            if value == '-':
+                continue
+            try:
+                _DEFAULT_SPECS[spec][1](value)
+            except ValueError:
+                raise FormatError("line {!s}: {} is of wrong type"
+                                  .format(current_line, spec))
+
+    # Write source of row function
+    source = ['def parse_row(line, current_line):',
+              '    split_line = line.split("\\t")',
+              '    if len(split_line) < {0}:'.format(min_columns),
+              '        column_error(current_line)',
+              '    attributes = template.copy()',
+              '    try:',
+              '        pass']  # Header may have no default specifiers
+    for spec in default_specs:
+        attr, convert = _DEFAULT_SPECS[spec]
+        source.append('        value = split_line[{0}]'.format(columns[spec]))
+        source.append('        attributes[{0!r}] = None if value == "-" else '
+                      '{1}'.format(attr, 'value' if convert is str
+                                   else convert.__name__ + '(value)'))
+    source.extend(['    except ValueError:',
+                   '        type_error(split_line, current_line)'])
+    if custom_specs:
+        source.append('    attributes["custom_fs"] = OrderedDict([')
+        for spec in custom_specs:
+            source.append('        ({0!r}, None if split_line[{1}] == "-" '
+                          'else split_line[{1}]),'.format(spec, columns[spec]))
+        source.append('    ])')
+    source.extend(['    data = new_entry(B6Entry)',
+                   '    data.__dict__ = attributes',
+                   '    return data'])
+
+    namespace = {'B6Entry': B6Entry,
+                 'OrderedDict': OrderedDict,
+                 'column_error': column_error,
+                 'new_entry': B6Entry.__new__,
+                 'template': template,
+                 'type_error': type_error}
+    exec('\n'.join(source), namespace)
+
+    return namespace['parse_row'], spec_order
+
+
 class B6Reader():
     """Class to read from B6/M8 files and store lines as B6Entry objects
 
@@ -132,21 +255,84 @@ class B6Reader():
         handle (file): B6/M8 file handle, can be any iterator so long as it
             it returns subsequent "lines" of a B6/M8 entry
 
-        filename (str): name of the B6 file
+        filename (str): name of the B6 file, None if handle has no name
     
         current_line (int): current line in file [default: 0]
+
+        query_index (IdIndex): index of query IDs, read from filename +
+            QUERY_INDEX_SUFFIX when first needed if None
+
+        subject_index (IdIndex): index of subject IDs, read from filename +
+            SUBJECT_INDEX_SUFFIX when first needed if None
     """
 
-    def __init__(self, handle):
+    def __init__(self, handle, query_index=None, subject_index=None):
         """Initialize variables to store B6/M8 file information"""
 
         self.handle = handle
-        self.filename = handle.name
+        self.filename = getattr(handle, 'name', None)
         self.current_line = 0
+        self.query_index = query_index
+        self.subject_index = subject_index
+
+    def _indexed_entries(self, parse_row, query, subject):
+        """Yield entries of IDs by reading their byte ranges from an index
+
+        Args:
+            parse_row (function): compiled row parser of the file's header
+
+            query (list): query IDs to read, None to read by subject
+
+            subject (list): subject IDs to read, None to read by query
 
-    def iterate(self, start_line=None, header: list=['qaccver', 'saccver', 
-        'pident', 'length', 'mismatch', 'gapopen', 'qstart', 'qend', 'sstart',
-        'send', 'evalue', 'bitscore'], comments: bool=False):
+        Yields:
+            B6Entry: entries of the IDs in file order
+        """
+
+        if self.filename is None:
+            raise ValueError('handle has no name, B6 file cannot be read '
+                             'by ID')
+
+        # Read from the query index if given, filter by subject
+        if query is not None:
+            if self.query_index is None:
+                self.query_index = IdIndex(self.filename +
+                                           QUERY_INDEX_SUFFIX)
+            index = self.query_index
+            names = query
+        else:
+            if self.subject_index is None:
+                self.subject_index = IdIndex(self.filename +
+                                             SUBJECT_INDEX_SUFFIX)
+            index = self.subject_index
+            names = subject
+        subjects = set(subject) if query is not None and \
+            subject is not None else None
+
+        byte_ranges = sorted(set(byte_range for name in names
+                                 for byte_range in index.ranges(name)))
+
+        # Read every range with one handle, naming lines by byte offset
+        with open(self.filename, 'rb') as handle:
+            readline = handle.readline
+            for start, end in byte_ranges:
+                handle.seek(start)
+                offset = start
+                while offset < end:
+                    line = readline()
+                    if not line:  # File shorter than index
+                        break
+                    line_start = offset
+                    offset += len(line)
+                    line = line.decode('utf-8').strip()
+                    if not line or line.startswith('#'):
+                        continue
+                    entry = parse_row(line, 'at byte {0}'.format(line_start))
+                    if subjects is None or entry.subject in subjects:
+                        yield entry
+
+    def iterate(self, start_line=None, header: list=DEFAULT_HEADER,
+        comments: bool=False, query=None, subject=None):
         """Iterate over B6/M8 file and return B6/M8 entries
 
         Args:
@@ -161,6 +347,14 @@ class B6Reader():
             comments (bool): Yields comments if True, else skips lines starting
                 with "#"
 
+            query (str): query ID, or list of them, to read only the entries
+                of by seeking to them with the query index of the file, see
+                bio_utils.blast_tools.b6_index
+
+            subject (str): subject ID, or list of them, to read only the
+                entries of with the subject index of the file, or to filter
+                the entries of query by
+
         Yields:
             B6Entry: class containing all B6/M8 data
 
@@ -199,45 +393,37 @@ class B6Reader():
             ...     print(entry.evalue)  # E-value of alignment
             ...     print(entry.bitscore)  # Bitscore of alignment
             ...     print(entry.write())  # Reconstituted B6 entry
+
+            >>> b6_index('test.b6out')  # Write query index once
+            >>> b6_reader = B6Reader(open('test.b6out'))
+            >>> for entry in b6_reader.iterate(query=['read_1', 'read_2']):
+            ...     print(entry.write())  # Entries of read_1 and read_2
         """
 
         handle = self.handle
 
         # Speed tricks: reduces function calls
-        split = str.split
         strip = str.strip
 
-        # Map attribute names to default format specifier names
-        def_map = {'query_end': ('qend', str), 
-                   'mismatches': ('mismatch', int), 
-                   'identity': ('pident', float), 
-                   'query': ('qaccver', str),
-                   'query_start': ('qstart', int), 
-                   'subject_start': ('sstart', int), 
-                   'bitscore': ('bitscore', float), 
-                   'evalue': ('evalue', float), 
-                   'gaps': ('gapopen', int), 
-                   'subject_end': ('send', int),
-                   'length': ('length', int), 
-                   'subject': ('saccver', str)
-                  }
-
-        def_map_rev = {j[0]: k for k, j in def_map.items()}
-        def_specs = list(def_map_rev.keys())
-
-        uheader = list(OrderedDict.fromkeys(header))
-        spec_order = [def_map_rev[i] if i in def_map_rev else i \
-                      for i in uheader]
-
-        # Store order of format specifiers
-        h = {}
-        for index, specifier in enumerate(header):
-            if specifier not in h:  # Ignor duplicate columns
-                h[specifier] = index
+        # Compile the column layout of the header once for every line
+        parse_row, spec_order = compile_row_parser(header)
+
+        # Read entries of IDs from an index
+        if query is not None or subject is not None:
+            if isinstance(query, str):
+                query = [query]
+            if isinstance(subject, str):
+                subject = [subject]
+            for entry in self._indexed_entries(parse_row, query, subject):
+                yield entry
+            return
 
         # Begin reading text
         if start_line is None:
-            line = next(handle)  # Read first B6/M8 entry
+            try:
+                line = next(handle)  # Read first B6/M8 entry
+            except StopIteration:  # Empty file
+                return
         else:
             line = start_line  # Set header to given header
 
@@ -251,6 +437,8 @@ class B6Reader():
             next_line = next
             line = strip(line)
 
+        data = None  # No entry is waiting to be yielded at EOF
+
         # Manual 'for' loop isn't needed to read the file properly and quickly,
         # unlike fasta_iter and fastq_iter, but it is necessary begin iterating
         # partway through a file when the user gives a starting line.
@@ -260,9 +448,6 @@ class B6Reader():
 
                 self.current_line += 1
 
-                data = B6Entry()
-                data.fs_order = spec_order  # All entries store original order
-
                 if line.startswith('#') and not comments:
                     line = strip(next_line(handle))
                     continue
@@ -271,59 +456,14 @@ class B6Reader():
                     line = strip(next_line(handle))
                     continue
 
-                split_line = split(line, '\t')
-
-                # Replace empty values with None
-                spec_values = [None if i == '-' else i for i in split_line]
-
-                # Add default specifiers
-                def_attrs = data.__dict__.keys()
-                for attr in def_attrs:
-                    try:
-                        def_spec, spec_type = def_map[attr]
-                    except KeyError:
-                        continue
-
-                    try:
-                        value = spec_values[h[def_spec]]
-                    except KeyError:  # Custom format, no value
-                        continue
-                    except IndexError:
-                        current_line = self.current_line
-                        raise FormatError("line {!s}: the number of columns "
-                            "is less than the number of specifiers"\
-                            .format(current_line))
-
-                    if type(value) != type(None):
-                        try:
-                            value = spec_type(value)
-                        except ValueError:
-                            current_line = self.current_line
-                            raise FormatError("line {!s}: {} is of wrong type"\
-                                .format(current_line, def_spec))
- 
-                    setattr(data, attr, value)
-
-                # Add non-default specifiers to custom_fs attribute
-                custom_specs = [i for i in sorted(h, key=h.get, reverse=False) \
-                                if i not in def_specs]
-
-                if custom_specs:
-                    data.custom_fs = OrderedDict()
-                    for key in custom_specs:
-                        try:
-                            value = spec_values[h[key]]
-                        except IndexError:
-                            current_line = self.current_line
-                            raise FormatError("line {!s}: the number of "
-                                "columns is less than the number of "
-                                "specifiers".format(current_line))
-
-                        data.custom_fs[key] = value
+                # All entries store original order of format specifiers
+                data = parse_row(line, self.current_line)
 
                 line = strip(next_line(handle))  # Raises StopIteration at EOF
 
                 yield data
+                data = None
 
         except StopIteration:  # Yield last B6/M8 entry
-            yield data
+            if data is not None:
+                yield data
@@ -21,15 +21,59 @@ Copyright:
     along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+from bio_utils.file_tools.bgzf import BgzfReader
+from bio_utils.file_tools.tabix import read_tabix_index
 from collections import OrderedDict
+from collections.abc import MutableMapping
+import mmap
+from operator import attrgetter
 import os
+from urllib.parse import unquote
 
 __author__ = 'Alex Hyer'
 __email__ = 'theonehyer@gmail.com'
 __license__ = 'GPLv3'
 __maintainer__ = 'Alex Hyer'
 __status__ = 'Production'
-__version__ = '4.0.0'
+__version__ = '4.6.0'
+
+
+# Percent-encodings of characters reserved in GFF3 attributes, the percent
+# sign itself, and control characters, e.g. tab and newline
+_ESCAPE_MAP = str.maketrans({char: '%{0:02X}'.format(ord(char)) for char in
+                             '=,;&%\x7f' + ''.join(map(chr, range(0x20)))})
+
+def _fasta_directive_end(handle):
+    """Return byte offset after the first "##FASTA" line of a binary file
+
+    Args:
+        handle (file): GFF3 file opened in binary mode
+
+    Returns:
+        int: byte offset of the line following "##FASTA"
+
+    Raises:
+        ValueError: If the file has no "##FASTA" line
+    """
+
+    with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        position = 0
+        while True:
+            position = data.find(b'##FASTA', position)
+            if position == -1:
+                raise ValueError('{0} has no ##FASTA line'
+                                 .format(handle.name))
+            if position == 0 or data[position - 1] == 10:  # Line start
+                break
+            position += 1
+        newline = data.find(b'\n', position)
+
+        return len(data) if newline == -1 else newline + 1
+
+
+# Complements of IUPAC nucleotide codes for reverse complementing sequences
+_COMPLEMENT = str.maketrans('ACGTURYKMBVDHSWNacgturykmbvdhswn',
+                            'TGCAAYRMKVBHDSWNtgcaayrmkvbhdswn')
 
 
 class FormatError(Exception):
@@ -49,6 +93,96 @@ class FastaFound(Exception):
         pass
 
 
+class GFF3Attributes(MutableMapping):
+    """Attributes of a GFF3 entry, parsed from the raw column when first used
+
+    Behaves like the OrderedDict previously created for every entry, with
+    tags as keys. Values containing commas are lists. Percent-encoded
+    characters in tags and values are decoded when the column is parsed.
+
+    Attributes:
+        raw (str): attributes column as it appeared in the GFF3 file
+
+        parsed (bool): True once the raw column has been parsed
+    """
+
+    __slots__ = ('raw', '_data')
+
+    def __init__(self, raw):
+        """Store raw attributes column without parsing it"""
+
+        self.raw = raw
+        self._data = None
+
+    @property
+    def parsed(self):
+        """Return True if the raw column has been parsed"""
+
+        return self._data is not None
+
+    def _parse(self):
+        """Parse raw column into an OrderedDict
+
+        Returns:
+            OrderedDict: attribute values keyed by tag
+        """
+
+        data = OrderedDict()
+        for attribute in self.raw.split(';'):
+            split_attribute = attribute.split('=')
+            key = split_attribute[0]
+            if key == '':  # Avoid semicolon split at end
+                continue
+            value = split_attribute[-1]
+            if '%' in key:
+                key = unquote(key)
+            if ',' in value:
+                value = [unquote(i) if '%' in i else i
+                         for i in value.split(',')]
+            elif '%' in value:
+                value = unquote(value)
+            data[key] = value
+
+        self._data = data
+
+        return data
+
+    def _dict(self):
+        """Return parsed attributes, parsing them if necessary"""
+
+        data = self._data
+        if data is None:
+            data = self._parse()
+
+        return data
+
+    def __getitem__(self, key):
+        return self._dict()[key]
+
+    def __setitem__(self, key, value):
+        self._dict()[key] = value
+
+    def __delitem__(self, key):
+        del self._dict()[key]
+
+    def __iter__(self):
+        return iter(self._dict())
+
+    def __len__(self):
+        return len(self._dict())
+
+    def __contains__(self, key):
+        return key in self._dict()
+
+    def __eq__(self, other):
+        if isinstance(other, GFF3Attributes):
+            other = other._dict()
+        return self._dict() == other
+
+    def __repr__(self):
+        return '{0}({1!r})'.format(type(self).__name__, self.raw)
+
+
 class GFF3Entry:
     """A simple class to store data from GFF3 entries and write them
 
@@ -71,10 +205,11 @@ class GFF3Entry:
         phase (int): int if phase given in file, else str. Required for
             features of type "CDS," indicates bases until next codon in feature
 
-        attributes (dict): OrderedDict if parse_attr is True, else str. Various
-            attributes formatted as "<tag>=<value>" with multiple attributes
-            separated by semicolons. If parse_attr true, creates dict where
-            tags are keys and values are values as follows (in YAML format):
+        attributes (dict): GFF3Attributes if parse_attr is True, else str.
+            Various attributes formatted as "<tag>=<value>" with multiple
+            attributes separated by semicolons. If parse_attr true, creates
+            a dict-like GFF3Attributes, parsed on first access, where tags
+            are keys and values are values as follows (in YAML format):
 
             Original String: tag1=value1;tag2=value2
 
@@ -98,6 +233,7 @@ class GFF3Entry:
         self.strand = None
         self.phase = None
         self.attributes = None
+        self._fields = None  # Columns as read from origline
 
     def overlap(self, feature, stranded: bool = False):
         """Determine if a feature's position overlaps with the entry
@@ -121,36 +257,36 @@ class GFF3Entry:
             feature_strand in ['+', '.'])):
             return False
 
-        iv_1 = set(range(feature.start, feature.end))
-        iv_2 = set(range(self.start, self.end))
-
-        if len(iv_1.intersection(iv_2)) > 0:
-            return True
-        else:
-            return False
+        # Same result as intersecting range(start, end) of each feature
+        return max(feature.start, self.start) < min(feature.end, self.end)
 
     def write(self):
         """Restore GFF3 entry to original format
 
+        Entries read by GFF3Reader whose columns are unchanged, and whose
+        attributes have not been accessed, are written as their original line
+        without formatting each column again.
+
         Returns:
             str: properly formatted string containing the GFF3 entry
         """
 
-        none_type = type(None)
-
-        # Format attributes for writing
-        attrs = self.attribute_string()
-
-        # Place holder if field value is NoneType
-        for attr in self.__dict__.keys():
-            if type(attr) == none_type:
-                setattr(self, attr, '.')
+        # Write original line if no column has changed since it was read
+        fields = self._fields
+        if fields is not None:
+            attrs = self.attributes
+            if type(attrs) is GFF3Attributes and attrs._data is None:
+                attrs = attrs.raw
+            if fields == (self.seqid, self.source, self.type, self.start,
+                          self.end, self._score_str, self.strand, self.phase,
+                          attrs):
+                return self.origline + os.linesep
 
         # Format entry for writing
         fstr = '{0}\t{1}\t{2}\t{3}\t{4}\t{5}\t{6}\t{7}\t{8}{9}'\
                .format(self.seqid, self.source, self.type, str(self.start),
                        str(self.end), self._score_str, self.strand, 
-                       self.phase, attrs, os.linesep)
+                       self.phase, self.attribute_string(), os.linesep)
 
         return fstr
 
@@ -161,28 +297,23 @@ class GFF3Entry:
         Returns:
             str: escaped attributes as tag=value pairs, separated by semi-colon
         """
-        escape_map = {ord('='): '%3D',
-                      ord(','): '%2C',
-                      ord(';'): '%3B',
-                      ord('&'): '%26',
-                      ord('\t'): '%09',
-                     }
-
-        list_type = type(list())
 
         attrs = self.attributes
-        if type(attrs) is OrderedDict:
+        if type(attrs) is GFF3Attributes and not attrs.parsed:
+            return attrs.raw  # Attributes never accessed, so unmodified
+        elif isinstance(attrs, MutableMapping):
             reserved_attrs = []
             other_attrs = []
 
             for name, value in attrs.items():
                 # Escape reserved characters
-                name = name.translate(escape_map)
+                name = name.translate(_ESCAPE_MAP)
 
-                if type(value) == list_type:
-                    value = ','.join([i.translate(escape_map) for i in value])
+                if type(value) is list:
+                    value = ','.join([i.translate(_ESCAPE_MAP)
+                                      for i in value])
                 else:
-                    value = value.translate(escape_map)
+                    value = value.translate(_ESCAPE_MAP)
 
                 # Regain original formatting of attribute column
                 out_attr = '{0}={1}'.format(name, value)
@@ -201,6 +332,86 @@ class GFF3Entry:
         return out_attrs
 
 
+class GFF3Writer:
+    """Class to write GFF3 entries to a file in batches
+
+    Lines are collected in a buffer and written with a single call once
+    buffer_size lines are held, so few writes are made to the handle.
+
+    Attributes:
+        handle (file): GFF3 file handle opened for writing
+
+        buffer_size (int): number of lines to hold before writing them
+    """
+
+    def __init__(self, handle, buffer_size=10000):
+        """Initialize variables to write GFF3 file"""
+
+        self.handle = handle
+        self.buffer_size = buffer_size
+        self._buffer = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.flush()
+
+    def write(self, entry):
+        """Buffer a GFF3 entry or header line, writing buffer if full
+
+        Args:
+            entry (GFF3Entry): entry to write, a str such as a header or
+                comment is written as a line
+        """
+
+        buffer = self._buffer
+        if type(entry) is str:
+            buffer.append(entry.rstrip('\r\n') + os.linesep)
+        else:
+            buffer.append(entry.write())
+
+        if len(buffer) >= self.buffer_size:
+            self.flush()
+
+    def write_entries(self, entries):
+        """Write many GFF3 entries or header lines
+
+        Args:
+            entries (iterable): GFF3Entry instances or str lines, such as
+                those yielded by GFF3Reader.iterate
+
+        Example:
+            Note: These doctests will not pass, examples are only in doctest
+            format as per convention. bio_utils uses pytests for testing.
+
+            >>> reader = GFF3Reader(open('test.gff3'))
+            >>> with GFF3Writer(open('out.gff3', 'w')) as writer:
+            ...     writer.write('##gff-version 3')
+            ...     writer.write_entries(reader.iterate())
+        """
+
+        buffer = self._buffer
+        append = buffer.append
+        buffer_size = self.buffer_size
+        linesep = os.linesep
+
+        for entry in entries:
+            if type(entry) is str:
+                append(entry.rstrip('\r\n') + linesep)
+            else:
+                append(entry.write())
+            if len(buffer) >= buffer_size:
+                self.flush()
+
+    def flush(self):
+        """Write all buffered lines to handle"""
+
+        if self._buffer:
+            self.handle.write(''.join(self._buffer))
+            del self._buffer[:]
+
+
 class GFF3Reader():
     """Class to read from GFF3 files and store lines as GFF3Entry objects
 
@@ -208,22 +419,381 @@ class GFF3Reader():
         handle (file): GFF3 file handle, can be any iterator so long as it
                 it returns subsequent "lines" of a GFF3 entry
 
-        filename (str): name of the GFF3 file
+        filename (str): name of the GFF3 file, None if handle has no name
 
         current_line (int): current line in file [default: 0]
+
+        index (TabixIndex): tabix index of a BGZF compressed GFF3 file, read
+            from "<filename>.tbi" on the first region query if not given
+
+        fasta_offset (int): position after the "##FASTA" directive, a byte
+            offset for files, or a virtual offset for BgzfReader handles.
+            None until it is found or if handle cannot seek, e.g. a pipe.
+
+        fasta_index (OrderedDict): (offset, length, line bases, line bytes)
+            tuples of sequences in the "##FASTA" section keyed by sequence
+            ID, where offset is the position of the sequence's first line.
+            Line bases and bytes are None if the lines of a sequence differ
+            in length. None until sequences are first extracted.
     """
 
-    def __init__(self, handle):
+    def __init__(self, handle, index=None):
         """Initialize variables to store GFF3 file information"""
 
         self.handle = handle
-        self.filename = handle.name
+        self.filename = getattr(handle, 'name', None)
         self.current_line = 0
+        self.index = index
+        self.fasta_offset = None
+        self.fasta_index = None
+        self._fasta_source = None  # Seekable handle of "##FASTA" section
+        self._fasta_jump = False  # Offsets of source can be added to
+        self._fasta_lines = None  # (handle, next_line) if it cannot seek
+        self._sequences = None  # Sequences read from unseekable handles
+
+    def _find_fasta(self, handle, next_line):
+        """Record where sequences following "##FASTA" can be read from
+
+        Args:
+            handle (iterator): iterator positioned after "##FASTA"
+
+            next_line (function): returns the next line of handle as str
+        """
+
+        if isinstance(handle, BgzfReader):  # Virtual offsets only
+            self._fasta_source = handle
+            self.fasta_offset = handle.tell()
+            return
+
+        if getattr(handle, 'seekable', None) is not None and \
+                handle.seekable():
+            try:
+                self.fasta_offset = handle.tell()
+            except OSError:  # Text files cannot tell while iterated
+                if self.filename is not None and \
+                        os.path.isfile(self.filename):
+                    source = open(self.filename, 'rb')
+                    self.fasta_offset = _fasta_directive_end(source)
+                    self._fasta_source = source
+                    self._fasta_jump = True
+                    return
+            else:
+                self._fasta_source = handle
+                self._fasta_jump = True
+                return
+
+        # Sequences can only be read by continuing from here
+        self._fasta_lines = (handle, next_line)
+
+    def _load_fasta(self):
+        """Index the "##FASTA" section on first use
+
+        Records of seekable handles are indexed by their offsets and read on
+        demand, while those of other handles are read into memory.
+
+        Raises:
+            ValueError: If no "##FASTA" section has been read
+        """
+
+        if self._fasta_source is not None:
+            self._index_fasta()
+        elif self._fasta_lines is not None:
+            self._read_fasta(*self._fasta_lines)
+            self._fasta_lines = None
+        else:
+            raise ValueError('no ##FASTA section has been read from '
+                             '{0}'.format(self.filename))
+
+    def _index_fasta(self):
+        """Index the offset, length, and line width of each sequence
+
+        Like a samtools FASTA index, a sequence whose lines all hold the
+        same number of bases, except a shorter last line, can be read from
+        any position without reading the lines before it.
+        """
+
+        source = self._fasta_source
+        source.seek(self.fasta_offset)
+        index = OrderedDict()
+        seq_id = None
+
+        while True:
+            raw = source.readline()
+            if not raw:
+                break
+            line = raw.decode('utf-8') if isinstance(raw, bytes) else raw
+            if line.startswith('>'):
+                if seq_id is not None:
+                    index[seq_id] = (offset, length, line_bases, line_bytes)
+                header = line[1:].split(None, 1)
+                seq_id = header[0] if header else ''
+                offset = source.tell()
+                length = 0
+                line_bases = line_bytes = None
+                uniform = True
+                short = False  # Last line read was shorter than the others
+                continue
+            if seq_id is None:
+                continue
+            bases = len(line.strip())
+            if line_bases is None:
+                line_bases = bases
+                line_bytes = len(raw)
+            elif short or bases > line_bases or \
+                    (bases == line_bases and len(raw) != line_bytes and
+                     line.endswith('\n')):
+                uniform = False
+            short = short or bases < line_bases
+            length += bases
+            if not uniform:
+                line_bases = line_bytes = False
+
+        if seq_id is not None:
+            index[seq_id] = (offset, length, line_bases, line_bytes)
+
+        # Lines of differing length are marked False while reading
+        self.fasta_index = OrderedDict(
+            (name, (offset, length, line_bases or None, line_bytes or None))
+            for name, (offset, length, line_bases, line_bytes)
+            in index.items())
+
+    def _read_fasta(self, handle, next_line):
+        """Read sequences following "##FASTA" from a handle that cannot seek
+
+        Args:
+            handle (iterator): iterator positioned after "##FASTA"
+
+            next_line (function): returns the next line of handle as str
+        """
+
+        pieces = OrderedDict()
+        seq_id = None
+
+        while True:
+            try:
+                line = next_line(handle).strip()
+            except StopIteration:
+                break
+            if line.startswith('>'):
+                header = line[1:].split(None, 1)
+                seq_id = header[0] if header else ''
+                pieces[seq_id] = []
+            elif line and seq_id is not None:
+                pieces[seq_id].append(line)
+
+        self._sequences = OrderedDict((name, ''.join(lines))
+                                      for name, lines in pieces.items())
+        self.fasta_index = OrderedDict(
+            (name, (None, len(sequence), None, None))
+            for name, sequence in self._sequences.items())
+
+    def _read_bases(self, seq_id, start, end):
+        """Return bases of a sequence from the "##FASTA" section
+
+        Args:
+            seq_id (str): sequence ID in fasta_index
+
+            start (int): 0-based position of first base
+
+            end (int): 0-based position after last base
+
+        Returns:
+            str: bases from start to end
+        """
+
+        if self._sequences is not None:
+            return self._sequences[seq_id][start:end]
+
+        offset, length, line_bases, line_bytes = self.fasta_index[seq_id]
+        source = self._fasta_source
+        if line_bases and self._fasta_jump:  # Seek to line of start
+            lines = start // line_bases
+            source.seek(offset + lines * line_bytes)
+            skip = start - lines * line_bases
+        else:
+            source.seek(offset)
+            skip = start
+
+        pieces = []
+        needed = end - start
+        while needed > 0:
+            line = source.readline()
+            if not line:
+                break
+            if isinstance(line, bytes):
+                line = line.decode('utf-8')
+            if line.startswith('>'):
+                break
+            line = line.strip()
+            if skip >= len(line):
+                skip -= len(line)
+                continue
+            piece = line[skip:skip + needed]
+            skip = 0
+            pieces.append(piece)
+            needed -= len(piece)
+
+        return ''.join(pieces)
+
+    def extract_sequence(self, entry):
+        """Return the sequence of a feature from the "##FASTA" section
+
+        Sequences are indexed on the first call and then read from their
+        file offsets as needed, so handle must not be closed after iterate
+        reaches the "##FASTA" directive. Handles that cannot seek, such as
+        pipes, have their sequences read into memory instead.
+
+        Args:
+            entry (GFF3Entry): feature to extract, or an iterable of the
+                GFF3Entry parts of a single feature, such as the CDS entries
+                of a transcript, which are joined in order of position
+
+        Returns:
+            str: feature sequence, reverse complemented if on the minus strand
+
+        Raises:
+            ValueError: If no "##FASTA" section has been read, or the
+                feature's sequence is missing from it or too short
+
+        Example:
+            Note: These doctests will not pass, examples are only in doctest
+            format as per convention. bio_utils uses pytests for testing.
+
+            >>> reader = GFF3Reader(open('test.gff3'))
+            >>> entries = list(reader.iterate())  # Stops at "##FASTA"
+            >>> reader.extract_sequence(entries[0])  # Sequence of feature
+        """
+
+        if self.fasta_index is None:
+            self._load_fasta()
+
+        if isinstance(entry, GFF3Entry):
+            parts = [entry]
+        else:
+            parts = sorted(entry, key=attrgetter('start'))
+            if not parts:
+                return ''
+
+        pieces = []
+        for part in parts:
+            try:
+                length = self.fasta_index[part.seqid][1]
+            except KeyError:
+                raise ValueError('sequence {0} not found in ##FASTA section '
+                                 'of {1}'.format(part.seqid, self.filename))
+            if part.end > length:
+                raise ValueError('feature {0}:{1}-{2} ends beyond sequence '
+                                 'length {3}'.format(part.seqid, part.start,
+                                                     part.end, length))
+            pieces.append(self._read_bases(part.seqid, part.start - 1,
+                                           part.end))
+
+        sequence = ''.join(pieces)
+        if parts[0].strand == '-':
+            sequence = sequence[::-1].translate(_COMPLEMENT)
+
+        return sequence
+
+    def cds_sequences(self, entries, feature_type='CDS'):
+        """Yield spliced CDS sequences of each parent feature
+
+        CDS entries are grouped by their Parent attributes, then each group is
+        joined in order of position by extract_sequence.
+
+        Args:
+            entries (iterable): GFF3Entry instances with parsed attributes,
+                such as those yielded by iterate, strings are ignored
+
+            feature_type (str): type of the entries to splice
+
+        Yields:
+            tuple: (parent ID, sequence) in order of first appearance
+
+        Raises:
+            TypeError: If attributes of an entry are not parsed
+
+        Example:
+            Note: These doctests will not pass, examples are only in doctest
+            format as per convention. bio_utils uses pytests for testing.
+
+            >>> reader = GFF3Reader(open('prokka.gff3'))
+            >>> entries = list(reader.iterate())  # Stops at "##FASTA"
+            >>> for parent, sequence in reader.cds_sequences(entries):
+            ...     print(parent)  # ID of transcript or gene
+            ...     print(sequence)  # Spliced coding sequence
+        """
+
+        groups = OrderedDict()
+        for entry in entries:
+            if type(entry) is str or entry.type != feature_type:
+                continue
+            if isinstance(entry.attributes, str):
+                raise TypeError('attributes must be parsed to group {0} '
+                                'entries by Parent'.format(feature_type))
+            parents = entry.attributes.get('Parent')
+            if parents is None:  # Unspliced feature, e.g. prokaryotic CDS
+                parents = entry.attributes.get('ID')
+            if parents is None:
+                continue
+            if type(parents) is not list:
+                parents = [parents]
+            for parent in parents:
+                groups.setdefault(parent, []).append(entry)
+
+        for parent, parts in groups.items():
+            yield parent, self.extract_sequence(parts)
+
+    def _region_lines(self, region):
+        """Yield lines of features overlapping a region using a tabix index
+
+        Args:
+            region (tuple): (seqid, start, end) with 1-based, inclusive start
+                and end as in GFF3 files
+
+        Yields:
+            bytes: lines of features overlapping region in file order
+
+        Raises:
+            ValueError: If handle is not a BgzfReader
+        """
+
+        reader = self.handle
+        if not isinstance(reader, BgzfReader):
+            raise ValueError('region queries require a BgzfReader handle of '
+                             'a BGZF compressed GFF3 file')
+
+        if self.index is None:
+            self.index = read_tabix_index(self.filename + '.tbi')
+
+        seqid, start, end = region
+        seqid_bytes = seqid.encode('utf-8')
+        split = bytes.split
+
+        for chunk_start, chunk_end in self.index.chunks(seqid, start - 1,
+                                                        end):
+            reader.seek(chunk_start)
+            while reader.tell() < chunk_end:
+                line = reader.readline()
+                if not line:
+                    break
+                if line.startswith(b'#'):
+                    continue
+                fields = split(line, b'\t', 5)
+                if fields[0] != seqid_bytes:
+                    continue
+                feature_start = int(fields[3])
+                if feature_start > end:  # Sorted, so no later overlaps
+                    return
+                if int(fields[4]) >= start:
+                    yield line
 
     def iterate(self, start_line=None, parse_attr=True, headers=False, 
-        comments=False):
+        comments=False, region=None):
         """Iterate over GFF3 file, returning GFF3 entries
 
+        Iteration stops at a "##FASTA" directive, and the sequences following
+        it are read by extract_sequence when first needed.
+
         Args:
             start_line (str): Next GFF3 entry. If 'handle' has been partially
                 read and you want to start iterating at the next entry, read 
@@ -236,18 +806,26 @@ class GFF3Reader():
                 tag1: value1
                 tag2: value2
 
+                The column is only parsed when attributes are first accessed,
+                so attributes cost little if they are never used.
+
             headers (bool): Yields headers if True, else skips lines starting 
                 with "##"
 
             comments (bool): Yields comments if True, else skips lines starting
                 with "#"
 
+            region (tuple): (seqid, start, end) with 1-based, inclusive start
+                and end. Only features overlapping region are yielded, read
+                by seeking to them with the tabix index of a BGZF compressed
+                GFF3 file. Requires handle to be a BgzfReader.
+
         Yields:
             GFF3Entry: class containing all GFF3 data, yields str for headers 
                 if headers options is True then yields GFF3Entry for entries
 
         Examples:
-            The following three examples demonstrate how to use gff3_iter.
+            The following four examples demonstrate how to use gff3_iter.
             Note: These doctests will not pass, examples are only in doctest
             format as per convention. bio_utils uses pytests for testing.
 
@@ -290,16 +868,27 @@ class GFF3Reader():
             ...     print(entry.attributes['attr1'])  # Print attribute 'attr1'
             ...     print(entry.attributes['attr2'])  # Print attribute 'attr2'
             ...     print(entry.write())  # Reconstituted GFF3 entry
+
+            >>> tabix_index('test.gff3.gz', 'test.gff3.gz.tbi', stop='##FASTA')
+            >>> reader = GFF3Reader(BgzfReader('test.gff3.gz'))
+            >>> for entry in reader.iterate(region=('contig7', 10000, 20000)):
+            ...     print(entry.write())  # Feature overlapping region
         """
 
-        handle = self.handle
+        if region is not None:
+            handle = self._region_lines(region)
+        else:
+            handle = self.handle
 
         # Speed tricks: reduces function calls
         split = str.split
         strip = str.strip
 
         if start_line is None:
-            line = next(handle)  # Read first GFF3
+            try:
+                line = next(handle)  # Read first GFF3
+            except StopIteration:  # No lines, e.g. region without features
+                return
         else:
             line = start_line  # Set header to given header
 
@@ -361,18 +950,17 @@ class GFF3Reader():
                     data.phase = int(split_line[7])
                 except ValueError:
                     data.phase = split_line[7]
-                data.attributes = split_line[8]
 
+                # Attributes are parsed when first accessed
                 if parse_attr:
-                    attributes = split(data.attributes, ';')
-                    data.attributes = OrderedDict()
-                    for attribute in attributes:
-                        split_attribute = attribute.split('=')
-                        key = split_attribute[0]
-                        value = split_attribute[-1].split(',') if ',' in \
-                                split_attribute[-1] else split_attribute[-1]
-                        if not key == '':  # Avoid semicolon split at end
-                            data.attributes[key] = value
+                    data.attributes = GFF3Attributes(split_line[8])
+                else:
+                    data.attributes = split_line[8]
+
+                # Store columns so that write can detect changes
+                data._fields = (data.seqid, data.source, data.type,
+                                data.start, data.end, data._score_str,
+                                data.strand, data.phase, split_line[8])
 
                 line = strip(next_line(handle))  # Raises StopIteration at EOF
 
@@ -384,4 +972,4 @@ class GFF3Reader():
             else:  #handle case where GFF ends in comment
                 pass
         except FastaFound:  # When FASTA found, last entry is repeat so pass
-            pass
+            self._find_fasta(handle, next_line)
@@ -21,6 +21,7 @@ Copyright:
     along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+from collections import OrderedDict
 import os
 
 __author__ = 'Alex Hyer'
@@ -28,7 +29,7 @@ __email__ = 'theonehyer@gmail.com'
 __license__ = 'GPLv3'
 __maintainer__ = 'Alex Hyer'
 __status__ = 'Production'
-__version__ = '3.0.2'
+__version__ = '3.3.0'
 
 
 class SamEntry:
@@ -61,6 +62,9 @@ class SamEntry:
             seq (str): sequence of query sequence, * if no sequence
 
             qual (str): quality scores of query sequence, * if no scores
+
+            tags (list): optional fields following qual, e.g. "NM:i:0",
+                         as they appear in the file
     """
 
     def __init__(self):
@@ -77,33 +81,185 @@ class SamEntry:
         self.tlen = None
         self.seq = None
         self.qual = None
+        self.tags = []
 
-    def write(self):
+    def write(self, tags=True):
         """Return SAM formatted string
 
+        Args:
+            tags (bool): include optional fields
+
         Returns:
             str: SAM formatted string containing entire SAM entry
         """
 
         return '{0}\t{1}\t{2}\t{3}\t{4}\t' \
                '{5}\t{6}\t{7}\t{8}\t{9}\t' \
-               '{10}{11}'.format(self.qname,
-                                 str(self.flag),
-                                 self.rname,
-                                 str(self.pos),
-                                 str(self.mapq),
-                                 self.cigar,
-                                 self.rnext,
-                                 str(self.pnext),
-                                 str(self.tlen),
-                                 self.seq,
-                                 self.qual,
-                                 os.linesep)
-
-
-def sam_iter(handle, start_line=None, headers=False):
+               '{10}{11}{12}'.format(self.qname,
+                                  str(self.flag),
+                                  self.rname,
+                                  str(self.pos),
+                                  str(self.mapq),
+                                  self.cigar,
+                                  self.rnext,
+                                  str(self.pnext),
+                                  str(self.tlen),
+                                  self.seq,
+                                  self.qual,
+                                  ''.join('\t' + tag for tag in self.tags)
+                                  if tags and self.tags else '',
+                                  os.linesep)
+
+
+class SamHeader:
+    """A simple class to store data from SAM header lines and write them
+
+    Attributes:
+        version (str): SAM format version from the @HD line
+
+        sort_order (str): sort order from the @HD line, e.g. "coordinate"
+
+        references (OrderedDict): lengths of reference sequences keyed by
+            name, in the order of @SQ lines
+
+        reference_ids (dict): integer ID of each reference sequence keyed by
+            name, IDs count up from zero in the order of @SQ lines
+
+        reference_names (list): reference sequence names indexed by ID
+
+        read_groups (OrderedDict): @RG records keyed by read group ID, each
+            record is an OrderedDict of tags and values
+
+        programs (OrderedDict): @PG records keyed by program ID, each record
+            is an OrderedDict of tags and values
+
+        comments (list): text of @CO lines
+
+        lines (list): all header lines in original order
+    """
+
+    def __init__(self):
+        """Initialize variables to store SAM header data"""
+
+        self.version = None
+        self.sort_order = None
+        self.references = OrderedDict()
+        self.reference_ids = {}
+        self.reference_names = []
+        self.read_groups = OrderedDict()
+        self.programs = OrderedDict()
+        self.comments = []
+        self.lines = []
+
+    def add_line(self, line):
+        """Parse a header line and store its data
+
+        Args:
+            line (str): SAM header line starting with "@"
+        """
+
+        line = line.rstrip('\r\n')
+        self.lines.append(line)
+
+        record_type = line[:3]
+        if record_type == '@CO':
+            self.comments.append(line[4:])
+            return
+
+        record = OrderedDict()
+        for field in line.split('\t')[1:]:
+            tag, _, value = field.partition(':')
+            record[tag] = value
+
+        if record_type == '@SQ':
+            name = record['SN']
+            if name not in self.reference_ids:
+                self.reference_ids[name] = len(self.reference_names)
+                self.reference_names.append(name)
+            self.references[name] = int(record['LN'])
+        elif record_type == '@HD':
+            self.version = record.get('VN')
+            self.sort_order = record.get('SO')
+        elif record_type == '@RG':
+            self.read_groups[record.get('ID')] = record
+        elif record_type == '@PG':
+            self.programs[record.get('ID')] = record
+
+    def write(self):
+        """Return SAM formatted header
+
+        The @HD line is rebuilt from the version and sort_order attributes
+        so that changes to either are written, all other lines are written
+        as they were read.
+
+        Returns:
+            str: SAM formatted string containing all header lines
+        """
+
+        lines = [line for line in self.lines if not line.startswith('@HD')]
+
+        hd_line = [line for line in self.lines if line.startswith('@HD')]
+        if hd_line or self.version or self.sort_order:
+            fields = [field for field in hd_line[0].split('\t')[1:]
+                      if field[:3] not in ('VN:', 'SO:')] if hd_line else []
+            if self.sort_order:
+                fields.insert(0, 'SO:{0}'.format(self.sort_order))
+            fields.insert(0, 'VN:{0}'.format(self.version or '1.6'))
+            lines.insert(0, '\t'.join(['@HD'] + fields))
+
+        return ''.join(['{0}{1}'.format(line, os.linesep) for line in lines])
+
+
+def sam_header(handle, start_line=None):
+    """Read header lines from the start of a SAM file
+
+    Reads lines until the first SAM entry, which is returned so that it can
+    be passed to sam_iter as 'start_line.'
+
+    Args:
+        handle (file): SAM file handle, can be any iterator so long as it
+            it returns subsequent "lines" of a SAM file
+
+        start_line (str): first line of the SAM file, if 'handle' has been
+            partially read
+
+    Returns:
+        tuple: SamHeader containing all header data and the first SAM entry
+            line as a str, None if the file contains no entries
+
+    Example:
+        Note: These doctests will not pass, examples are only in doctest
+        format as per convention. bio_utils uses pytests for testing.
+
+        >>> sam_handle = open('test.sam')
+        >>> header, first_line = sam_header(sam_handle)
+        >>> print(header.references['contig1'])  # Length of contig1
+        >>> for entry in sam_iter(sam_handle, start_line=first_line):
+        ...     print(header.reference_ids[entry.rname])  # Reference ID
+    """
+
+    header = SamHeader()
+
+    line = next(handle, None) if start_line is None else start_line
+    while line is not None:
+        # Decode a copy so the entry line is returned as it was read
+        text = line.decode('utf-8') if isinstance(line, bytes) else line
+        if not text.startswith('@'):
+            break
+        header.add_line(text)
+        line = next(handle, None)
+
+    return header, line
+
+
+def sam_iter(handle, start_line=None, headers=False, require_flags=0,
+             exclude_flags=0, min_mapq=0, references=None):
     """Iterate over SAM file and return SAM entries
 
+    The filtering arguments are evaluated on the first five fields of each
+    line before the line is fully split, so entries that fail a filter are
+    skipped without creating a SamEntry.
+
     Args:
         handle (file): SAM file handle, can be any iterator so long as it
             it returns subsequent "lines" of a SAM entry
@@ -116,6 +272,16 @@ def sam_iter(handle, start_line=None, headers=False):
         headers (bool): Yields headers if True, else skips lines starting with
             "@"
 
+        require_flags (int): only yield entries with all of these flag bits
+            set
+
+        exclude_flags (int): skip entries with any of these flag bits set
+
+        min_mapq (int): skip entries with a mapping quality below this value
+
+        references (iterable): only yield entries aligned to these reference
+            names, all entries are yielded if None
+
     Yields:
         SamEntry: class containing all SAM data, yields str for headers if
             headers options is True then yields GamEntry for entries
@@ -155,6 +321,10 @@ def sam_iter(handle, start_line=None, headers=False):
         ...     print(entry.seq)  # Print query sequence
         ...     print(entry.qual)  # Print query quality scores
         ...     print(entry.write())  # Print whole SAM entry
+
+        >>> for entry in sam_iter(open('test.sam'), exclude_flags=0x904,
+        ...                       min_mapq=20):
+        ...     print(entry.qname)  # Primary alignments with MAPQ >= 20
     """
 
     # Speed tricks: reduces function calls
@@ -163,6 +333,12 @@ def sam_iter(handle, start_line=None, headers=False):
 
     next_line = next
 
+    # Only check raw lines if a filter differs from its default
+    filtering = require_flags or exclude_flags or min_mapq \
+        or references is not None
+    if references is not None:
+        references = set(references)
+
     if start_line is None:
         line = next_line(handle)  # Read first B6/M8 entry
     else:
@@ -177,6 +353,7 @@ def sam_iter(handle, start_line=None, headers=False):
     else:
         line = strip(line)
 
+    data = None  # No entry is waiting to be yielded at EOF
 
     # A manual 'for' loop isn't needed to read the file properly and quickly,
     # unlike fasta_iter and fastq_iter, but it is necessary begin iterating
@@ -185,8 +362,6 @@ def sam_iter(handle, start_line=None, headers=False):
 
         while True:  # Loop until StopIteration Exception raised
 
-            split_line = split(line, '\t')
-
             if line.startswith('@') and not headers:
                 line = strip(next_line(handle))
                 continue
@@ -195,6 +370,23 @@ def sam_iter(handle, start_line=None, headers=False):
                 line = strip(next_line(handle))
                 continue
 
+            if filtering:  # Only split QNAME through MAPQ
+                fields = split(line, '\t', 5)
+                try:
+                    flag = int(fields[1])
+                except ValueError:  # Hex bit flag
+                    flag = int(fields[1], 16)
+
+                if flag & require_flags != require_flags \
+                        or flag & exclude_flags \
+                        or int(fields[4]) < min_mapq \
+                        or (references is not None
+                            and fields[2] not in references):
+                    line = strip(next_line(handle))
+                    continue
+
+            split_line = split(line, '\t')
+
             data = SamEntry()
             data.qname = split_line[0]
             try:  # Differentiate between int and hex bit flags
@@ -210,10 +402,13 @@ def sam_iter(handle, start_line=None, headers=False):
             data.tlen = int(split_line[8])
             data.seq = split_line[9]
             data.qual = split_line[10]
+            data.tags = split_line[11:]
 
             line = strip(next_line(handle))  # Raises StopIteration at EOF
 
             yield data
+            data = None
 
     except StopIteration:  # Yield last SAM entry
-        yield data
+        if data is not None:
+            yield data
@@ -0,0 +1,33 @@
+#! /usr/bin/env python3
+
+"""Package containing functions for sorting and summarizing SAM files
+
+Copyright:
+
+    __init__.py functions for sorting and summarizing SAM files
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from bio_utils.sam_tools.cigar_blocks import cigar_blocks
+from bio_utils.sam_tools.count_features import count_features
+from bio_utils.sam_tools.count_features import FeatureCounts
+from bio_utils.sam_tools.coverage import coverage
+from bio_utils.sam_tools.coverage import Coverage
+from bio_utils.sam_tools.sam_stats import sam_stats
+from bio_utils.sam_tools.sam_stats import SamStats
+from bio_utils.sam_tools.sort_sam import sort_sam
+
+__version__ = '1.3.0'
@@ -0,0 +1,77 @@
+#! /usr/bin/env python3
+
+"""Convert a SAM alignment's CIGAR string into aligned reference blocks
+
+Copyright:
+
+    cigar_blocks.py reference blocks covered by a CIGAR alignment
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import re
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.0.0'
+
+
+_CIGAR_OP = re.compile(r'(\d+)([MIDNSHP=X])')
+
+
+def cigar_blocks(pos, cigar):
+    """Return the reference intervals aligned to bases of the query
+
+    Matches and mismatches (M, =, X) produce blocks. Deletions (D) and
+    skipped regions such as introns (N) advance along the reference without
+    producing a block, and the remaining operations do not consume the
+    reference at all.
+
+    Args:
+        pos (int): 1-based leftmost position of the alignment, as in the POS
+            field of a SAM entry
+
+        cigar (str): CIGAR string of the alignment
+
+    Returns:
+        list: (start, end) tuples of 0-based, half-open reference intervals,
+            empty if the CIGAR string is "*"
+
+    Examples:
+        >>> cigar_blocks(1, '3M2D4M')
+        [(0, 3), (5, 9)]
+        >>> cigar_blocks(101, '5S10M500N10M')
+        [(100, 110), (610, 620)]
+    """
+
+    blocks = []
+    append = blocks.append
+
+    start = pos - 1
+    for length, op in _CIGAR_OP.findall(cigar):
+        if op in 'M=X':
+            end = start + int(length)
+            if blocks and blocks[-1][1] == start:  # Join adjacent blocks
+                blocks[-1] = (blocks[-1][0], end)
+            else:
+                append((start, end))
+            start = end
+        elif op in 'DN':
+            start += int(length)
+
+    return blocks
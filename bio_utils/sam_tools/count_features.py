@@ -0,0 +1,482 @@
+#! /usr/bin/env python3
+
+"""Count reads aligned to GFF3 features, like htseq-count and featureCounts
+
+Usage:
+
+    count_features.py [--feature_type <type>] [--attribute <tag>]
+                      [--stranded <yes|no|reverse>]
+                      [--mode <union|intersection-strict|
+                               intersection-nonempty>]
+                      [--nonunique <none|all>] [--min_mapq <int>]
+                      [--threads <int>] [--output <output file>]
+                      <SAM file> <GFF3 file>
+
+Copyright:
+
+    count_features.py count SAM reads aligned to GFF3 features
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import argparse
+from bio_utils.file_tools import line_byte_ranges
+from bio_utils.file_tools import read_byte_range
+from bio_utils.gff3_tools import GFF3IntervalIndex
+from bio_utils.iterators import GFF3Reader
+from bio_utils.iterators import sam_iter
+from bio_utils.sam_tools.cigar_blocks import cigar_blocks
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import os
+import sys
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.0.0'
+
+
+# Assigner used by worker processes, set once per process by _init_worker
+_WORKER_ASSIGNER = None
+
+
+class FeatureCounts:
+    """A simple class to store reads assigned to features and write them
+
+    Attributes:
+        counts (OrderedDict): number of reads assigned to each feature, keyed
+            by attribute value in order of appearance in the GFF3 file
+
+        no_feature (int): reads overlapping no feature
+
+        ambiguous (int): reads overlapping more than one feature
+
+        too_low_aqual (int): reads below the minimum mapping quality
+
+        not_aligned (int): unmapped reads
+    """
+
+    def __init__(self, names=()):
+        """Initialize variables to store read counts"""
+
+        self.counts = OrderedDict((name, 0) for name in names)
+        self.no_feature = 0
+        self.ambiguous = 0
+        self.too_low_aqual = 0
+        self.not_aligned = 0
+
+    def merge(self, other):
+        """Add counts of another FeatureCounts to this one
+
+        Args:
+            other (FeatureCounts): counts of other reads
+        """
+
+        counts = self.counts
+        for name, count in other.counts.items():
+            counts[name] = counts.get(name, 0) + count
+        self.no_feature += other.no_feature
+        self.ambiguous += other.ambiguous
+        self.too_low_aqual += other.too_low_aqual
+        self.not_aligned += other.not_aligned
+
+    def write(self):
+        """Return counts table formatted like htseq-count
+
+        Returns:
+            str: feature name and count per line, followed by lines counting
+                unassigned reads
+        """
+
+        lines = ['{0}\t{1}{2}'.format(name, count, os.linesep)
+                 for name, count in self.counts.items()]
+        for name in ('no_feature', 'ambiguous', 'too_low_aqual',
+                     'not_aligned'):
+            lines.append('__{0}\t{1}{2}'.format(name, getattr(self, name),
+                                                os.linesep))
+
+        return ''.join(lines)
+
+
+def _merge_intervals(intervals):
+    """Merge overlapping and adjacent 0-based, half-open intervals
+
+    Args:
+        intervals (list): (start, end) tuples
+
+    Returns:
+        list: sorted, disjoint (start, end) tuples
+    """
+
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+
+    return merged
+
+
+def _covers(merged, segments):
+    """Return True if merged intervals contain every segment
+
+    Args:
+        merged (list): sorted, disjoint (start, end) tuples
+
+        segments (list): (start, end) tuples to test
+
+    Returns:
+        bool: True if each segment lies within a single merged interval
+    """
+
+    for start, end in segments:
+        if not any(interval[0] <= start and end <= interval[1]
+                   for interval in merged):
+            return False
+
+    return True
+
+
+class _FeatureAssigner:
+    """Index GFF3 features and assign SAM entries to them
+
+    Attributes:
+        names (list): attribute values of features in order of appearance
+
+        index (GFF3IntervalIndex): index of features of the requested type
+
+        ids (dict): tuples of attribute values keyed by feature
+    """
+
+    def __init__(self, features, feature_type, attribute, stranded, mode,
+                 nonunique, min_mapq, exclude_flags):
+        """Index features and store assignment settings"""
+
+        if stranded not in ('yes', 'no', 'reverse'):
+            raise ValueError('stranded must be "yes", "no", or "reverse", '
+                             'not {0}'.format(stranded))
+        if mode not in ('union', 'intersection-strict',
+                        'intersection-nonempty'):
+            raise ValueError('mode must be "union", "intersection-strict", '
+                             'or "intersection-nonempty", not '
+                             '{0}'.format(mode))
+        if nonunique not in ('none', 'all'):
+            raise ValueError('nonunique must be "none" or "all", not '
+                             '{0}'.format(nonunique))
+
+        if isinstance(features, GFF3Reader):
+            features = features.iterate()
+
+        selected = []
+        names = OrderedDict()
+        self.ids = {}
+        for feature in features:
+            if type(feature) is str or feature.type != feature_type:
+                continue
+            value = feature.attributes.get(attribute)
+            if value is None:
+                raise ValueError('{0} feature at {1}:{2} lacks a {3} '
+                                 'attribute'.format(feature_type,
+                                                    feature.seqid,
+                                                    feature.start,
+                                                    attribute))
+            value = tuple(value) if type(value) is list else (value,)
+            for name in value:
+                names[name] = None
+            self.ids[feature] = value
+            selected.append(feature)
+
+        self.names = list(names)
+        self.index = GFF3IntervalIndex(selected, stranded=stranded != 'no')
+        self.stranded = stranded
+        self.mode = mode
+        self.nonunique = nonunique
+        self.min_mapq = min_mapq
+        self.exclude_flags = exclude_flags
+
+    def assign(self, entry, counts):
+        """Assign a SAM entry to features and add it to counts
+
+        Args:
+            entry (SamEntry): alignment to assign
+
+            counts (FeatureCounts): counts to add entry to
+        """
+
+        flag = entry.flag if type(entry.flag) is int else int(entry.flag, 0)
+        if flag & 4:
+            counts.not_aligned += 1
+            return
+        if flag & self.exclude_flags:
+            return
+        if entry.mapq < self.min_mapq:
+            counts.too_low_aqual += 1
+            return
+
+        strand = None
+        if self.stranded != 'no':
+            reverse = bool(flag & 16)
+            if flag & 129 == 129:  # Second mate of a pair
+                reverse = not reverse
+            if self.stranded == 'reverse':
+                reverse = not reverse
+            strand = '-' if reverse else '+'
+
+        # Features overlapping each aligned block of the read
+        blocks = cigar_blocks(entry.pos, entry.cigar)
+        overlapping = self.index.overlapping
+        ids = self.ids
+        intervals = OrderedDict()  # Clipped feature intervals keyed by ID
+        for block_start, block_end in blocks:
+            for feature in overlapping(entry.rname, block_start + 1,
+                                       block_end, strand):
+                interval = (max(feature.start - 1, block_start),
+                            min(feature.end, block_end))
+                for name in ids[feature]:
+                    intervals.setdefault(name, []).append(interval)
+
+        if self.mode == 'union':
+            names = list(intervals)
+        else:
+            if self.mode == 'intersection-strict':
+                segments = blocks
+            else:  # Positions covered by any feature
+                segments = _merge_intervals([interval for parts in
+                                             intervals.values()
+                                             for interval in parts])
+            names = [name for name, parts in intervals.items()
+                     if _covers(_merge_intervals(parts), segments)]
+
+        if len(names) == 1:
+            counts.counts[names[0]] += 1
+        elif not names:
+            counts.no_feature += 1
+        else:
+            counts.ambiguous += 1
+            if self.nonunique == 'all':
+                for name in names:
+                    counts.counts[name] += 1
+
+    def count(self, entries):
+        """Assign SAM entries to features
+
+        Args:
+            entries (iterable): SamEntry instances, header lines are ignored
+
+        Returns:
+            FeatureCounts: counts of entries
+        """
+
+        counts = FeatureCounts(self.names)
+        assign = self.assign
+        for entry in entries:
+            if type(entry) is not str:
+                assign(entry, counts)
+
+        return counts
+
+
+def _init_worker(assigner):
+    """Store feature assigner in a worker process"""
+
+    global _WORKER_ASSIGNER
+    _WORKER_ASSIGNER = assigner
+
+
+def _count_range(byte_range, path):
+    """Assign SAM entries in part of a SAM file to features
+
+    Args:
+        byte_range (tuple): (start, end) byte offsets of lines to count
+
+        path (str): path of SAM file
+
+    Returns:
+        FeatureCounts: counts of entries in byte range
+    """
+
+    if byte_range[0] == byte_range[1]:
+        return FeatureCounts(_WORKER_ASSIGNER.names)
+
+    return _WORKER_ASSIGNER.count(sam_iter(read_byte_range(path,
+                                                           *byte_range)))
+
+
+def count_features(sam, features, feature_type='CDS', attribute='ID',
+                   stranded='no', mode='union', nonunique='none', min_mapq=0,
+                   exclude_flags=0x900, threads=1):
+    """Count reads aligned to GFF3 features
+
+    Features of feature_type are grouped by an attribute and indexed in a
+    GFF3IntervalIndex. Each alignment is split into aligned blocks by its
+    CIGAR string, and the features overlapping the blocks are resolved to a
+    single group with the htseq-count modes:
+
+        union: features overlapping any aligned base
+
+        intersection-strict: features covering every aligned base
+
+        intersection-nonempty: features covering every aligned base that is
+            covered by any feature
+
+    Each alignment is counted separately, as by featureCounts without
+    fragment counting, so a SAM file can be split into byte ranges and
+    counted in parallel.
+
+    Args:
+        sam (str): path of SAM file, which is counted by threads processes,
+            or an iterable of SamEntry instances, such as those yielded by
+            sam_iter, counted by this process
+
+        features (GFF3Reader): reader of GFF3 file, or an iterable of
+            GFF3Entry instances with parsed attributes
+
+        feature_type (str): type of features to count reads for
+
+        attribute (str): attribute grouping features, e.g. "ID" or "Parent"
+
+        stranded (str): ['yes', 'no', 'reverse'] whether reads must be on
+            the same strand as features, 'reverse' for reads on the opposite
+            strand as in dUTP libraries
+
+        mode (str): ['union', 'intersection-strict',
+            'intersection-nonempty'] rule resolving reads overlapping
+            several features
+
+        nonunique (str): ['none', 'all'] count ambiguous reads for no
+            feature or for all features they are assigned to
+
+        min_mapq (int): minimum mapping quality of counted reads
+
+        exclude_flags (int): skip entries with any of these flag bits set
+            [default: secondary, supplementary]
+
+        threads (int): number of processes to count a SAM file path with
+
+    Returns:
+        FeatureCounts: reads assigned to each feature
+
+    Raises:
+        ValueError: If stranded, mode, or nonunique are not valid, or a
+            feature lacks attribute
+
+    Example:
+        Note: These doctests will not pass, examples are only in doctest
+        format as per convention. bio_utils uses pytests for testing.
+
+        >>> gff3_reader = GFF3Reader(open('test.gff3'))
+        >>> counts = count_features(sam_iter(open('test.sam')), gff3_reader,
+        ...                         stranded='reverse')
+        >>> counts.counts['cds1']  # Reads assigned to cds1
+        >>> print(counts.write())  # Print counts table
+
+        >>> counts = count_features('test.sam', gff3_reader, threads=8)
+    """
+
+    assigner = _FeatureAssigner(features, feature_type, attribute, stranded,
+                                mode, nonunique, min_mapq, exclude_flags)
+
+    if not isinstance(sam, str):  # Count entries in this process
+        return assigner.count(sam)
+
+    threads = max(1, threads)
+    byte_ranges = line_byte_ranges(sam, threads * 4)
+    counts = FeatureCounts(assigner.names)
+
+    count_range = partial(_count_range, path=sam)
+    if threads == 1:
+        _init_worker(assigner)
+        for part in map(count_range, byte_ranges):
+            counts.merge(part)
+    else:
+        with ProcessPoolExecutor(max_workers=threads,
+                                 initializer=_init_worker,
+                                 initargs=(assigner,)) as pool:
+            for part in pool.map(count_range, byte_ranges):
+                counts.merge(part)
+
+    return counts
+
+
+def main():
+    """Count reads aligned to GFF3 features and write counts table"""
+
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.
+                                     RawDescriptionHelpFormatter)
+    parser.add_argument('sam',
+                        help='SAM file of reads, "-" for STDIN')
+    parser.add_argument('gff3',
+                        type=argparse.FileType('r'),
+                        help='GFF3 file of features')
+    parser.add_argument('-f', '--feature_type',
+                        default='CDS',
+                        help='type of features to count [Default: CDS]')
+    parser.add_argument('-a', '--attribute',
+                        default='ID',
+                        help='attribute grouping features [Default: ID]')
+    parser.add_argument('-s', '--stranded',
+                        choices=['yes', 'no', 'reverse'],
+                        default='no',
+                        help='whether reads must be on the strand of '
+                             'features [Default: no]')
+    parser.add_argument('-m', '--mode',
+                        choices=['union', 'intersection-strict',
+                                 'intersection-nonempty'],
+                        default='union',
+                        help='rule for reads overlapping several features '
+                             '[Default: union]')
+    parser.add_argument('--nonunique',
+                        choices=['none', 'all'],
+                        default='none',
+                        help='count ambiguous reads for no or all of their '
+                             'features [Default: none]')
+    parser.add_argument('-q', '--min_mapq',
+                        type=int,
+                        default=0,
+                        help='minimum mapping quality of counted reads '
+                             '[Default: 0]')
+    parser.add_argument('-t', '--threads',
+                        type=int,
+                        default=1,
+                        help='number of processes to count with '
+                             '[Default: 1]')
+    parser.add_argument('-o', '--output',
+                        nargs='?',
+                        type=argparse.FileType('w'),
+                        default=sys.stdout,
+                        help='optional output file [Default: STDOUT]')
+    args = parser.parse_args()
+
+    sam = sam_iter(sys.stdin) if args.sam == '-' else args.sam
+    counts = count_features(sam, GFF3Reader(args.gff3),
+                            feature_type=args.feature_type,
+                            attribute=args.attribute,
+                            stranded=args.stranded, mode=args.mode,
+                            nonunique=args.nonunique,
+                            min_mapq=args.min_mapq, threads=args.threads)
+
+    args.output.write(counts.write())
+
+
+if __name__ == '__main__':
+    main()
+    sys.exit(0)
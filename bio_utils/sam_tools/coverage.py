@@ -0,0 +1,283 @@
+#! /usr/bin/env python3
+
+"""Calculate per-base depth and coverage of references from SAM entries
+
+Copyright:
+
+    coverage.py per-base depth and coverage of SAM references
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from array import array
+from bio_utils.iterators import SamHeader
+from bio_utils.sam_tools.cigar_blocks import cigar_blocks
+from collections import OrderedDict
+import numpy as np
+import os
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.2.1'
+
+
+# Number of buffered block boundaries before they are added to the arrays
+_FLUSH_EVENTS = 2 ** 20
+
+
+class Coverage:
+    """A simple class to store the per-base depth of a reference
+
+    Attributes:
+        reference (str): name of reference sequence
+
+        length (int): length of reference sequence
+
+        depth (numpy.ndarray): number of alignments covering each base of the
+            reference, index 0 is the first base
+    """
+
+    def __init__(self, reference, depth):
+        """Initialize variables to store reference depth"""
+
+        self.reference = reference
+        self.length = len(depth)
+        self.depth = depth
+
+    def mean(self):
+        """Return mean depth of reference
+
+        Returns:
+            float: mean number of alignments covering each base
+        """
+
+        if not self.length:
+            return 0.0
+
+        return float(self.depth.mean())
+
+    def breadth(self, threshold=1):
+        """Return fraction of reference covered at a minimum depth
+
+        Args:
+            threshold (int): minimum depth for a base to be covered
+
+        Returns:
+            float: fraction of bases with depth greater than or equal to
+                threshold
+        """
+
+        if not self.length:
+            return 0.0
+
+        return float(np.count_nonzero(self.depth >= threshold)) / self.length
+
+    def evenness(self):
+        """Return evenness score of depth, as defined by Konrad et al. 2017
+
+        Bases below the rounded mean depth lower the score by their shortfall
+        from it, so uniform depth scores 1 and depth piled on a few bases
+        scores close to 0.
+
+        Returns:
+            float: evenness score between 0 and 1, 0 if mean depth rounds
+                to 0
+        """
+
+        mean = int(round(self.mean()))
+        if not mean:
+            return 0.0
+
+        low = self.depth[self.depth <= mean]
+
+        return 1.0 - (len(low) - float(low.sum()) / mean) / self.length
+
+    def runs(self):
+        """Return runs of bases with identical depth
+
+        Returns:
+            list: (start, end, depth) tuples of 0-based, half-open intervals
+                as in bedGraph files
+        """
+
+        depth = self.depth
+        if not self.length:
+            return []
+
+        # Indices where the depth changes delimit runs
+        bounds = np.flatnonzero(np.diff(depth)) + 1
+        starts = np.concatenate(([0], bounds))
+        ends = np.concatenate((bounds, [self.length]))
+
+        return list(zip(starts.tolist(), ends.tolist(),
+                        depth[starts].tolist()))
+
+    def write(self, zeros=False):
+        """Return depth in bedGraph format
+
+        Args:
+            zeros (bool): include runs of bases with a depth of zero
+
+        Returns:
+            str: bedGraph formatted lines containing depth of reference
+        """
+
+        return ''.join(['{0}\t{1}\t{2}\t{3}{4}'.format(self.reference, start,
+                                                       end, depth, os.linesep)
+                        for start, end, depth in self.runs()
+                        if zeros or depth])
+
+
+def _depth_profiles(lengths, intervals):
+    """Count intervals into the per-base depth of each sequence
+
+    Interval boundaries are buffered as start and end events and counted
+    into a difference array per sequence with numpy.bincount. A single
+    cumulative sum of each array then gives the depth of every base.
+
+    Args:
+        lengths (OrderedDict): int lengths of sequences keyed by name
+
+        intervals (iterable): (name, start, end) tuples of 0-based,
+            half-open intervals, clipped to the length of their sequence,
+            intervals of other sequences are ignored
+
+    Returns:
+        OrderedDict: Coverage instances keyed by name in the order of lengths
+    """
+
+    diffs = {}  # Difference arrays, allocated on first use
+    events = {name: (array('q'), array('q')) for name in lengths}
+    buffered = 0
+
+    def flush():
+        """Add buffered start and end events to difference arrays"""
+
+        for name, (starts, ends) in events.items():
+            if not starts:
+                continue
+            size = lengths[name] + 1
+            counts = np.bincount(np.frombuffer(starts, dtype=np.int64),
+                                 minlength=size) \
+                - np.bincount(np.frombuffer(ends, dtype=np.int64),
+                              minlength=size)
+            if name in diffs:
+                diffs[name] += counts
+            else:
+                diffs[name] = counts
+            del starts[:]
+            del ends[:]
+
+    for name, start, end in intervals:
+        try:
+            starts, ends = events[name]
+        except KeyError:  # Sequence not requested
+            continue
+
+        length = lengths[name]
+        if start >= length:
+            continue
+        starts.append(max(start, 0))
+        ends.append(min(end, length))
+        buffered += 1
+
+        if buffered >= _FLUSH_EVENTS:
+            flush()
+            buffered = 0
+
+    flush()
+
+    profiles = OrderedDict()
+    for name, length in lengths.items():
+        if name in diffs:
+            depth = np.cumsum(diffs[name][:length])
+        else:
+            depth = np.zeros(length, dtype=np.int64)
+        profiles[name] = Coverage(name, depth)
+
+    return profiles
+
+
+def coverage(entries, lengths, min_mapq=0, exclude_flags=0x704):
+    """Calculate per-base depth of references from SAM entries
+
+    The reference blocks of each alignment are taken from its CIGAR string,
+    so deletions and skipped regions do not add depth. Block boundaries are
+    recorded as start and end events and counted into a difference array per
+    reference with numpy.bincount. A single cumulative sum of each array then
+    gives the depth of every base.
+
+    Args:
+        entries (iterable): SamEntry instances, such as those yielded by
+            sam_iter, header lines are ignored
+
+        lengths (dict): lengths of references keyed by reference name, or a
+            SamHeader to use the lengths of all its @SQ lines, entries
+            aligned to other references are ignored
+
+        min_mapq (int): minimum mapping quality of counted entries
+
+        exclude_flags (int): skip entries with any of these flag bits set
+            [default: unmapped, secondary, QC fail, duplicate]
+
+    Returns:
+        OrderedDict: Coverage instances keyed by reference name in the order
+            of lengths
+
+    Example:
+        Note: These doctests will not pass, examples are only in doctest
+        format as per convention. bio_utils uses pytests for testing.
+
+        >>> profiles = coverage(sam_iter(open('test.sam')), {'contig1': 5000})
+        >>> profiles['contig1'].mean()  # Mean depth of contig1
+
+        >>> sam_handle = open('test.sam')
+        >>> header, first_line = sam_header(sam_handle)
+        >>> profiles = coverage(sam_iter(sam_handle, start_line=first_line),
+        ...                     header)
+        >>> profiles['contig1'].mean()  # Mean depth of contig1
+        >>> profiles['contig1'].breadth(threshold=5)  # Fraction at depth 5+
+        >>> print(profiles['contig1'].write())  # bedGraph of depth
+    """
+
+    if isinstance(lengths, SamHeader):
+        lengths = lengths.references
+
+    lengths = OrderedDict((name, int(length)) for name, length in
+                          lengths.items())
+
+    def blocks():
+        """Yield reference blocks of counted entries"""
+
+        for entry in entries:
+
+            if type(entry) is str:  # Skip headers
+                continue
+
+            flag = entry.flag if type(entry.flag) is int \
+                else int(entry.flag, 0)
+            if flag & exclude_flags or entry.mapq < min_mapq:
+                continue
+
+            if entry.rname not in lengths:  # Unmapped or not requested
+                continue
+
+            for start, end in cigar_blocks(entry.pos, entry.cigar):
+                yield entry.rname, start, end
+
+    return _depth_profiles(lengths, blocks())
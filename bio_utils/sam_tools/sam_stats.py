@@ -0,0 +1,414 @@
+#! /usr/bin/env python3
+
+"""Summarize flags, mapping qualities, and reference counts of a SAM file
+
+Usage:
+
+    sam_stats.py [--report <flagstat|idxstats|mapq|insert_size>]
+                 [--threads <int>] [--output <output file>] <SAM file>
+
+Copyright:
+
+    sam_stats.py summarize alignments in a SAM file
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import argparse
+from array import array
+from bio_utils.file_tools import line_byte_ranges
+from bio_utils.file_tools import read_byte_range
+from bio_utils.iterators import SamHeader
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import numpy as np
+import os
+import sys
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.0.0'
+
+
+# Every possible value of the 12-bit SAM flag, used to build category masks
+_ALL_FLAGS = np.arange(4096)
+_PRIMARY = _ALL_FLAGS & 0x900 == 0
+_QC_FAIL = _ALL_FLAGS & 0x200 != 0
+
+# flagstat categories as masks over flag values
+_FLAGSTAT = OrderedDict([
+    ('in total', _ALL_FLAGS >= 0),
+    ('primary', _PRIMARY),
+    ('secondary', _ALL_FLAGS & 0x100 != 0),
+    ('supplementary', _ALL_FLAGS & 0x800 != 0),
+    ('duplicates', _ALL_FLAGS & 0x400 != 0),
+    ('primary duplicates', (_ALL_FLAGS & 0x400 != 0) & _PRIMARY),
+    ('mapped', _ALL_FLAGS & 0x4 == 0),
+    ('primary mapped', (_ALL_FLAGS & 0x4 == 0) & _PRIMARY),
+    ('paired in sequencing', (_ALL_FLAGS & 0x1 != 0) & _PRIMARY),
+    ('read1', (_ALL_FLAGS & 0x41 == 0x41) & _PRIMARY),
+    ('read2', (_ALL_FLAGS & 0x81 == 0x81) & _PRIMARY),
+    ('properly paired', (_ALL_FLAGS & 0x7 == 0x3) & _PRIMARY),
+    ('with itself and mate mapped', (_ALL_FLAGS & 0xD == 0x1) & _PRIMARY),
+    ('singletons', (_ALL_FLAGS & 0xD == 0x9) & _PRIMARY),
+])
+
+# Categories reported as a percentage of their denominator category
+_PERCENTAGES = {'mapped': 'in total',
+                'primary mapped': 'primary',
+                'properly paired': 'paired in sequencing',
+                'with itself and mate mapped': 'paired in sequencing',
+                'singletons': 'paired in sequencing'}
+
+
+class SamStats:
+    """A simple class to store summary counts of SAM entries and write them
+
+    Attributes:
+        header (SamHeader): header lines of the SAM file
+
+        flags (numpy.ndarray): number of entries with each flag value,
+            indexed by flag
+
+        mapq (numpy.ndarray): number of entries with each mapping quality,
+            indexed by mapping quality
+
+        insert_sizes (numpy.ndarray): number of first mates of proper pairs
+            with each absolute template length, the last index counts all
+            longer templates
+
+        mapped (dict): number of mapped entries keyed by reference name
+
+        unmapped (dict): number of unmapped entries keyed by reference name,
+            entries without a reference are keyed by "*"
+
+        mate_diff_ref (numpy.ndarray): [QC-passed, QC-failed] counts of
+            primary entries with their mate mapped to a different reference
+
+        mate_diff_ref_mapq5 (numpy.ndarray): same as mate_diff_ref but only
+            counting entries with a mapping quality of at least five
+    """
+
+    def __init__(self, max_insert=10000):
+        """Initialize variables to store SAM summary counts"""
+
+        self.header = SamHeader()
+        self.flags = np.zeros(4096, dtype=np.int64)
+        self.mapq = np.zeros(256, dtype=np.int64)
+        self.insert_sizes = np.zeros(max_insert + 1, dtype=np.int64)
+        self.mapped = {}
+        self.unmapped = {}
+        self.mate_diff_ref = np.zeros(2, dtype=np.int64)
+        self.mate_diff_ref_mapq5 = np.zeros(2, dtype=np.int64)
+
+    def merge(self, other):
+        """Add the counts of another SamStats instance to this one
+
+        Args:
+            other (SamStats): counts from another part of the SAM file, its
+                header lines are appended to this instance's header
+        """
+
+        for line in other.header.lines:
+            self.header.add_line(line)
+        self.flags += other.flags
+        self.mapq += other.mapq
+        self.insert_sizes += other.insert_sizes
+        for name, count in other.mapped.items():
+            self.mapped[name] = self.mapped.get(name, 0) + count
+        for name, count in other.unmapped.items():
+            self.unmapped[name] = self.unmapped.get(name, 0) + count
+        self.mate_diff_ref += other.mate_diff_ref
+        self.mate_diff_ref_mapq5 += other.mate_diff_ref_mapq5
+
+    def flagstat(self):
+        """Return entry counts for each flag category
+
+        Returns:
+            OrderedDict: [QC-passed, QC-failed] counts keyed by category, in
+                the order reported by samtools flagstat
+        """
+
+        flags = self.flags
+        counts = OrderedDict()
+        for category, mask in _FLAGSTAT.items():
+            counts[category] = [int(flags[mask & ~_QC_FAIL].sum()),
+                                int(flags[mask & _QC_FAIL].sum())]
+        counts['with mate mapped to a different chr'] = \
+            self.mate_diff_ref.tolist()
+        counts['with mate mapped to a different chr (mapQ>=5)'] = \
+            self.mate_diff_ref_mapq5.tolist()
+
+        return counts
+
+    def write_flagstat(self):
+        """Return flag category counts formatted like samtools flagstat
+
+        Returns:
+            str: one line per category containing QC-passed and QC-failed
+                counts
+        """
+
+        def percent(count, total):
+            return '{0:.2f}%'.format(100.0 * count / total) if total \
+                else 'N/A'
+
+        counts = self.flagstat()
+        lines = []
+        for category, (passed, failed) in counts.items():
+            line = '{0} + {1} {2}'.format(passed, failed, category)
+            if category in _PERCENTAGES:
+                total = counts[_PERCENTAGES[category]]
+                line += ' ({0} : {1})'.format(percent(passed, total[0]),
+                                              percent(failed, total[1]))
+            lines.append(line + os.linesep)
+
+        return ''.join(lines)
+
+    def write_idxstats(self):
+        """Return per-reference counts formatted like samtools idxstats
+
+        Returns:
+            str: reference name, length, mapped count, and unmapped count
+                per line, references in header order
+        """
+
+        lengths = self.header.references
+        names = list(lengths) + [name for name in self.mapped
+                                 if name not in lengths and name != '*']
+        names += [name for name in self.unmapped if name not in lengths
+                  and name not in self.mapped and name != '*']
+        names.append('*')
+
+        return ''.join(['{0}\t{1}\t{2}\t{3}{4}'.format(
+            name, lengths.get(name, 0), self.mapped.get(name, 0),
+            self.unmapped.get(name, 0), os.linesep) for name in names])
+
+    def write_histogram(self, counts):
+        """Return non-zero bins of a histogram as tab-separated lines
+
+        Args:
+            counts (numpy.ndarray): histogram such as mapq or insert_sizes
+
+        Returns:
+            str: value and count per line
+        """
+
+        return ''.join(['{0}\t{1}{2}'.format(value, counts[value],
+                                             os.linesep)
+                        for value in np.flatnonzero(counts).tolist()])
+
+
+def _tally_lines(lines, max_insert=10000):
+    """Count flags, mapping qualities, and references of SAM lines
+
+    Args:
+        lines (iterable): SAM lines as bytes
+
+        max_insert (int): largest template length given its own bin
+
+    Returns:
+        SamStats: counts of the given lines
+    """
+
+    stats = SamStats(max_insert=max_insert)
+
+    # Per-entry values, counted with numpy.bincount once all lines are read
+    flags = array('i')
+    mapqs = array('i')
+    ref_ids = array('i')
+    tlens = array('q')
+    ref_names = {}
+    mate_diff = np.zeros((2, 2), dtype=np.int64)
+
+    for line in lines:
+
+        if line.startswith(b'@'):
+            stats.header.add_line(line.decode('utf-8'))
+            continue
+
+        fields = line.split(b'\t', 9)
+        if len(fields) < 9:  # Skip blank lines
+            continue
+
+        try:
+            flag = int(fields[1])
+        except ValueError:  # Hex bit flag
+            flag = int(fields[1], 16)
+        mapq = int(fields[4])
+        rname = fields[2]
+
+        flags.append(flag)
+        mapqs.append(mapq)
+        try:
+            ref_ids.append(ref_names[rname])
+        except KeyError:
+            ref_ids.append(ref_names.setdefault(rname, len(ref_names)))
+
+        if flag & 0x942 == 0x42:  # Primary first mate in a proper pair
+            tlens.append(int(fields[8]))
+        if flag & 0x90D == 0x1 and fields[6] != b'=' and fields[6] != rname:
+            qc_fail = 1 if flag & 0x200 else 0
+            mate_diff[0, qc_fail] += 1
+            if mapq >= 5:
+                mate_diff[1, qc_fail] += 1
+
+    if not flags:
+        return stats
+
+    flags = np.frombuffer(flags, dtype=np.int32)
+    mapqs = np.frombuffer(mapqs, dtype=np.int32)
+    ref_ids = np.frombuffer(ref_ids, dtype=np.int32)
+
+    stats.flags += np.bincount(flags & 0xFFF, minlength=4096)
+    stats.mapq += np.bincount(np.minimum(mapqs, 255), minlength=256)
+    if tlens:
+        sizes = np.minimum(np.abs(np.frombuffer(tlens, dtype=np.int64)),
+                           max_insert)
+        stats.insert_sizes += np.bincount(sizes, minlength=max_insert + 1)
+
+    unmapped = flags & 0x4 != 0
+    mapped_counts = np.bincount(ref_ids[~unmapped],
+                                minlength=len(ref_names))
+    unmapped_counts = np.bincount(ref_ids[unmapped],
+                                  minlength=len(ref_names))
+    for name, ref_id in ref_names.items():
+        name = name.decode('utf-8')
+        if mapped_counts[ref_id]:
+            stats.mapped[name] = int(mapped_counts[ref_id])
+        if unmapped_counts[ref_id]:
+            stats.unmapped[name] = int(unmapped_counts[ref_id])
+
+    stats.mate_diff_ref += mate_diff[0]
+    stats.mate_diff_ref_mapq5 += mate_diff[1]
+
+    return stats
+
+
+def _tally_range(byte_range, path, max_insert):
+    """Count flags, mapping qualities, and references in part of a SAM file
+
+    Args:
+        byte_range (tuple): (start, end) byte offsets of lines to count
+
+        path (str): path of SAM file
+
+        max_insert (int): largest template length given its own bin
+
+    Returns:
+        SamStats: counts of lines in byte range
+    """
+
+    return _tally_lines(read_byte_range(path, *byte_range),
+                        max_insert=max_insert)
+
+
+def sam_stats(sam, threads=1, max_insert=10000):
+    """Summarize flags, mapping qualities, and references of a SAM file
+
+    The file is split into byte ranges aligned to line starts and each range
+    is counted by a separate process. Values are collected from only the
+    first nine fields of each line and counted with numpy.bincount. The
+    counts of each range are then merged.
+
+    Args:
+        sam (str): path of SAM file, or a file handle returning lines as
+            bytes or str, which is counted by a single process
+
+        threads (int): number of processes to count with
+
+        max_insert (int): largest template length given its own bin of
+            insert_sizes
+
+    Returns:
+        SamStats: counts of all entries in SAM file
+
+    Example:
+        Note: These doctests will not pass, examples are only in doctest
+        format as per convention. bio_utils uses pytests for testing.
+
+        >>> stats = sam_stats('test.sam', threads=8)
+        >>> print(stats.write_flagstat())  # Print flag category counts
+        >>> print(stats.mapped['contig1'])  # Entries mapped to contig1
+    """
+
+    if not isinstance(sam, str):  # Count file handle in this process
+        lines = (line if isinstance(line, bytes) else line.encode('utf-8')
+                 for line in sam)
+        return _tally_lines(lines, max_insert=max_insert)
+
+    threads = max(1, threads)
+    byte_ranges = line_byte_ranges(sam, threads * 4)
+    tally = partial(_tally_range, path=sam, max_insert=max_insert)
+
+    stats = SamStats(max_insert=max_insert)
+    if threads == 1:
+        for part in map(tally, byte_ranges):
+            stats.merge(part)
+    else:
+        with ProcessPoolExecutor(max_workers=threads) as pool:
+            for part in pool.map(tally, byte_ranges):
+                stats.merge(part)
+
+    return stats
+
+
+def main():
+    """Summarize SAM file and write requested report"""
+
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.
+                                     RawDescriptionHelpFormatter)
+    parser.add_argument('sam',
+                        nargs='?',
+                        default='-',
+                        help='SAM file to summarize [Default: STDIN]')
+    parser.add_argument('-r', '--report',
+                        choices=['flagstat', 'idxstats', 'mapq',
+                                 'insert_size'],
+                        default='flagstat',
+                        help='summary to write [Default: flagstat]')
+    parser.add_argument('-t', '--threads',
+                        type=int,
+                        default=1,
+                        help='number of processes to count with '
+                             '[Default: 1]')
+    parser.add_argument('-o', '--output',
+                        nargs='?',
+                        type=argparse.FileType('w'),
+                        default=sys.stdout,
+                        help='optional output file [Default: STDOUT]')
+    args = parser.parse_args()
+
+    sam = sys.stdin.buffer if args.sam == '-' else args.sam
+    stats = sam_stats(sam, threads=args.threads)
+
+    if args.report == 'flagstat':
+        args.output.write(stats.write_flagstat())
+    elif args.report == 'idxstats':
+        args.output.write(stats.write_idxstats())
+    elif args.report == 'mapq':
+        args.output.write(stats.write_histogram(stats.mapq))
+    else:
+        args.output.write(stats.write_histogram(stats.insert_sizes))
+
+
+if __name__ == '__main__':
+    main()
+    sys.exit(0)
@@ -0,0 +1,406 @@
+#! /usr/bin/env python3
+
+"""Sort a SAM file by coordinate or query name using bounded memory
+
+Usage:
+
+    sort_sam.py [--sort_order <coordinate|queryname>] [--max_memory <MB>]
+                [--threads <int>] [--max_open <int>] [--tmp_dir <directory>]
+                [--output <output file>] <SAM file>
+
+Copyright:
+
+    sort_sam.py external merge sort of SAM entries
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import argparse
+from bio_utils.iterators import sam_header
+from bio_utils.iterators import sam_iter
+from concurrent.futures import ProcessPoolExecutor
+import heapq
+from itertools import chain
+from operator import itemgetter
+import os
+import struct
+import sys
+import tempfile
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.2.0'
+
+
+# Reference ID given to unmapped entries so that they sort last
+UNMAPPED_ID = 2 ** 31 - 1
+
+# Rough per-entry cost of the key tuple and bytes object in a run, in bytes
+_ENTRY_OVERHEAD = 120
+
+# Run record layouts: key fields followed by the length of the SAM line
+_COORD_STRUCT = struct.Struct('<iiBI')  # Reference ID, position, reverse
+_QNAME_STRUCT = struct.Struct('<BI')  # First/second mate bits
+
+
+def _write_records(records, order, tmp_dir):
+    """Write sorted records to a temporary run file
+
+    Args:
+        records (iterable): (key, line) tuples in sorted order where line is
+            an encoded SAM entry
+
+        order (str): ['coordinate', 'queryname'] order of keys
+
+        tmp_dir (str): directory to write run file to
+
+    Returns:
+        str: path of the run file
+    """
+
+    fd, path = tempfile.mkstemp(suffix='.run', prefix='sort_sam.',
+                                dir=tmp_dir)
+    with os.fdopen(fd, 'wb') as run_handle:
+        write = run_handle.write
+        if order == 'coordinate':
+            pack = _COORD_STRUCT.pack
+            for key, line in records:
+                write(pack(key[0], key[1], key[2], len(line)))
+                write(line)
+        else:
+            pack = _QNAME_STRUCT.pack
+            for key, line in records:
+                write(pack(key[1], len(line)))
+                write(line)
+
+    return path
+
+
+def _write_run(records, order, tmp_dir):
+    """Sort records and spill them to a temporary run file
+
+    Args:
+        records (list): (key, line) tuples where line is an encoded SAM entry
+
+        order (str): ['coordinate', 'queryname'] order of keys
+
+        tmp_dir (str): directory to write run file to
+
+    Returns:
+        str: path of the sorted run file
+    """
+
+    records.sort(key=itemgetter(0))
+
+    return _write_records(records, order, tmp_dir)
+
+
+def _read_run(path, order):
+    """Yield (key, line) tuples from a run file written by _write_run
+
+    Args:
+        path (str): path of the run file
+
+        order (str): ['coordinate', 'queryname'] order of keys
+
+    Yields:
+        tuple: (key, line) where line is an encoded SAM entry
+    """
+
+    if order == 'coordinate':
+        unpack = _COORD_STRUCT.unpack
+        size = _COORD_STRUCT.size
+    else:
+        unpack = _QNAME_STRUCT.unpack
+        size = _QNAME_STRUCT.size
+
+    with open(path, 'rb') as run_handle:
+        read = run_handle.read
+        while True:
+            fields = read(size)
+            if not fields:
+                break
+            fields = unpack(fields)
+            line = read(fields[-1])
+            if order == 'coordinate':
+                yield fields[:3], line
+            else:
+                yield (line[:line.index(b'\t')], fields[0]), line
+
+
+def _merge_runs(runs, order, tmp_dir, max_open):
+    """Merge groups of runs until at most max_open runs remain
+
+    Args:
+        runs (list): paths of sorted run files, replaced in place by the
+            paths of merged runs so the caller can remove them
+
+        order (str): ['coordinate', 'queryname'] order of keys
+
+        tmp_dir (str): directory to write merged runs to
+
+        max_open (int): maximum number of runs to read at once
+    """
+
+    while len(runs) > max_open:
+        groups = [runs[i:i + max_open] for i in range(0, len(runs), max_open)]
+        merged_runs = []
+        for group in groups:
+            if len(group) == 1:
+                merged_runs.append(group[0])
+                continue
+            merged = heapq.merge(*[_read_run(path, order) for path in group],
+                                 key=itemgetter(0))
+            path = _write_records(merged, order, tmp_dir)
+            runs.append(path)  # Track for removal until merged again
+            merged_runs.append(path)
+            for group_path in group:
+                runs.remove(group_path)
+                os.remove(group_path)
+        runs[:] = merged_runs
+
+
+def _sort_key(line, order, ref_ids):
+    """Return the sort key of a SAM entry line
+
+    Args:
+        line (str): SAM entry without its line ending
+
+        order (str): ['coordinate', 'queryname'] order of keys
+
+        ref_ids (dict): reference IDs keyed by name, references that are
+            absent are added with the next ID
+
+    Returns:
+        tuple: key of the line in order
+    """
+
+    fields = line.split('\t', 4)
+    try:
+        flag = int(fields[1])
+    except ValueError:  # Hex bit flag
+        flag = int(fields[1], 0)
+
+    if order == 'queryname':
+        return fields[0].encode('utf-8'), flag & 192
+
+    rname = fields[2]
+    if rname == '*':
+        return UNMAPPED_ID, int(fields[3]), (flag >> 4) & 1
+    try:
+        ref_id = ref_ids[rname]
+    except KeyError:
+        ref_id = ref_ids.setdefault(rname, len(ref_ids))
+
+    return ref_id, int(fields[3]), (flag >> 4) & 1
+
+
+def sort_sam(handle, order='coordinate', max_memory=768 * 1024 ** 2,
+             threads=1, tmp_dir=None, max_open=64):
+    """Sort SAM entries using sorted runs merged from temporary files
+
+    Lines are collected until their estimated size exceeds max_memory, then
+    sorted and spilled to a temporary file. Runs store the original lines,
+    so optional fields are kept. Runs are sorted in a pool of worker
+    processes when threads is greater than one. The runs are then merged
+    with heapq.merge, so entries with equal keys keep their input order. If
+    there are more runs than max_open, groups of runs are first merged into
+    larger runs. If every entry fits in memory, no temporary files are
+    written. Temporary files are removed even if sorting fails or the
+    generator is closed early.
+
+    Coordinate order follows the order of @SQ headers, references absent
+    from the header follow in order of appearance, and unmapped entries are
+    placed last. Query name order sorts by name, then first mate before
+    second mate.
+
+    Args:
+        handle (file): SAM file handle, can be any iterator so long as it
+            it returns subsequent "lines" of a SAM entry
+
+        order (str): ['coordinate', 'queryname'] order to sort entries in
+
+        max_memory (int): approximate number of bytes of entries to hold in
+            memory, split between worker processes
+
+        threads (int): number of processes to sort runs with
+
+        tmp_dir (str): directory to store sorted runs in
+            [default: system temporary directory]
+
+        max_open (int): maximum number of runs to read at once
+
+    Yields:
+        str: header lines, with the @HD sort order updated, followed by
+            SamEntry instances in sorted order
+
+    Raises:
+        ValueError: If order is not 'coordinate' or 'queryname'
+
+    Example:
+        Note: These doctests will not pass, examples are only in doctest
+        format as per convention. bio_utils uses pytests for testing.
+
+        >>> for entry in sort_sam(open('test.sam'), order='queryname'):
+        ...     print(entry)  # Print header line or SamEntry
+    """
+
+    if order not in ('coordinate', 'queryname'):
+        raise ValueError('order must be "coordinate" or "queryname", '
+                         'not {0}'.format(order))
+
+    threads = max(1, threads)
+    max_open = max(2, max_open)
+    run_memory = max_memory // threads
+
+    header, line = sam_header(handle)
+    ref_ids = dict(header.reference_ids)  # Extended by unlisted references
+    runs = []  # Paths of sorted run files
+    pending = []  # Futures of runs being sorted by worker processes
+    records = []
+    memory = 0
+
+    pool = ProcessPoolExecutor(max_workers=threads) if threads > 1 else None
+
+    try:
+        lines = chain([line], handle) if line is not None else []
+        for line in lines:
+
+            if isinstance(line, bytes):
+                line = line.decode('utf-8')
+            line = line.rstrip('\r\n')
+            if not line or line.startswith('@'):
+                continue
+
+            encoded = line.encode('utf-8')
+            records.append((_sort_key(line, order, ref_ids), encoded))
+            memory += len(encoded) + _ENTRY_OVERHEAD
+
+            if memory >= run_memory:
+                if pool is None:
+                    runs.append(_write_run(records, order, tmp_dir))
+                else:
+                    # Bound memory by waiting on the oldest run
+                    if len(pending) >= threads:
+                        runs.append(pending.pop(0).result())
+                    pending.append(pool.submit(_write_run, records,
+                                               order, tmp_dir))
+                records = []
+                memory = 0
+
+        while pending:
+            runs.append(pending.pop(0).result())
+
+        if runs and records:
+            runs.append(_write_run(records, order, tmp_dir))
+            records = []
+
+        if pool is not None:
+            pool.shutdown()
+            pool = None
+
+        _merge_runs(runs, order, tmp_dir, max_open)
+
+        # Yield headers with updated sort order
+        header.sort_order = order
+        for header_line in header.write().splitlines():
+            yield header_line
+
+        # Merge runs, or sort in memory if nothing was spilled
+        if runs:
+            merged = heapq.merge(*[_read_run(path, order) for path in runs],
+                                 key=itemgetter(0))
+        elif records:
+            records.sort(key=itemgetter(0))
+            merged = iter(records)
+        else:  # SAM file only contains headers
+            return
+
+        lines = (line.decode('utf-8') for key, line in merged)
+        for entry in sam_iter(lines):
+            yield entry
+
+    finally:
+        # Collect runs still being written so they can be removed
+        for future in pending:
+            try:
+                runs.append(future.result())
+            except Exception:
+                pass
+        if pool is not None:
+            pool.shutdown()
+        for path in runs:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def main():
+    """Sort SAM file and write sorted entries"""
+
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.
+                                     RawDescriptionHelpFormatter)
+    parser.add_argument('sam',
+                        nargs='?',
+                        type=argparse.FileType('r'),
+                        default=sys.stdin,
+                        help='SAM file to sort [Default: STDIN]')
+    parser.add_argument('-s', '--sort_order',
+                        choices=['coordinate', 'queryname'],
+                        default='coordinate',
+                        help='order to sort entries in '
+                             '[Default: coordinate]')
+    parser.add_argument('-m', '--max_memory',
+                        type=int,
+                        default=768,
+                        help='megabytes of entries to hold in memory '
+                             '[Default: 768]')
+    parser.add_argument('-t', '--threads',
+                        type=int,
+                        default=1,
+                        help='number of processes to sort with '
+                             '[Default: 1]')
+    parser.add_argument('--max_open',
+                        type=int,
+                        default=64,
+                        help='maximum number of temporary files to merge at '
+                             'once [Default: 64]')
+    parser.add_argument('--tmp_dir',
+                        default=None,
+                        help='directory to store temporary files in '
+                             '[Default: system temporary directory]')
+    parser.add_argument('-o', '--output',
+                        nargs='?',
+                        type=argparse.FileType('w'),
+                        default=sys.stdout,
+                        help='optional output file [Default: STDOUT]')
+    args = parser.parse_args()
+
+    for entry in sort_sam(args.sam, order=args.sort_order,
+                          max_memory=args.max_memory * 1024 ** 2,
+                          threads=args.threads, tmp_dir=args.tmp_dir,
+                          max_open=args.max_open):
+        if type(entry) is str:
+            args.output.write('{0}{1}'.format(entry, os.linesep))
+        else:
+            args.output.write(entry.write())
+
+
+if __name__ == '__main__':
+    main()
+    sys.exit(0)
@@ -22,43 +22,42 @@ Copyright:
 """
 
 from ..blast_tools import b6_evalue_filter
+from ..blast_tools import parallel_b6_evalue_filter
+from ..iterators.b6 import FormatError
+from io import StringIO
 import os
+import pytest
+import tempfile
 
 __author__ = 'Alex Hyer'
 __email__ = 'theonehyer@gmail.com'
 __license__ = 'GPLv3'
 __maintainer__ = 'Alex Hyer'
 __status__ = 'Production'
-__version__ = '1.0.2'
+__version__ = '1.2.0'
 
 
-def test_b6_evalue_filter():  # TODO: fix unit tests
-    assert True  # Disabling test until it can be reformatted for new iter
-
-    """
-    \"\"\"Test bio_utils' filter_b6_evalue with multiple entries\"\"\"
+def test_b6_evalue_filter():
+    """Test bio_utils' b6_evalue_filter with multiple entries"""
 
     # Store properly formatted B6/M8 data
-    b6_data = 'query1\tsubject1\t86.03\t10\t3\t1\t5\t15\t' \
+    b6_data = '# Comment{0}' \
+              'query1\tsubject1\t86.03\t10\t3\t1\t5\t15\t' \
               '100\t115\t1E-5\t1890{0}' \
               'query2\tsubject2\t95.46\t23\t5\t7\t10\t33\t' \
               '50\t73\t1E-37\t1219{0}' \
               'query3\tsubject3\t85.46\t13\t2\t5\t10\t23\t' \
               '50\t63\t3E+0\t1219'.format(os.linesep)
 
-    b6_handle = iter(b6_data.split(os.linesep))
-
-    entries = []
-    for entry in b6_evalue_filter(b6_handle, 1):
-        entries.append(entry)
+    entries = list(b6_evalue_filter(iter(b6_data.split(os.linesep)), 1))
 
     assert len(entries) == 2  # Ensure high E-value entry dropped
 
     # Test first entry
     assert entries[0].query == 'query1'
     assert entries[0].subject == 'subject1'
-    assert entries[0].perc_identical == 86.03
-    assert entries[0].align_len == 10
+    assert entries[0].identity == 86.03
+    assert entries[0].length == 10
     assert entries[0].mismatches == 3
     assert entries[0].gaps == 1
     assert entries[0].query_start == 5
@@ -66,25 +65,63 @@ def test_b6_evalue_filter():  # TODO: fix unit tests
     assert entries[0].subject_start == 100
     assert entries[0].subject_end == 115
     assert entries[0].evalue == 1E-5
-    assert entries[0]._evalue_str == '1E-5'
-    assert entries[0].bit_score == 1890
+    assert entries[0].bitscore == 1890
     assert entries[0].write() == 'query1\tsubject1\t86.03\t10\t3\t1\t5\t15\t' \
-                                 '100\t115\t1E-5\t1890.0{0}'.format(os.linesep)
+                                 '100\t115\t1e-05\t1890.0{0}'.format(os.linesep)
 
     # Test second entry
     assert entries[1].query == 'query2'
-    assert entries[1].subject == 'subject2'
-    assert entries[1].perc_identical == 95.46
-    assert entries[1].align_len == 23
-    assert entries[1].mismatches == 5
-    assert entries[1].gaps == 7
-    assert entries[1].query_start == 10
-    assert entries[1].query_end == 33
-    assert entries[1].subject_start == 50
-    assert entries[1].subject_end == 73
     assert entries[1].evalue == 1E-37
-    assert entries[1]._evalue_str == '1E-37'
-    assert entries[1].bit_score == 1219
-    assert entries[1].write() == 'query2\tsubject2\t95.46\t23\t5\t7\t10\t33' \
-                                 '\t50\t73\t1E-37\t' \
-                                 '1219.0{0}'.format(os.linesep)"""
+
+    # Passthrough yields original lines
+    lines = list(b6_evalue_filter(StringIO(b6_data), 1e-10, raw=True,
+                                  comments=True))
+    assert lines == ['# Comment' + os.linesep,
+                     'query2\tsubject2\t95.46\t23\t5\t7\t10\t33\t'
+                     '50\t73\t1E-37\t1219' + os.linesep]
+
+    # Custom header and malformed E-values
+    header = ['evalue', 'qseqid']
+    entries = list(b6_evalue_filter(['1e-5\tquery1', '-\tquery2'], 1,
+                                    header=header))
+    assert [entry.custom_fs['qseqid'] for entry in entries] == ['query1']
+    with pytest.raises(FormatError):
+        list(b6_evalue_filter(['x\tquery1'], 1, header=header))
+    with pytest.raises(ValueError):
+        list(b6_evalue_filter(['query1'], 1, header=['qseqid']))
+
+
+def test_parallel_b6_evalue_filter():
+    """Test bio_utils' parallel_b6_evalue_filter keeps lines in order"""
+
+    lines = ['query{0}\tsubject1\t90.0\t100\t1\t0\t1\t100\t1\t100\t'
+             '1e-{1}\t50{2}'.format(i, i % 20, os.linesep)
+             for i in range(200)]
+    expected = ''.join(line for line in lines
+                       if float(line.split('\t')[10]) <= 1e-10)
+
+    fd, path = tempfile.mkstemp(suffix='.b6')
+    try:
+        with os.fdopen(fd, 'w', newline='') as handle:
+            handle.write('# Comment' + os.linesep + ''.join(lines))
+
+        for threads in (1, 3):
+            assert ''.join(parallel_b6_evalue_filter(path, 1e-10,
+                                                     threads)) == expected
+
+        # Handles are filtered in chunks of lines
+        with open(path, newline='') as handle:
+            blocks = list(parallel_b6_evalue_filter(handle, 1e-10, 2,
+                                                    chunk_size=7))
+        assert ''.join(blocks) == expected
+
+        # Last line without a line ending is not joined to the next block
+        with open(path, 'a', newline='') as handle:
+            handle.write(lines[19].rstrip(os.linesep))
+        assert ''.join(parallel_b6_evalue_filter(path, 1e-10, 3)) == \
+            expected + lines[19]
+        blocks = parallel_b6_evalue_filter(iter(expected.splitlines()),
+                                           1e-10, 2, chunk_size=7)
+        assert ''.join(blocks) == expected
+    finally:
+        os.remove(path)
@@ -0,0 +1,98 @@
+#! /usr/bin/env python3
+
+"""Test bio_utils' b6_index and B6Reader reading by ID
+
+Copyright:
+
+    test_b6_index.py test bio_utils' b6_index
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from ..blast_tools import b6_index
+from ..file_tools import id_index
+from ..iterators import B6Reader
+from ..iterators.b6 import FormatError
+import os
+import pytest
+import tempfile
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.1.0'
+
+
+def test_b6_index():
+    """Test bio_utils' b6_index and B6Reader.iterate with query and subject"""
+
+    hits = [('query2', 'subject1'), ('query2', 'subject2'),
+            ('query1', 'subject1'), ('query3', 'subject3'),
+            ('query2', 'subject3')]
+    b6_data = '# BLASTN' + os.linesep + \
+        ''.join('{0}\t{1}\t90.0\t100\t1\t0\t1\t100\t1\t100\t1e-5\t50{2}'
+                .format(query, subject, os.linesep)
+                for query, subject in hits)
+
+    fd, path = tempfile.mkstemp(suffix='.b6')
+    try:
+        with os.fdopen(fd, 'w', newline='') as handle:
+            handle.write(b6_data)
+
+        query_index, subject_index = b6_index(path, subjects=True)
+        assert len(query_index) == 4  # query2 has two runs of lines
+        assert len(query_index.ranges('query2')) == 2
+        assert 'query1' in query_index and 'query4' not in query_index
+        assert len(subject_index.ranges('subject1')) == 2
+        query_ranges = {query: query_index.ranges(query) for query in
+                        ('query1', 'query2', 'query3')}
+        query_index.close()
+        subject_index.close()
+
+        def read(**kwargs):
+            with open(path) as handle:
+                reader = B6Reader(handle)
+                return [(entry.query, entry.subject)
+                        for entry in reader.iterate(**kwargs)]
+
+        assert read(query='query2') == [hits[0], hits[1], hits[4]]
+        assert read(query=['query3', 'query1', 'query4']) == [hits[2],
+                                                              hits[3]]
+        assert read(subject='subject3') == [hits[3], hits[4]]
+        assert read(query='query2', subject=['subject1', 'subject3']) == \
+            [hits[0], hits[4]]
+        assert read(query=[]) == []
+        assert read() == hits
+
+        # Ranges sorted in chunks are merged into the same index
+        with id_index(path, path + '.qidx', max_runs=1) as index:
+            assert [index.ranges(query) for query in
+                    ('query1', 'query2', 'query3')] == \
+                [query_ranges[query] for query in
+                 ('query1', 'query2', 'query3')]
+
+        # Malformed lines are named by byte offset
+        with open(path, 'a', newline='') as handle:
+            handle.write('query4\tsubject1' + os.linesep)
+        b6_index(path)
+        with pytest.raises(FormatError) as error:
+            read(query='query4')
+        assert 'byte {0}'.format(len(b6_data)) in str(error.value)
+    finally:
+        for file_path in (path, path + '.qidx', path + '.sidx'):
+            if os.path.exists(file_path):
+                os.remove(file_path)
@@ -0,0 +1,82 @@
+#! /usr/bin/env python3
+
+"""Test bio_utils' B6Reader with default and custom headers
+
+Copyright:
+
+    test_b6_reader.py test bio_utils' B6Reader
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from ..iterators import B6Reader
+from ..iterators.b6 import FormatError
+import os
+import pytest
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.0.1'
+
+
+def read(b6_data, **kwargs):
+    """Return entries of B6 data"""
+
+    return list(B6Reader(iter(b6_data.split(os.linesep))).iterate(**kwargs))
+
+
+def test_b6_reader():
+    """Test bio_utils' B6Reader column parsing and errors"""
+
+    # Store default B6 data ending in a comment
+    b6_data = 'query1\tsubject1\t86.03\t10\t3\t1\t15\t5\t100\t115\t1E-5\t' \
+              '1890{0}' \
+              '# comment{0}' \
+              'query2\tsubject2\t95.46\t23\t5\t7\t10\t33\t-\t73\t3E-0\t1219' \
+              '{0}# last comment'.format(os.linesep)
+    entries = read(b6_data)
+    assert len(entries) == 2
+    assert entries[0].query == 'query1'
+    assert entries[0].identity == 86.03
+    assert entries[0].query_end == 5
+    assert entries[0].evalue == 1e-5
+    assert entries[1].subject_start is None
+    assert entries[1].custom_fs is None
+    assert entries[1].write() == 'query2\tsubject2\t95.46\t23\t5\t7\t10\t' \
+                                 '33\t-\t73\t3.0\t1219.0{0}'.format(os.linesep)
+
+    # Custom and duplicate specifiers keep their column order
+    header = ['qaccver', 'stitle', 'evalue', 'qaccver', 'qcovs']
+    entries = read('query1\tsubject one\t1E-5\tquery1\t-', header=header)
+    assert entries[0].fs_order == ['query', 'stitle', 'evalue', 'qcovs']
+    assert list(entries[0].custom_fs.items()) == [('stitle', 'subject one'),
+                                                  ('qcovs', None)]
+    assert entries[0].subject is None
+    assert entries[0].write() == 'query1\tsubject one\t1e-05\t-' \
+                                 '{0}'.format(os.linesep)
+
+    # Headers of only custom specifiers
+    entries = read('read1\tcontig1', header=['qseqid', 'sseqid'])
+    assert list(entries[0].custom_fs.values()) == ['read1', 'contig1']
+
+    # Malformed lines raise FormatError
+    with pytest.raises(FormatError):
+        read('query1\tsubject1\t86.03')
+    with pytest.raises(FormatError) as error:
+        read('query1\tsubject1\t86.03\tten\t3\t1\t15\t5\t100\t115\t1E-5\t1')
+    assert 'length' in str(error.value)
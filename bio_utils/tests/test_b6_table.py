@@ -0,0 +1,116 @@
+#! /usr/bin/env python3
+
+"""Test bio_utils' load_b6_table
+
+Copyright:
+
+    test_b6_table.py test bio_utils' load_b6_table
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from ..blast_tools import load_b6_table
+from ..iterators.b6 import FormatError
+from io import StringIO
+import numpy as np
+import os
+import pytest
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.1.0'
+
+
+def test_b6_table():
+    """Test bio_utils' load_b6_table columns, masks, and group-bys"""
+
+    b6_lines = ['query1\tsubject1\t98.7\t100\t1\t0\t1\t100\t201\t300\t'
+                '1e-50\t180.5',
+                'query1\tsubject2\t90.0\t100\t10\t0\t1\t100\t1\t100\t'
+                '1e-40\t190',
+                'query2\tsubject1\t75.5\t50\t12\t1\t5\t54\t1\t50\t'
+                '0.001\t40.2',
+                'query3\tsubject1\t100.0\t30\t0\t0\t1\t30\t1\t30\t'
+                '1e-10\t60']
+    b6_data = '# BLASTN{0}{1}{0}'.format(os.linesep, os.linesep.join(b6_lines))
+
+    # Small chunks are joined into the same table
+    table = load_b6_table(StringIO(b6_data), chunk_size=2)
+
+    assert len(table) == 4
+    assert table.query.categories == ['query1', 'query2', 'query3']
+    assert table.subject.tolist() == ['subject1', 'subject2', 'subject1',
+                                      'subject1']
+    assert table.identity.dtype == np.float32
+    assert table.query_start.dtype == np.int32
+    assert table.evalue.dtype == np.float64
+    assert table.bitscore.dtype == np.float32
+    assert table.subject_start.tolist() == [201, 1, 1, 1]
+
+    # Vectorized masks select rows
+    good = table[(table.evalue < 1e-5) & (table.identity > 95)]
+    assert good.query.tolist() == ['query1', 'query3']
+
+    # Group-bys
+    best = table.best_hits()
+    assert best.subject.tolist() == ['subject2', 'subject1', 'subject1']
+    best = table.best_hits(score='evalue')
+    assert best.subject.tolist() == ['subject1', 'subject1', 'subject1']
+    best = table.best_hits(group='subject')
+    assert best.query.tolist() == ['query1', 'query1']
+    assert best.bitscore.tolist() == [180.5, 190]
+    assert table.hits_per_subject() == {'subject1': 3, 'subject2': 1}
+
+    # Entries are written back as the original lines
+    lines = [entry.write() for entry in table.entries()]
+    assert lines[0] == 'query1\tsubject1\t98.7\t100\t1\t0\t1\t100\t201\t' \
+                       '300\t1e-50\t180.5' + os.linesep
+    assert lines[3].split('\t')[2] == '100.0'
+
+
+def test_b6_table_custom():
+    """Test bio_utils' load_b6_table typing of custom specifiers"""
+
+    header = ['qseqid', 'sseqid', 'evalue', 'qlen', 'ppos', 'qseq', 'qframe']
+    b6_data = 'q1\ts1\t1e-5\t300\t88.5\tACGT\t-1{0}' \
+              'q2\ts1\t1e-3\t-\t-\t-\t-{0}'.format(os.linesep)
+    table = load_b6_table(StringIO(b6_data), header=header)
+
+    assert list(table.columns) == ['qseqid', 'sseqid', 'evalue', 'qlen',
+                                   'ppos', 'qseq', 'qframe']
+    assert table.qseqid.tolist() == ['q1', 'q2']
+    missing = np.iinfo(np.int32).min
+    assert table.qlen.tolist() == [300, missing]
+    assert table.qframe.tolist() == [-1, missing]
+    assert table.ppos.dtype == np.float32 and np.isnan(table.ppos[1])
+    assert table.qseq.tolist() == ['ACGT', None]
+
+    # Frames of -1 are kept apart from missing values
+    entries = list(table.entries())
+    assert entries[0].custom_fs['qframe'] == -1
+    assert entries[0].write() == 'q1\ts1\t1e-05\t300\t88.5\tACGT\t-1' + \
+        os.linesep
+    assert entries[1].write() == 'q2\ts1\t0.001\t-\t-\t-\t-' + os.linesep
+
+    # Malformed lines
+    with pytest.raises(FormatError):
+        load_b6_table(StringIO('q1\ts1\t1e-5'), header=header)
+    with pytest.raises(FormatError):
+        load_b6_table(StringIO('q1\ts1\tx\t1\t1\tA\t1'), header=header)
+
+    assert len(load_b6_table(StringIO(''))) == 0
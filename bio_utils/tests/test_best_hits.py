@@ -0,0 +1,84 @@
+#! /usr/bin/env python3
+
+"""Test bio_utils' best_hits
+
+Copyright:
+
+    test_best_hits.py test bio_utils' best_hits
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from ..blast_tools import best_hits
+from ..iterators import B6Reader
+from io import StringIO
+import os
+import pytest
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.1.1'
+
+
+def test_best_hits():
+    """Test bio_utils' best_hits keys, ties, and grouping check"""
+
+    b6_lines = ['query1\tsubject1\t98.7\t100\t1\t0\t1\t100\t1\t100\t'
+                '1e-50\t180',
+                'query1\tsubject2\t90.0\t100\t10\t0\t1\t100\t1\t100\t'
+                '1e-40\t190',
+                'query1\tsubject3\t90.0\t100\t10\t0\t1\t100\t1\t100\t'
+                '1e-40\t190',
+                '# Comment',
+                'query2\tsubject1\t75.5\t50\t12\t1\t5\t54\t1\t50\t'
+                '0.001\t40.2']
+    b6_data = os.linesep.join(b6_lines) + os.linesep
+
+    def subjects(*args, **kwargs):
+        reader = B6Reader(StringIO(b6_data))
+        return [(entry.query, entry.subject) for entry in
+                best_hits(reader.iterate(comments=True), *args, **kwargs)]
+
+    assert subjects() == [('query1', 'subject2'), ('query2', 'subject1')]
+    assert subjects(ties='all') == [('query1', 'subject2'),
+                                    ('query1', 'subject3'),
+                                    ('query2', 'subject1')]
+    assert subjects(key='evalue') == [('query1', 'subject1'),
+                                      ('query2', 'subject1')]
+    assert subjects(key='identity') == [('query1', 'subject1'),
+                                        ('query2', 'subject1')]
+    assert list(best_hits([])) == []
+
+    with pytest.raises(ValueError):
+        subjects(ties='none')
+
+    # Alignments of query1 are split by query2, only found if checked
+    unsorted = b6_data + b6_lines[0] + os.linesep
+    assert len(list(best_hits(B6Reader(StringIO(unsorted)).iterate()))) == 3
+    with pytest.raises(ValueError):
+        list(best_hits(B6Reader(StringIO(unsorted)).iterate(),
+                       check_grouped=True))
+
+    # Missing custom scores rank last, absent ones raise an error
+    header = ['qseqid', 'sseqid', 'qcovs']
+    custom = 'q1\ts1\t-{0}q1\ts2\t80{0}q1\ts3\t-{0}'.format(os.linesep)
+    hits = best_hits(B6Reader(StringIO(custom)).iterate(header=header),
+                     key='qcovs')
+    assert [entry.custom_fs['sseqid'] for entry in hits] == ['s2']
+    with pytest.raises(ValueError):
+        list(best_hits(B6Reader(StringIO(b6_data)).iterate(), key='qcovs'))
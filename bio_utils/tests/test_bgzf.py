@@ -0,0 +1,71 @@
+#! /usr/bin/env python3
+
+"""Test bio_utils' BgzfReader and BgzfWriter
+
+Copyright:
+
+    test_bgzf.py test bio_utils' BgzfReader and BgzfWriter
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from ..file_tools import BgzfReader
+from ..file_tools import BgzfWriter
+import gzip
+import os
+import tempfile
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.0.0'
+
+
+def test_bgzf():
+    """Test bio_utils' BgzfWriter output and BgzfReader seeking"""
+
+    # Write enough lines to span several blocks
+    lines = ['line{0}\t{1}\n'.format(i, 'A' * (i % 50)).encode('utf-8')
+             for i in range(5000)]
+    fd, path = tempfile.mkstemp(suffix='.gz')
+    os.close(fd)
+    with BgzfWriter(path) as writer:
+        for line in lines:
+            writer.write(line)
+
+    # BGZF files are valid gzip files
+    with open(path, 'rb') as handle:
+        assert gzip.decompress(handle.read()) == b''.join(lines)
+
+    # Record virtual offset of each line, then seek back to them
+    with BgzfReader(path) as reader:
+        offsets = []
+        for line in lines:
+            offsets.append(reader.tell())
+            assert reader.readline() == line
+        assert reader.readline() == b''
+        assert len(set(offset >> 16 for offset in offsets)) > 1
+
+        for i in (4999, 0, 2500, 2501, 17):
+            reader.seek(offsets[i])
+            assert reader.readline() == lines[i]
+
+        reader.seek(offsets[10])
+        assert reader.read(len(lines[10]) + 4) == lines[10] + lines[11][:4]
+        assert list(reader)[-1] == lines[-1]
+
+    os.remove(path)
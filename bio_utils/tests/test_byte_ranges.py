@@ -0,0 +1,90 @@
+#! /usr/bin/env python3
+
+"""Test bio_utils' line_byte_ranges and read_byte_range
+
+Copyright:
+
+    test_byte_ranges.py test bio_utils' line_byte_ranges and read_byte_range
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from ..file_tools import line_byte_ranges
+from ..file_tools import ordered_map
+from ..file_tools import read_byte_range
+from concurrent.futures import ThreadPoolExecutor
+import os
+import tempfile
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.1.0'
+
+
+def test_byte_ranges():
+    """Test bio_utils' line_byte_ranges and read_byte_range"""
+
+    lines = [b'short\n', b'a much longer line of text\n', b'x\n', b'\n',
+             b'last line without newline']
+
+    fd, path = tempfile.mkstemp()
+    with os.fdopen(fd, 'wb') as handle:
+        handle.write(b''.join(lines))
+
+    try:
+        size = os.path.getsize(path)
+
+        # Ranges are contiguous, line-aligned, and return every line once
+        for chunks in range(1, 10):
+            ranges = line_byte_ranges(path, chunks)
+            assert ranges[0][0] == 0
+            assert ranges[-1][1] == size
+            assert len(ranges) <= chunks
+            for first, second in zip(ranges[:-1], ranges[1:]):
+                assert first[1] == second[0]
+            read = [line for start, end in ranges
+                    for line in read_byte_range(path, start, end)]
+            assert read == lines
+
+        assert line_byte_ranges(path, 2) == [(0, 33), (33, size)]
+        assert list(read_byte_range(path, 6, 35)) == lines[1:3]
+
+        # Empty files have a single, empty range
+        open(path, 'wb').close()
+        assert line_byte_ranges(path, 4) == [(0, 0)]
+        assert list(read_byte_range(path, 0, 0)) == []
+
+    finally:
+        os.remove(path)
+
+
+def test_ordered_map():
+    """Test bio_utils' ordered_map keeps order and reads items lazily"""
+
+    read = []
+
+    def items():
+        for i in range(20):
+            read.append(i)
+            yield i
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        results = ordered_map(pool, lambda i: i * i, items(), 4)
+        assert next(results) == 0
+        assert len(read) == 4  # Only the window was submitted
+        assert list(results) == [i * i for i in range(1, 20)]
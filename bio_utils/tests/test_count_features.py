@@ -0,0 +1,99 @@
+#! /usr/bin/env python3
+
+"""Test bio_utils' count_features
+
+Copyright:
+
+    test_count_features.py test bio_utils' count_features
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from ..iterators import GFF3Reader
+from ..iterators import sam_iter
+from ..sam_tools import count_features
+from io import StringIO
+import os
+import tempfile
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.0.0'
+
+
+# Store two overlapping genes on opposite strands, gene2 made of two CDS
+gff3_data = '##gff-version 3{0}' \
+            'contig1\ttest\tCDS\t101\t200\t.\t+\t0\tID=cds1;Parent=gene1{0}' \
+            'contig1\ttest\tCDS\t151\t300\t.\t-\t0\tID=cds2;Parent=gene2{0}' \
+            'contig1\ttest\tCDS\t401\t500\t.\t-\t0\tID=cds3;Parent=gene2' \
+            '{0}'.format(os.linesep)
+
+# Store reads in cds1 only, in cds1 and cds2, spliced over both CDS of gene2,
+# partly outside cds1, unmapped, of low quality, and on no feature
+sam_data = '@SQ\tSN:contig1\tLN:1000{0}' \
+           'read1\t0\tcontig1\t111\t42\t20M\t*\t0\t0\t*\t*{0}' \
+           'read2\t16\tcontig1\t161\t42\t20M\t*\t0\t0\t*\t*{0}' \
+           'read3\t16\tcontig1\t281\t42\t10M110N10M\t*\t0\t0\t*\t*{0}' \
+           'read4\t0\tcontig1\t91\t42\t20M\t*\t0\t0\t*\t*{0}' \
+           'read5\t4\t*\t0\t0\t*\t*\t0\t0\t*\t*{0}' \
+           'read6\t0\tcontig1\t121\t2\t20M\t*\t0\t0\t*\t*{0}' \
+           'read7\t0\tcontig1\t701\t42\t20M\t*\t0\t0\t*\t*' \
+           '{0}'.format(os.linesep)
+
+
+def count(**kwargs):
+    """Return counts of sam_data as a dict"""
+
+    gff3_handle = StringIO(gff3_data)
+    gff3_handle.name = 'test.gff3'
+    sam = kwargs.pop('sam', None)
+    if sam is None:
+        sam = sam_iter(iter(sam_data.strip().split(os.linesep)))
+    counts = count_features(sam, GFF3Reader(gff3_handle), min_mapq=10,
+                            **kwargs)
+    return dict(counts.counts), (counts.no_feature, counts.ambiguous,
+                                 counts.too_low_aqual, counts.not_aligned)
+
+
+def test_count_features():
+    """Test bio_utils' count_features modes, strands, and processes"""
+
+    # Reads overlapping features of two groups are ambiguous in union mode
+    assert count() == ({'cds1': 2, 'cds2': 0, 'cds3': 0}, (1, 2, 1, 1))
+    assert count(attribute='Parent') == ({'gene1': 2, 'gene2': 1},
+                                         (1, 1, 1, 1))
+    assert count(attribute='Parent', mode='intersection-strict') == \
+        ({'gene1': 1, 'gene2': 1}, (2, 1, 1, 1))
+    assert count(attribute='Parent', mode='intersection-nonempty') == \
+        ({'gene1': 2, 'gene2': 1}, (1, 1, 1, 1))
+    assert count(attribute='Parent', nonunique='all') == \
+        ({'gene1': 3, 'gene2': 2}, (1, 1, 1, 1))
+
+    # Stranded counting only assigns reads on the strand of features
+    assert count(attribute='Parent', stranded='yes') == \
+        ({'gene1': 2, 'gene2': 2}, (1, 0, 1, 1))
+    assert count(attribute='Parent', stranded='reverse') == \
+        ({'gene1': 1, 'gene2': 0}, (4, 0, 1, 1))
+
+    # Count a SAM file in several processes
+    fd, path = tempfile.mkstemp(suffix='.sam')
+    with os.fdopen(fd, 'w') as handle:
+        handle.write(sam_data)
+    assert count(sam=path, attribute='Parent', threads=2) == \
+        count(attribute='Parent')
+    os.remove(path)
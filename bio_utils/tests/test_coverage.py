@@ -0,0 +1,93 @@
+#! /usr/bin/env python3
+
+"""Test bio_utils' coverage and cigar_blocks
+
+Copyright:
+
+    test_coverage.py test bio_utils' coverage and cigar_blocks
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from ..iterators import sam_header
+from ..iterators import sam_iter
+from ..sam_tools import cigar_blocks
+from ..sam_tools import coverage
+import os
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.0.0'
+
+
+def test_cigar_blocks():
+    """Test bio_utils' cigar_blocks with deletions, splices, and clipping"""
+
+    assert cigar_blocks(1, '10M') == [(0, 10)]
+    assert cigar_blocks(1, '3M2D4M') == [(0, 3), (5, 9)]
+    assert cigar_blocks(1, '2M1I3M') == [(0, 5)]
+    assert cigar_blocks(101, '5S10M500N10M5H') == [(100, 110), (610, 620)]
+    assert cigar_blocks(1, '4=1X4=') == [(0, 9)]
+    assert cigar_blocks(0, '*') == []
+
+
+def test_coverage():
+    """Test bio_utils' coverage with multiple SAM entries"""
+
+    sam_data = '@SQ\tSN:contig1\tLN:20{0}' \
+               'read1\t0\tcontig1\t1\t42\t5M\t*\t0\t0\tACGTA\tFFFFF{0}' \
+               'read2\t0\tcontig1\t3\t42\t2M3D2M\t*\t0\t0\tACGT\tFFFF{0}' \
+               'read3\t16\tcontig1\t18\t42\t5M\t*\t0\t0\tACGTA\tFFFFF{0}' \
+               'read4\t256\tcontig1\t1\t42\t5M\t*\t0\t0\tACGTA\tFFFFF{0}' \
+               'read5\t0\tcontig1\t1\t1\t5M\t*\t0\t0\tACGTA\tFFFFF{0}' \
+               'read6\t4\t*\t0\t0\t*\t*\t0\t0\tACGTA\tFFFFF{0}' \
+               'read7\t0\tcontig2\t1\t42\t5M\t*\t0\t0\tACGTA\tFFFFF' \
+               .format(os.linesep)
+
+    entries = sam_iter(iter(sam_data.split(os.linesep)))
+    profiles = coverage(entries, {'contig1': 20, 'contig3': 4}, min_mapq=5)
+
+    assert list(profiles.keys()) == ['contig1', 'contig3']
+
+    # Secondary, low quality, unmapped, and unrequested entries are skipped
+    # and read3 is clipped to the end of contig1
+    depth = profiles['contig1'].depth
+    assert depth.tolist() == [1, 1, 2, 2, 1, 0, 0, 1, 1, 0,
+                              0, 0, 0, 0, 0, 0, 0, 1, 1, 1]
+    assert profiles['contig1'].mean() == 0.6
+    assert profiles['contig1'].breadth() == 0.5
+    assert profiles['contig1'].breadth(threshold=2) == 0.1
+    assert profiles['contig1'].runs()[:3] == [(0, 2, 1), (2, 4, 2),
+                                              (4, 5, 1)]
+    assert profiles['contig1'].write().split(os.linesep)[:2] == \
+        ['contig1\t0\t2\t1', 'contig1\t2\t4\t2']
+
+    # References without alignments have zero depth
+    assert profiles['contig3'].depth.tolist() == [0, 0, 0, 0]
+    assert profiles['contig3'].breadth() == 0.0
+    assert profiles['contig3'].write() == ''
+    assert profiles['contig3'].write(zeros=True) == \
+        'contig3\t0\t4\t0{0}'.format(os.linesep)
+
+    # Use reference lengths from the SAM header
+    sam_handle = iter(sam_data.split(os.linesep))
+    header, first_line = sam_header(sam_handle)
+    profiles = coverage(sam_iter(sam_handle, start_line=first_line), header)
+
+    assert list(profiles.keys()) == ['contig1']
+    assert profiles['contig1'].depth.tolist()[:5] == [2, 2, 3, 3, 2]
@@ -0,0 +1,100 @@
+#! /usr/bin/env python3
+
+"""Test bio_utils' GFF3Attributes
+
+Copyright:
+
+    test_gff3_attributes.py test bio_utils' GFF3Attributes
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from ..iterators import GFF3Attributes
+from ..iterators import GFF3Reader
+from collections import OrderedDict
+from io import StringIO
+import os
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.1.0'
+
+
+def test_gff3_attributes():
+    """Test bio_utils' GFF3Attributes parses lazily and writes verbatim"""
+
+    # Store GFF3 data with unusual but valid attribute formatting
+    gff3_data = '##gff-version 3{0}' \
+                'contig1\ttest\tgene\t1\t100\t.\t+\t.\t' \
+                'note=a%3Bb;ID=gene1;Alias=x,y%2Cz;{0}' \
+                'contig1\ttest\tCDS\t1\t100\t.\t+\t0\t' \
+                'ID=cds1;Parent=gene1'.format(os.linesep)
+    gff3_handle = StringIO(gff3_data)
+    gff3_handle.name = 'test.gff3'
+    entries = list(GFF3Reader(gff3_handle).iterate())
+
+    # Unaccessed attributes are unparsed and written back unchanged
+    gene, cds = entries
+    assert type(gene.attributes) is GFF3Attributes
+    assert not gene.attributes.parsed
+    assert gene.write() == 'contig1\ttest\tgene\t1\t100\t.\t+\t.\t' \
+                           'note=a%3Bb;ID=gene1;Alias=x,y%2Cz;' \
+                           '{0}'.format(os.linesep)
+
+    # Values are percent-decoded and lists split on access
+    assert gene.attributes['note'] == 'a;b'
+    assert gene.attributes.parsed
+    assert gene.attributes['Alias'] == ['x', 'y,z']
+    assert list(gene.attributes) == ['note', 'ID', 'Alias']
+    assert 'ID' in gene.attributes
+    assert gene.attributes.get('Parent') is None
+    assert len(gene.attributes) == 3
+
+    # Parsed attributes are rebuilt with reserved tags first and escaped
+    assert gene.attribute_string() == 'ID=gene1;Alias=x,y%2Cz;note=a%3Bb'
+
+    # Modified attributes are written back
+    cds.attributes['Note'] = 'a=b'
+    del cds.attributes['Parent']
+    assert cds.attributes == OrderedDict([('ID', 'cds1'), ('Note', 'a=b')])
+    assert cds.write() == 'contig1\ttest\tCDS\t1\t100\t.\t+\t0\t' \
+                          'ID=cds1;Note=a%3Db{0}'.format(os.linesep)
+
+
+def test_gff3_attributes_round_trip():
+    """Test bio_utils' GFF3Attributes re-encodes decoded values on write"""
+
+    gff3_line = 'contig1\ttest\tgene\t1\t100\t.\t+\t.\t' \
+                'ID=gene1;Note=a%0Ab%25c,d%3Be%09f'
+    gff3_handle = StringIO('##gff-version 3{0}{1}{0}'.format(os.linesep,
+                                                             gff3_line))
+    gff3_handle.name = 'test.gff3'
+    gene = next(GFF3Reader(gff3_handle).iterate())
+
+    # Decoded values are written back percent-encoded on one line
+    assert gene.attributes['Note'] == ['a\nb%c', 'd;e\tf']
+    gene.attributes['ID'] = 'gene2'
+    written = gene.write()
+    assert written == gff3_line.replace('gene1', 'gene2') + os.linesep
+
+    # Written entry is read back with the same attributes
+    gff3_handle = StringIO('##gff-version 3{0}{1}'.format(os.linesep,
+                                                          written))
+    gff3_handle.name = 'test.gff3'
+    regene = next(GFF3Reader(gff3_handle).iterate())
+    assert regene.attributes == gene.attributes
@@ -0,0 +1,110 @@
+#! /usr/bin/env python3
+
+"""Test bio_utils' GFF3Reader sequence extraction from "##FASTA" sections
+
+Copyright:
+
+    test_gff3_fasta.py test bio_utils' GFF3Reader sequence extraction
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from ..iterators import GFF3Reader
+from io import StringIO
+import os
+import pytest
+from tempfile import mkstemp
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.2.0'
+
+
+def test_gff3_fasta():
+    """Test bio_utils' GFF3Reader.extract_sequence and cds_sequences"""
+
+    # Store GFF3 data with a spliced minus strand transcript and FASTA
+    gff3_data = '##gff-version 3{0}' \
+                'contig1\ttest\tCDS\t3\t8\t.\t+\t0\tID=cds1{0}' \
+                'contig2\ttest\tmRNA\t2\t12\t.\t-\t.\tID=mrna1{0}' \
+                'contig2\ttest\tCDS\t10\t12\t.\t-\t0\tParent=mrna1{0}' \
+                'contig2\ttest\tCDS\t2\t4\t.\t-\t0\tParent=mrna1{0}' \
+                '##FASTA{0}' \
+                '>contig1 first contig{0}' \
+                'AAATGC{0}' \
+                'CCTTT{0}' \
+                '>contig2{0}' \
+                'GATGCCCCCTTCA{0}'.format(os.linesep)
+    gff3_handle = StringIO(gff3_data)
+    gff3_handle.name = 'test.gff3'
+    reader = GFF3Reader(gff3_handle)
+
+    # Sequences cannot be extracted before "##FASTA" is read
+    with pytest.raises(ValueError):
+        reader.extract_sequence(None)
+
+    # Iteration records where sequences start without reading them
+    entries = list(reader.iterate())
+    assert len(entries) == 4
+    assert reader.fasta_offset == gff3_data.index('>contig1')
+    assert reader.fasta_index is None
+
+    # Plus strand features span FASTA lines, minus strand are complemented
+    gff3_handle.seek(0)  # Sequences are read from offset even if moved
+    assert reader.extract_sequence(entries[0]) == 'ATGCCC'
+    width = len('AAATGC' + os.linesep)
+    assert list(reader.fasta_index.items()) == [
+        ('contig1', (gff3_data.index('AAATGC'), 11, 6, width)),
+        ('contig2', (gff3_data.index('GATGC'), 13, 13, width + 7))]
+    assert reader.extract_sequence(entries[1]) == 'GAAGGGGGCAT'
+    assert reader.extract_sequence(entries[2:]) == 'GAACAT'
+    assert list(reader.cds_sequences(entries)) == [('cds1', 'ATGCCC'),
+                                                   ('mrna1', 'GAACAT')]
+
+    # Features beyond their sequence raise an error
+    entries[0].end = 12
+    with pytest.raises(ValueError):
+        reader.extract_sequence(entries[0])
+
+    # Unseekable handles are read from where iteration stopped
+    reader = GFF3Reader(iter(gff3_data.encode('utf-8').splitlines(True)))
+    entries = list(reader.iterate())
+    assert reader.fasta_offset is None
+    assert reader.extract_sequence(entries[1]) == 'GAAGGGGGCAT'
+
+    # Text files are indexed by byte offsets of the file itself
+    gff3_data = gff3_data.replace('CCTTT', 'CC{0}TTT'.format(os.linesep))
+    gff3_file = mkstemp()[1]
+    try:
+        with open(gff3_file, 'wb') as out_handle:
+            out_handle.write(gff3_data.encode('utf-8'))
+        with open(gff3_file, 'r') as gff3_handle:
+            reader = GFF3Reader(gff3_handle)
+            entries = list(reader.iterate())
+            data = gff3_data.encode('utf-8')
+            assert reader.fasta_offset == data.index(b'>contig1')
+            assert reader.extract_sequence(entries[0]) == 'ATGCCC'
+            assert reader.extract_sequence(entries[2:]) == 'GAACAT'
+
+            # Lines of differing length are read without seeking into them
+            assert reader.fasta_index['contig1'] == \
+                (data.index(b'AAATGC'), 11, None, None)
+            assert reader.fasta_index['contig2'] == \
+                (data.index(b'GATGC'), 13, 13, 13 + len(os.linesep))
+    finally:
+        os.remove(gff3_file)
@@ -0,0 +1,100 @@
+#! /usr/bin/env python3
+
+"""Test bio_utils' GFF3Graph
+
+Copyright:
+
+    test_gff3_graph.py test bio_utils' GFF3Graph
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from ..gff3_tools import GFF3Graph
+from ..iterators import GFF3Reader
+from io import StringIO
+import os
+import pytest
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.0.0'
+
+
+def test_gff3_graph():
+    """Test bio_utils' GFF3Graph with a two-transcript gene"""
+
+    # Children precede parents, exon1 is shared, and CDS spans two lines
+    gff3_data = '##gff-version 3{0}' \
+                'ctg1\ttest\texon\t100\t200\t.\t+\t.\tID=exon1;' \
+                'Parent=mRNA1,mRNA2{0}' \
+                'ctg1\ttest\tgene\t100\t900\t.\t+\t.\tID=gene1{0}' \
+                'ctg1\ttest\tmRNA\t100\t900\t.\t+\t.\tID=mRNA1;' \
+                'Parent=gene1{0}' \
+                'ctg1\ttest\tmRNA\t100\t600\t.\t+\t.\tID=mRNA2;' \
+                'Parent=gene1{0}' \
+                'ctg1\ttest\tCDS\t150\t200\t.\t+\t0\tID=cds1;' \
+                'Parent=mRNA1{0}' \
+                'ctg1\ttest\tCDS\t700\t800\t.\t+\t1\tID=cds1;' \
+                'Parent=mRNA1{0}' \
+                'ctg1\ttest\texon\t500\t600\t.\t+\t.\tParent=mRNA2{0}' \
+                'ctg1\ttest\tCDS\t550\t600\t.\t+\t0\tParent=mRNA9' \
+                .format(os.linesep)
+
+    gff3_handle = StringIO(gff3_data)
+    gff3_handle.name = 'test.gff3'
+    graph = GFF3Graph(GFF3Reader(gff3_handle).iterate())
+
+    def names(features):
+        return ['{0}:{1}'.format(feature.type, feature.start)
+                for feature in features]
+
+    assert len(graph) == 8
+    assert 'cds1' in graph and 'mRNA9' not in graph
+    assert names(graph['cds1']) == ['CDS:150', 'CDS:700']
+    assert list(graph.ids.keys()) == ['exon1', 'gene1', 'mRNA1', 'mRNA2',
+                                      'cds1']
+
+    assert names(graph.children('gene1')) == ['mRNA:100', 'mRNA:100']
+    assert names(graph.children(graph['mRNA2'][0])) == ['exon:100',
+                                                        'exon:500']
+    assert graph.children(graph['cds1'][0]) == []
+
+    assert names(graph.parents(graph['exon1'][0])) == ['mRNA:100',
+                                                       'mRNA:100']
+    assert names(graph.ancestors(graph['exon1'][0])) == ['mRNA:100',
+                                                         'mRNA:100',
+                                                         'gene:100']
+
+    # The shared exon follows both of its parents
+    assert names(graph.descendants('gene1')) == ['mRNA:100', 'CDS:150',
+                                                 'CDS:700', 'mRNA:100',
+                                                 'exon:100', 'exon:500']
+    assert names(graph.traverse()) == ['gene:100', 'mRNA:100', 'CDS:150',
+                                       'CDS:700', 'mRNA:100', 'exon:100',
+                                       'exon:500', 'CDS:550']
+
+    # Unresolved parents are reported and their features are roots
+    assert [(entry.start, parent) for entry, parent in graph.unresolved] == \
+        [(550, 'mRNA9')]
+    assert names(graph.roots()) == ['gene:100', 'CDS:550']
+
+    # Unparsed attributes cannot be linked
+    gff3_handle = StringIO(gff3_data)
+    gff3_handle.name = 'test.gff3'
+    with pytest.raises(TypeError):
+        GFF3Graph(GFF3Reader(gff3_handle).iterate(parse_attr=False))
@@ -0,0 +1,110 @@
+#! /usr/bin/env python3
+
+"""Test bio_utils' GFF3IntervalIndex and GFF3Entry.overlap
+
+Copyright:
+
+    test_gff3_interval_index.py test bio_utils' GFF3IntervalIndex
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from ..gff3_tools import GFF3IntervalIndex
+from ..iterators import GFF3Reader
+from io import StringIO
+import os
+import pytest
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.0.0'
+
+
+# Store GFF3 data with nested and overlapping features on two contigs
+gff3_data = '##gff-version 3{0}' \
+            'contig1\ttest\tgene\t100\t1000\t.\t+\t.\tID=gene1{0}' \
+            'contig1\ttest\tCDS\t100\t400\t.\t+\t0\tID=cds1{0}' \
+            'contig1\ttest\tCDS\t600\t1000\t.\t+\t0\tID=cds2{0}' \
+            'contig1\ttest\tgene\t900\t1500\t.\t-\t.\tID=gene2{0}' \
+            'contig1\ttest\tgene\t3000\t3500\t.\t-\t.\tID=gene3{0}' \
+            'contig2\ttest\tgene\t1\t50\t.\t+\t.\tID=gene4'.format(os.linesep)
+
+
+def read_features():
+    """Return GFF3Entry instances of gff3_data"""
+
+    gff3_handle = StringIO(gff3_data)
+    gff3_handle.name = 'test.gff3'
+
+    return list(GFF3Reader(gff3_handle).iterate())
+
+
+def ids(features):
+    """Return ID attribute of each feature"""
+
+    return [feature.attributes['ID'] for feature in features]
+
+
+def test_gff3_overlap():
+    """Test bio_utils' GFF3Entry.overlap"""
+
+    features = read_features()
+
+    assert features[0].overlap(features[1])
+    assert features[1].overlap(features[0])
+    assert not features[1].overlap(features[2])
+    assert features[2].overlap(features[3])
+    assert not features[2].overlap(features[3], stranded=True)
+    assert not features[0].overlap(features[5])
+
+
+def test_gff3_interval_index():
+    """Test bio_utils' GFF3IntervalIndex with nested features"""
+
+    index = GFF3IntervalIndex(read_features())
+
+    assert len(index) == 6
+    assert ids(index.overlapping('contig1', 350, 650)) == ['gene1', 'cds1',
+                                                           'cds2']
+    assert ids(index.overlapping('contig1', 1000, 1000)) == ['gene1',
+                                                             'cds2', 'gene2']
+    assert ids(index.overlapping('contig1', 401, 599)) == ['gene1']
+    assert ids(index.overlapping('contig1', 1600, 2000)) == []
+    assert ids(index.overlapping('contig3', 1, 100)) == []
+
+    # Nearest features
+    assert ids(index.nearest('contig1', 450, 450)) == ['gene1']
+    assert ids(index.nearest('contig1', 1700, 1800)) == ['gene2']
+    assert ids(index.nearest('contig1', 2500, 2500)) == ['gene3']
+    assert ids(index.nearest('contig1', 2250, 2250)) == ['gene2', 'gene3']
+    assert ids(index.nearest('contig2', 80, 90)) == ['gene4']
+    assert index.nearest('contig3', 1, 100) == []
+
+    with pytest.raises(ValueError):
+        index.overlapping('contig1', 1, 100, strand='+')
+
+    # Stranded index
+    index = GFF3IntervalIndex(read_features(), stranded=True)
+
+    assert ids(index.overlapping('contig1', 950, 950, strand='+')) == \
+        ['gene1', 'cds2']
+    assert ids(index.overlapping('contig1', 950, 950, strand='-')) == \
+        ['gene2']
+    assert ids(index.overlapping('contig1', 950, 950)) == ['gene1', 'cds2',
+                                                           'gene2']
+    assert ids(index.nearest('contig1', 1600, 1600, strand='+')) == ['gene1']
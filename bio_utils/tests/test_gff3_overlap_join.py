@@ -0,0 +1,90 @@
+#! /usr/bin/env python3
+
+"""Test bio_utils' gff3_overlap_join
+
+Copyright:
+
+    test_gff3_overlap_join.py test bio_utils' gff3_overlap_join
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from ..gff3_tools import gff3_overlap_join
+from ..iterators import GFF3Reader
+from io import StringIO
+import os
+import pytest
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.0.0'
+
+
+def gff3_reader(gff3_data):
+    """Return GFF3Reader of a string"""
+
+    gff3_handle = StringIO(gff3_data)
+    gff3_handle.name = 'test.gff3'
+
+    return GFF3Reader(gff3_handle)
+
+
+def test_gff3_overlap_join():
+    """Test bio_utils' gff3_overlap_join with two sorted inputs"""
+
+    genes = '##gff-version 3{0}' \
+            'contig1\ttest\tgene\t100\t500\t.\t+\t.\tID=gene1{0}' \
+            'contig1\ttest\tgene\t450\t900\t.\t-\t.\tID=gene2{0}' \
+            'contig1\ttest\tgene\t2000\t2500\t.\t+\t.\tID=gene3{0}' \
+            'contig2\ttest\tgene\t1\t300\t.\t+\t.\tID=gene4'.format(os.linesep)
+
+    repeats = 'contig1\ttest\trepeat\t50\t120\t.\t+\t.\tID=rep1{0}' \
+              'contig1\ttest\trepeat\t480\t480\t.\t-\t.\tID=rep2{0}' \
+              'contig1\ttest\trepeat\t901\t1999\t.\t+\t.\tID=rep3{0}' \
+              'contig2\ttest\trepeat\t300\t400\t.\t.\t.\tID=rep4{0}' \
+              'contig3\ttest\trepeat\t1\t400\t.\t+\t.\tID=rep5' \
+              .format(os.linesep)
+
+    def join(**kwargs):
+        return [(gene.attributes['ID'], repeat.attributes['ID'])
+                for gene, repeat in gff3_overlap_join(gff3_reader(genes),
+                                                      gff3_reader(repeats),
+                                                      **kwargs)]
+
+    assert join() == [('gene1', 'rep1'), ('gene1', 'rep2'),
+                      ('gene2', 'rep2'), ('gene4', 'rep4')]
+    assert join(stranded=True) == [('gene1', 'rep1'), ('gene2', 'rep2')]
+
+    # Iterators of features are accepted as well as readers
+    pairs = list(gff3_overlap_join(gff3_reader(repeats).iterate(),
+                                   gff3_reader(genes).iterate()))
+    assert [(a.attributes['ID'], b.attributes['ID']) for a, b in pairs] == \
+        [('rep1', 'gene1'), ('rep2', 'gene1'), ('rep2', 'gene2'),
+         ('rep4', 'gene4')]
+
+    # Custom seqid order
+    assert join(seqid_order=['contig1', 'contig2', 'contig3']) == join()
+    with pytest.raises(ValueError):
+        join(seqid_order=['contig2', 'contig1', 'contig3'])
+
+    # Unsorted input
+    unsorted = 'contig1\ttest\tgene\t500\t600\t.\t+\t.\tID=gene1{0}' \
+               'contig1\ttest\tgene\t100\t200\t.\t+\t.\tID=gene2' \
+               .format(os.linesep)
+    with pytest.raises(ValueError):
+        list(gff3_overlap_join(gff3_reader(unsorted), gff3_reader(repeats)))
@@ -0,0 +1,69 @@
+#! /usr/bin/env python3
+
+"""Test bio_utils' load_gff3_table
+
+Copyright:
+
+    test_gff3_table.py test bio_utils' load_gff3_table
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from ..gff3_tools import load_gff3_table
+from io import StringIO
+import numpy as np
+import os
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.0.0'
+
+
+def test_gff3_table():
+    """Test bio_utils' load_gff3_table columns, masks, and entries"""
+
+    gff3_lines = ['contig1\ttest\tgene\t1\t1000\t.\t+\t.\tID=gene1',
+                  'contig1\ttest\tCDS\t1\t1000\t0.5\t+\t0\t'
+                  'ID=cds%3B1;Parent=gene1',
+                  'contig2\tother\tCDS\t10\t100\t12\t-\t2\tParent=gene2',
+                  'contig2\ttest\tCDS\t500\t1200\t.\t.\t.\tNote=x;ID=cds3']
+    gff3_data = '##gff-version 3{0}{1}{0}##FASTA{0}>contig1{0}ACGT' \
+                '{0}'.format(os.linesep, os.linesep.join(gff3_lines))
+    table = load_gff3_table(StringIO(gff3_data), ids=True)
+
+    assert len(table) == 4
+    assert table.seqid.categories == ['contig1', 'contig2']
+    assert table.type.tolist() == ['gene', 'CDS', 'CDS', 'CDS']
+    assert table.start.dtype == np.int64
+    assert table.strand.tolist() == [1, 1, -1, 0]
+    assert table.phase.tolist() == [-1, 0, 2, -1]
+    assert np.isnan(table.score[0]) and table.score[2] == 12.0
+    assert table.ids.tolist() == ['gene1', 'cds;1', None, 'cds3']
+
+    # Vectorized masks select rows
+    long_cds = table[(table.type == 'CDS') & (table.end - table.start > 300)]
+    assert long_cds.ids.tolist() == ['cds;1', 'cds3']
+    assert len(table[table.type == 'mRNA']) == 0
+    assert table.source.isin(['other']).tolist() == [False, False, True,
+                                                     False]
+    assert table[table.seqid != 'contig1'].seqid[0] == 'contig2'
+
+    # Rows are written back unchanged
+    assert [entry.write() for entry in table.entries()] == \
+           [line + os.linesep for line in gff3_lines]
+    assert next(long_cds.entries()).attributes['Parent'] == 'gene1'
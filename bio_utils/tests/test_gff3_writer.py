@@ -0,0 +1,87 @@
+#! /usr/bin/env python3
+
+"""Test bio_utils' GFF3Writer
+
+Copyright:
+
+    test_gff3_writer.py test bio_utils' GFF3Writer
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from ..iterators import GFF3Reader
+from ..iterators import GFF3Writer
+from io import StringIO
+import os
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.0.1'
+
+
+class CountingHandle(StringIO):
+    """StringIO that counts calls to write"""
+
+    writes = 0
+
+    def write(self, data):
+        self.writes += 1
+        return StringIO.write(self, data)
+
+
+def test_gff3_writer():
+    """Test bio_utils' GFF3Writer passthrough and buffering"""
+
+    # Store GFF3 data with a zero-padded start only kept by passthrough
+    gff3_lines = ['##gff-version 3',
+                  'contig1\ttest\tgene\t01\t100\t.\t+\t.\tID=gene1;note=a',
+                  'contig1\ttest\tCDS\t1\t100\t0.5\t+\t0\tParent=gene1',
+                  'contig1\ttest\tCDS\t150\t200\t.\t+\t0\tParent=gene1']
+    gff3_handle = StringIO(os.linesep.join(gff3_lines))
+    gff3_handle.name = 'test.gff3'
+    entries = list(GFF3Reader(gff3_handle).iterate(headers=True))
+
+    # Unchanged entries are written as read
+    out_handle = CountingHandle()
+    with GFF3Writer(out_handle, buffer_size=2) as writer:
+        writer.write_entries(entries)
+    assert out_handle.getvalue() == os.linesep.join(gff3_lines) + os.linesep
+    assert out_handle.writes == 2
+
+    # Changed columns and accessed attributes are formatted again
+    entries[1].attributes['note'] = 'a;b'
+    entries[2].end = 120
+    entries[3].attributes.get('Parent')
+    out_handle = StringIO()
+    with GFF3Writer(out_handle) as writer:
+        for entry in entries[1:]:
+            writer.write(entry)
+        assert out_handle.getvalue() == ''
+    assert out_handle.getvalue().split(os.linesep) == \
+        ['contig1\ttest\tgene\t1\t100\t.\t+\t.\tID=gene1;note=a%3Bb',
+         'contig1\ttest\tCDS\t1\t120\t0.5\t+\t0\tParent=gene1',
+         gff3_lines[3], '']
+
+    # Percent signs and control characters in values are escaped
+    entries[1].attributes['note'] = '50%\tsure\r\n'
+    out_handle = StringIO()
+    with GFF3Writer(out_handle) as writer:
+        writer.write(entries[1])
+    assert out_handle.getvalue() == \
+        'contig1\ttest\tgene\t1\t100\t.\t+\t.\t' \
+        'ID=gene1;note=50%25%09sure%0D%0A{0}'.format(os.linesep)
@@ -0,0 +1,130 @@
+#! /usr/bin/env python3
+
+"""Test bio_utils' merge_b6
+
+Copyright:
+
+    test_merge_b6.py test bio_utils' merge_b6
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from ..blast_tools import merge_b6
+from ..blast_tools.merge_b6 import main
+import os
+import pytest
+import sys
+import tempfile
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.2.0'
+
+
+def test_merge_b6():
+    """Test bio_utils' merge_b6 with single and multiple passes"""
+
+    shards = [[('query1', 'subject1', '90'), ('query3', 'subject1', '40')],
+              [('query1', 'subject2', '95'), ('query1', 'subject3', '90'),
+               ('query2', 'subject1', '10')],
+              [('query2', 'subject2', '20')],
+              [],
+              [('query1', 'subject4', '90'), ('query3', 'subject2', '50')]]
+
+    tmp_dir = tempfile.mkdtemp()
+    paths = []
+    try:
+        for i, shard in enumerate(shards):
+            path = os.path.join(tmp_dir, 'shard{0}.b6'.format(i))
+            with open(path, 'w') as handle:
+                handle.write('# BLASTN' + os.linesep)
+                for hit in shard:
+                    handle.write('{0}\t{1}\t90.0\t100\t1\t0\t1\t100\t1\t100\t'
+                                 '1e-5\t{2}{3}'.format(*hit + (os.linesep,)))
+            paths.append(path)
+
+        expected = [('query1', 'subject2'), ('query1', 'subject1'),
+                    ('query1', 'subject3'), ('query1', 'subject4'),
+                    ('query2', 'subject2'), ('query2', 'subject1'),
+                    ('query3', 'subject2'), ('query3', 'subject1')]
+        for max_open in (64, 2):
+            merged = [(entry.query, entry.subject)
+                      for entry in merge_b6(paths, max_open=max_open,
+                                            tmp_dir=tmp_dir)]
+            assert merged == expected
+            assert sorted(os.listdir(tmp_dir)) == \
+                sorted(os.path.basename(path) for path in paths)
+
+        lines = list(merge_b6(paths[2:3], raw=True))
+        assert lines == ['query2\tsubject2\t90.0\t100\t1\t0\t1\t100\t1\t100\t'
+                         '1e-5\t20' + os.linesep]
+
+        # Shards must be sorted by key
+        with pytest.raises(ValueError):
+            list(merge_b6(paths, key=('subject',)))
+        with pytest.raises(ValueError):
+            list(merge_b6(paths, key=('qcovs',)))
+
+        # Raw lines are ordered by their key columns alone
+        header = ['qseqid', 'bitscore', 'qframe']
+        with open(paths[3], 'w') as handle:
+            handle.write('q1\t50\tx{0}q2\t-\t-1{0}'.format(os.linesep))
+        lines = list(merge_b6(paths[3:4], key=('qseqid', '-bitscore'),
+                              header=header, raw=True))
+        assert lines == ['q1\t50\tx' + os.linesep, 'q2\t-\t-1' + os.linesep]
+    finally:
+        for path in paths:
+            os.remove(path)
+        os.rmdir(tmp_dir)
+
+
+def test_merge_b6_main(monkeypatch, capsys):
+    """Test merge_b6 script with a descending key"""
+
+    def b6_line(query, subject, bitscore):
+        return '{0}\t{1}\t90.0\t100\t1\t0\t1\t100\t1\t100\t1e-5\t{2}' \
+               .format(query, subject, bitscore)
+
+    shards = [[b6_line('query2', 'subject1', 90),
+               b6_line('query1', 'subject1', 40)],
+              [b6_line('query1', 'subject2', 50),
+               b6_line('query2', 'subject2', 10)]]
+    paths = []
+    try:
+        for shard in shards:
+            fd, path = tempfile.mkstemp(suffix='.b6')
+            with os.fdopen(fd, 'w') as handle:
+                handle.write(os.linesep.join(shard) + os.linesep)
+            paths.append(path)
+
+        # Shards are sorted by subject, then descending bitscore
+        monkeypatch.setattr(sys, 'argv', ['merge_b6.py', '--key',
+                                          'subject,bitscore:desc'] + paths)
+        main()
+        assert capsys.readouterr().out.split(os.linesep) == \
+            shards[0] + shards[1] + ['']
+
+        # A "-" prefix is also descending
+        assert [entry.bitscore for entry in
+                merge_b6(paths, key=('subject', '-bitscore'))] == \
+            [90, 40, 50, 10]
+        with pytest.raises(ValueError):
+            list(merge_b6(paths, key=('bitscore:down',)))
+    finally:
+        for path in paths:
+            os.remove(path)
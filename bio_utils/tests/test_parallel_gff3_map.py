@@ -0,0 +1,62 @@
+#! /usr/bin/env python3
+
+"""Test bio_utils' parallel_gff3_map
+
+Copyright:
+
+    test_parallel_gff3_map.py test bio_utils' parallel_gff3_map
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from ..gff3_tools import parallel_gff3_map
+from operator import attrgetter
+import os
+import tempfile
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.1.0'
+
+
+def test_parallel_gff3_map():
+    """Test bio_utils' parallel_gff3_map with and without worker processes"""
+
+    # Store GFF3 data with directives, comments, and a FASTA section
+    gff3_lines = ['##gff-version 3', '##sequence-region contig1 1 100000']
+    for i in range(1, 301):
+        gff3_lines.append('contig1\ttest\tgene\t{0}\t{1}\t.\t+\t.\tID=gene{0}'
+                          .format(i, i + 50))
+        if i % 100 == 0:
+            gff3_lines.extend(['###', '# comment'])
+    gff3_lines.extend(['##FASTA', '>contig1', 'ACGT' * 2000])
+
+    fd, path = tempfile.mkstemp(suffix='.gff3')
+    with os.fdopen(fd, 'w') as handle:
+        handle.write(os.linesep.join(gff3_lines) + os.linesep)
+
+    starts = list(range(1, 301))
+    assert list(parallel_gff3_map(path, attrgetter('start'))) == starts
+    assert list(parallel_gff3_map(path, attrgetter('start'),
+                                  workers=3)) == starts
+
+    # Small chunks are submitted in a window and yielded in file order
+    assert list(parallel_gff3_map(path, attrgetter('start'), workers=3,
+                                  chunk_size=500)) == starts
+
+    os.remove(path)
@@ -0,0 +1,62 @@
+#! /usr/bin/env python3
+
+"""Test bio_utils' reciprocal_best_hits
+
+Copyright:
+
+    test_reciprocal_best_hits.py test bio_utils' reciprocal_best_hits
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from ..blast_tools import reciprocal_best_hits
+from io import StringIO
+import os
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.0.0'
+
+
+def test_reciprocal_best_hits():
+    """Test bio_utils' reciprocal_best_hits with grouped and unsorted files"""
+
+    def b6(hits):
+        return os.linesep.join('{0}\t{1}\t90.0\t100\t1\t0\t1\t100\t1\t100\t'
+                               '{2}\t{3}'.format(*hit) for hit in hits)
+
+    ab_hits = [('a1', 'b1', '1e-50', '200'), ('a1', 'b2', '1e-40', '150'),
+               ('a2', 'b2', '1e-30', '120'), ('a2', 'b1', '1e-45', '180'),
+               ('a3', 'b3', '1e-20', '90')]
+    ba_hits = [('b1', 'a1', '1e-50', '190'), ('b2', 'a2', '1e-30', '130'),
+               ('b2', 'a1', '1e-20', '100'), ('b3', 'a2', '1e-25', '95')]
+
+    # a2's best hit b1 prefers a1, b3's best hit a3 prefers a2
+    expected = [('a1', 'b1', 200.0, 190.0)]
+    assert list(reciprocal_best_hits(StringIO(b6(ab_hits)),
+                                     StringIO(b6(ba_hits)))) == expected
+
+    # Unsorted lines give the same pairs
+    unsorted = [ab_hits[2], ab_hits[0], ab_hits[4], ab_hits[3], ab_hits[1]]
+    assert list(reciprocal_best_hits(StringIO(b6(unsorted)),
+                                     StringIO(b6(ba_hits[::-1])))) == expected
+
+    # Rank by E-value
+    pairs = list(reciprocal_best_hits(StringIO(b6(ab_hits)),
+                                      StringIO(b6(ba_hits)), score='evalue'))
+    assert pairs == [('a1', 'b1', 1e-50, 1e-50)]
@@ -21,6 +21,7 @@ Copyright:
     along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+from ..iterators import sam_header
 from ..iterators import sam_iter
 import os
 
@@ -164,3 +165,86 @@ def test_sam_iter():
                                 '\t0x2\tcontig-0\t1\t42\t130M\t=\t315\t433' \
                                 '\tTGATTTGGCAAAAGACAATTCA\t' \
                                 '=?;DDDBFGFFHFGGIIGGIGH{0}'.format(os.linesep)
+
+
+def test_sam_iter_filters():
+    """Test bio_utils' sam_iter with flag, MAPQ, and reference filters"""
+
+    # Store SAM data with unmapped, secondary, and low quality entries
+    sam_data = '@HD{0}' \
+               'read1\t99\tcontig-0\t1\t60\t4M\t=\t9\t12\tACGT\tFFFF{0}' \
+               'read2\t4\t*\t0\t0\t*\t*\t0\t0\tACGT\tFFFF{0}' \
+               'read3\t0x100\tcontig-1\t5\t60\t4M\t*\t0\t0\tACGT\tFFFF{0}' \
+               'read4\t0\tcontig-1\t5\t3\t4M\t*\t0\t0\tACGT\tFFFF{0}' \
+               'read5\t147\tcontig-1\t9\t60\t4M\t=\t1\t-12\tACGT\tFFFF{0}' \
+               'read6\t4\t*\t0\t0\t*\t*\t0\t0\tACGT\tFFFF'.format(os.linesep)
+
+    def names(**kwargs):
+        handle = iter(sam_data.split(os.linesep))
+        return [entry if type(entry) is str else entry.qname
+                for entry in sam_iter(handle, **kwargs)]
+
+    assert names() == ['read1', 'read2', 'read3', 'read4', 'read5', 'read6']
+    assert names(exclude_flags=0x104) == ['read1', 'read4', 'read5']
+    assert names(require_flags=0x3) == ['read1', 'read5']
+    assert names(min_mapq=10) == ['read1', 'read3', 'read5']
+    assert names(references=['contig-1']) == ['read3', 'read4', 'read5']
+    assert names(exclude_flags=0x104, min_mapq=10,
+                 references=['contig-1']) == ['read5']
+    assert names(exclude_flags=0x104, headers=True) == ['@HD', 'read1',
+                                                        'read4', 'read5']
+
+    # Ensure entries that pass are parsed as usual
+    entry = next(sam_iter(iter(sam_data.split(os.linesep)), min_mapq=10,
+                          references=['contig-1']))
+    assert entry.qname == 'read3'
+    assert entry.flag == '0x100'
+    assert entry.pos == 5
+
+
+def test_sam_header():
+    """Test bio_utils' sam_header and SamHeader"""
+
+    sam_data = '@HD\tVN:1.4\tSO:unsorted{0}' \
+               '@SQ\tSN:contig-0\tLN:1500{0}' \
+               '@SQ\tSN:contig-1\tLN:300{0}' \
+               '@RG\tID:lib1\tSM:sample1{0}' \
+               '@PG\tID:bowtie2\tPN:bowtie2\tVN:2.3.0{0}' \
+               '@CO\tMapped for testing{0}' \
+               'read1\t0\tcontig-1\t1\t60\t4M\t*\t0\t0\tACGT\tFFFF{0}' \
+               'read2\t0\tcontig-0\t5\t60\t4M\t*\t0\t0\tACGT\tFFFF' \
+               .format(os.linesep)
+
+    sam_handle = iter(sam_data.split(os.linesep))
+    header, first_line = sam_header(sam_handle)
+
+    assert header.version == '1.4'
+    assert header.sort_order == 'unsorted'
+    assert list(header.references.items()) == [('contig-0', 1500),
+                                               ('contig-1', 300)]
+    assert header.reference_ids == {'contig-0': 0, 'contig-1': 1}
+    assert header.reference_names == ['contig-0', 'contig-1']
+    assert header.read_groups['lib1']['SM'] == 'sample1'
+    assert header.programs['bowtie2']['VN'] == '2.3.0'
+    assert header.comments == ['Mapped for testing']
+    assert len(header.lines) == 6
+
+    # Ensure iteration continues from the first entry
+    entries = list(sam_iter(sam_handle, start_line=first_line))
+    assert [entry.qname for entry in entries] == ['read1', 'read2']
+    assert header.reference_ids[entries[0].rname] == 1
+
+    # Ensure changes to the sort order are written
+    header.sort_order = 'coordinate'
+    assert header.write().split(os.linesep)[:2] == \
+        ['@HD\tVN:1.4\tSO:coordinate', '@SQ\tSN:contig-0\tLN:1500']
+
+    # Files without headers or entries
+    header, first_line = sam_header(iter(sam_data.split(os.linesep)[6:]))
+    assert header.references == {}
+    assert header.write() == ''
+    assert first_line.startswith('read1')
+
+    header, first_line = sam_header(iter(sam_data.split(os.linesep)[:2]))
+    assert header.references == {'contig-0': 1500}
+    assert first_line is None
@@ -0,0 +1,101 @@
+#! /usr/bin/env python3
+
+"""Test bio_utils' sam_stats
+
+Copyright:
+
+    test_sam_stats.py test bio_utils' sam_stats
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from ..sam_tools import sam_stats
+import os
+import tempfile
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.0.0'
+
+
+def test_sam_stats():
+    """Test bio_utils' sam_stats on a file and a file handle"""
+
+    sam_data = '@HD\tVN:1.6{0}' \
+               '@SQ\tSN:contig-0\tLN:1500{0}' \
+               '@SQ\tSN:contig-1\tLN:300{0}' \
+               'read1\t99\tcontig-0\t1\t60\t4M\t=\t9\t12\tACGT\tFFFF{0}' \
+               'read1\t147\tcontig-0\t9\t60\t4M\t=\t1\t-12\tACGT\tFFFF{0}' \
+               'read2\t65\tcontig-0\t5\t3\t4M\tcontig-1\t5\t0\tACGT\tFFFF{0}' \
+               'read2\t129\tcontig-1\t5\t60\t4M\tcontig-0\t5\t0\tACGT\t' \
+               'FFFF{0}' \
+               'read3\t73\tcontig-1\t20\t60\t4M\t=\t20\t0\tACGT\tFFFF{0}' \
+               'read3\t133\tcontig-1\t20\t0\t*\t=\t20\t0\tACGT\tFFFF{0}' \
+               'read4\t0x100\tcontig-1\t50\t1\t4M\t*\t0\t0\tACGT\tFFFF{0}' \
+               'read5\t516\t*\t0\t0\t*\t*\t0\t0\tACGT\tFFFF{0}' \
+               .format(os.linesep)
+
+    fd, path = tempfile.mkstemp(suffix='.sam')
+    with os.fdopen(fd, 'w') as handle:
+        handle.write(sam_data)
+
+    try:
+        stats = sam_stats(path)
+        counts = stats.flagstat()
+
+        assert counts['in total'] == [7, 1]
+        assert counts['primary'] == [6, 1]
+        assert counts['secondary'] == [1, 0]
+        assert counts['mapped'] == [6, 0]
+        assert counts['paired in sequencing'] == [6, 0]
+        assert counts['read1'] == [3, 0]
+        assert counts['read2'] == [3, 0]
+        assert counts['properly paired'] == [2, 0]
+        assert counts['with itself and mate mapped'] == [4, 0]
+        assert counts['singletons'] == [1, 0]
+        assert counts['with mate mapped to a different chr'] == [2, 0]
+        assert counts['with mate mapped to a different chr (mapQ>=5)'] == \
+            [1, 0]
+
+        assert stats.mapq[60] == 4
+        assert stats.insert_sizes[12] == 1
+        assert stats.insert_sizes.sum() == 1
+        assert stats.mapped == {'contig-0': 3, 'contig-1': 3}
+        assert stats.unmapped == {'contig-1': 1, '*': 1}
+
+        assert stats.write_flagstat().split(os.linesep)[6] == \
+            '6 + 0 mapped (85.71% : 0.00%)'
+        assert stats.write_idxstats() == 'contig-0\t1500\t3\t0{0}' \
+                                         'contig-1\t300\t3\t1{0}' \
+                                         '*\t0\t0\t1{0}'.format(os.linesep)
+        assert stats.write_histogram(stats.insert_sizes) == \
+            '12\t1{0}'.format(os.linesep)
+
+        # Split file between processes and ranges
+        parallel = sam_stats(path, threads=3)
+        assert (parallel.flags == stats.flags).all()
+        assert (parallel.mapq == stats.mapq).all()
+        assert parallel.flagstat() == counts
+        assert parallel.write_idxstats() == stats.write_idxstats()
+
+        # Count a file handle in a single process
+        with open(path) as handle:
+            assert sam_stats(handle).flagstat() == counts
+
+    finally:
+        os.remove(path)
@@ -0,0 +1,114 @@
+#! /usr/bin/env python3
+
+"""Test bio_utils' sort_sam
+
+Copyright:
+
+    test_sort_sam.py test bio_utils' sort_sam
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from ..sam_tools import sort_sam
+import os
+import tempfile
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.1.0'
+
+
+def test_sort_sam():
+    """Test bio_utils' sort_sam in memory, with runs, and with processes"""
+
+    # Store SAM data out of order, contig-1 precedes contig-0 in header
+    sam_data = '@HD\tVN:1.6\tSO:unsorted{0}' \
+               '@SQ\tSN:contig-1\tLN:500{0}' \
+               '@SQ\tSN:contig-0\tLN:500{0}' \
+               'read3\t0\tcontig-0\t50\t42\t10M\t*\t0\t0\tACGTACGTAC\t' \
+               'FFFFFFFFFF{0}' \
+               'read1\t4\t*\t0\t0\t*\t*\t0\t0\tACGTACGTAC\tFFFFFFFFFF{0}' \
+               'read2\t128\tcontig-1\t300\t42\t10M\t=\t7\t0\tACGTACGTAC\t' \
+               'FFFFFFFFFF{0}' \
+               'read2\t64\tcontig-1\t7\t42\t10M\t=\t300\t0\tACGTACGTAC\t' \
+               'FFFFFFFFFF{0}' \
+               'read0\t0\tcontig-0\t2\t42\t10M\t*\t0\t0\tACGTACGTAC\t' \
+               'FFFFFFFFFF\tNM:i:1\tMD:Z:5A4'.format(os.linesep)
+
+    def sort_names(**kwargs):
+        handle = iter(sam_data.split(os.linesep))
+        entries = list(sort_sam(handle, **kwargs))
+        return entries[:3], [(entry.qname, entry.pos) for entry in
+                             entries[3:]]
+
+    coordinate_order = [('read2', 7), ('read2', 300), ('read0', 2),
+                        ('read3', 50), ('read1', 0)]
+    queryname_order = [('read0', 2), ('read1', 0), ('read2', 7),
+                       ('read2', 300), ('read3', 50)]
+
+    # Sort in memory
+    headers, names = sort_names()
+    assert headers[0] == '@HD\tVN:1.6\tSO:coordinate'
+    assert headers[1] == '@SQ\tSN:contig-1\tLN:500'
+    assert names == coordinate_order
+
+    headers, names = sort_names(order='queryname')
+    assert headers[0] == '@HD\tVN:1.6\tSO:queryname'
+    assert names == queryname_order
+
+    # Spill every entry to its own run and ensure runs are removed
+    tmp_dir = tempfile.mkdtemp()
+    headers, names = sort_names(max_memory=1, tmp_dir=tmp_dir)
+    assert names == coordinate_order
+    headers, names = sort_names(order='queryname', max_memory=1,
+                                tmp_dir=tmp_dir)
+    assert names == queryname_order
+    assert os.listdir(tmp_dir) == []
+
+    # Sort runs in worker processes
+    headers, names = sort_names(max_memory=400, threads=2, tmp_dir=tmp_dir)
+    assert names == coordinate_order
+    assert os.listdir(tmp_dir) == []
+    os.rmdir(tmp_dir)
+
+    # Ensure entries are written back unchanged
+    entries = list(sort_sam(iter(sam_data.split(os.linesep))))
+    assert entries[3].write() == 'read2\t64\tcontig-1\t7\t42\t10M\t=\t300' \
+                                 '\t0\tACGTACGTAC\tFFFFFFFFFF' \
+                                 '{0}'.format(os.linesep)
+
+    # Optional fields survive runs, including multi-pass merges
+    tmp_dir = tempfile.mkdtemp()
+    for kwargs in ({}, {'max_memory': 1, 'max_open': 2, 'tmp_dir': tmp_dir}):
+        entries = list(sort_sam(iter(sam_data.split(os.linesep)), **kwargs))
+        assert [(entry.qname, entry.pos) for entry in entries[3:]] == \
+            coordinate_order
+        assert entries[5].tags == ['NM:i:1', 'MD:Z:5A4']
+        assert entries[5].write() == 'read0\t0\tcontig-0\t2\t42\t10M\t*\t' \
+                                     '0\t0\tACGTACGTAC\tFFFFFFFFFF\tNM:i:1\t' \
+                                     'MD:Z:5A4{0}'.format(os.linesep)
+        assert os.listdir(tmp_dir) == []
+
+    # Closing the generator early removes runs
+    sorter = sort_sam(iter(sam_data.split(os.linesep)), max_memory=1,
+                      tmp_dir=tmp_dir)
+    next(sorter)
+    assert os.listdir(tmp_dir) != []
+    sorter.close()
+    assert os.listdir(tmp_dir) == []
+    os.rmdir(tmp_dir)
@@ -0,0 +1,68 @@
+#! /usr/bin/env python3
+
+"""Test bio_utils' subject_coverage
+
+Copyright:
+
+    test_subject_coverage.py test bio_utils' subject_coverage
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from ..blast_tools import read_length_table
+from ..blast_tools import subject_coverage
+from ..iterators import B6Reader
+from io import StringIO
+import os
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.0.0'
+
+
+def test_subject_coverage():
+    """Test bio_utils' subject_coverage with reversed and clipped hits"""
+
+    hits = [('query1', 'gene1', 1, 5), ('query2', 'gene1', 8, 3),
+            ('query3', 'gene1', 9, 12), ('query4', 'gene3', 1, 4)]
+    b6_data = '# BLASTN' + os.linesep + \
+        os.linesep.join('{0}\t{1}\t90.0\t100\t1\t0\t1\t100\t{2}\t{3}\t'
+                        '1e-5\t50'.format(*hit) for hit in hits)
+    fai_data = 'gene1\t10\t7\t60\t61{0}gene2\t4\t25\t60\t61{0}' \
+        .format(os.linesep)
+
+    lengths = read_length_table(StringIO(fai_data))
+    assert lengths == {'gene1': 10, 'gene2': 4}
+
+    profiles = subject_coverage(B6Reader(StringIO(b6_data)).iterate(),
+                                lengths)
+
+    # query2 is on the minus strand, query3 is clipped, gene3 is ignored
+    assert list(profiles.keys()) == ['gene1', 'gene2']
+    depth = profiles['gene1'].depth
+    assert depth.tolist() == [1, 1, 2, 2, 2, 1, 1, 1, 1, 1]
+    assert profiles['gene1'].mean() == 1.3
+    assert profiles['gene1'].breadth() == 1.0
+    assert profiles['gene1'].evenness() == 1.0
+    assert profiles['gene2'].depth.tolist() == [0, 0, 0, 0]
+    assert profiles['gene2'].evenness() == 0.0
+
+    # Uneven depth lowers evenness
+    profiles = subject_coverage(B6Reader(StringIO(b6_data)).iterate(),
+                                {'gene1': 20})
+    assert profiles['gene1'].evenness() == 0.6
@@ -0,0 +1,91 @@
+#! /usr/bin/env python3
+
+"""Test bio_utils' tabix_index and GFF3Reader region queries
+
+Copyright:
+
+    test_tabix.py test bio_utils' tabix_index and GFF3Reader regions
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from ..file_tools import BgzfReader
+from ..file_tools import BgzfWriter
+from ..file_tools import read_tabix_index
+from ..file_tools import tabix_index
+from ..iterators import GFF3Reader
+import os
+import pytest
+import tempfile
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.0.0'
+
+
+def test_tabix():
+    """Test bio_utils' tabix_index and GFF3Reader region queries"""
+
+    # Store sorted GFF3 features, including long features, on three contigs
+    features = []
+    for seqid in ('contig1', 'contig2', 'contig7'):
+        for i in range(3000):
+            start = i * 97 + 1
+            end = start + (200000 if i % 500 == 0 else i % 300)
+            features.append((seqid, start, end))
+    gff3_lines = ['##gff-version 3'] + \
+                 ['{0}\ttest\tgene\t{1}\t{2}\t.\t+\t.\tID=gene{3}'
+                  .format(seqid, start, end, i)
+                  for i, (seqid, start, end) in enumerate(features)] + \
+                 ['##FASTA', '>contig1', 'ACGT']
+
+    tmp_dir = tempfile.mkdtemp()
+    path = os.path.join(tmp_dir, 'test.gff3.gz')
+    with BgzfWriter(path) as writer:
+        writer.write(os.linesep.join(gff3_lines) + os.linesep)
+
+    # Index is written in tabix format and read back unchanged
+    index = tabix_index(path, path + '.tbi', stop='##FASTA')
+    assert index.names == ['contig1', 'contig2', 'contig7']
+    read_index = read_tabix_index(path + '.tbi')
+    assert read_index.names == index.names
+    assert read_index.linear == index.linear
+    assert [dict(bins) for bins in read_index.bins] == \
+           [dict(bins) for bins in index.bins]
+
+    # Region queries match a scan of all features
+    reader = GFF3Reader(BgzfReader(path))
+    for region in (('contig7', 10000, 20000), ('contig1', 1, 1),
+                   ('contig2', 150000, 150000), ('contig2', 290000, 500000),
+                   ('contig3', 1, 1000)):
+        found = [(entry.seqid, entry.start, entry.end)
+                 for entry in reader.iterate(region=region)]
+        assert found == [feature for feature in features
+                         if feature[0] == region[0] and
+                         feature[1] <= region[2] and feature[2] >= region[1]]
+    reader.handle.close()
+
+    # Unsorted files cannot be indexed
+    with BgzfWriter(path) as writer:
+        writer.write(os.linesep.join(gff3_lines[2:0:-1]) + os.linesep)
+    with pytest.raises(ValueError):
+        tabix_index(path)
+
+    os.remove(path)
+    os.remove(path + '.tbi')
+    os.rmdir(tmp_dir)
@@ -0,0 +1,87 @@
+#! /usr/bin/env python3
+
+"""Test bio_utils' top_n_hits
+
+Copyright:
+
+    test_top_n_hits.py test bio_utils' top_n_hits
+    Copyright (C) 2015  William Brazelton, Alex Hyer
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from ..blast_tools import top_n_hits
+from ..iterators import B6Reader
+from io import StringIO
+import os
+import pytest
+
+__author__ = 'Alex Hyer'
+__email__ = 'theonehyer@gmail.com'
+__license__ = 'GPLv3'
+__maintainer__ = 'Alex Hyer'
+__status__ = 'Production'
+__version__ = '1.1.0'
+
+
+def test_top_n_hits():
+    """Test bio_utils' top_n_hits in memory and with partition files"""
+
+    hits = [('query1', 'subject1', '50'), ('query2', 'subject1', '30'),
+            ('query1', 'subject2', '70'), ('query1', 'subject3', '50'),
+            ('query2', 'subject2', '80'), ('query1', 'subject4', '60'),
+            ('query3', 'subject1', '10')]
+    b6_data = os.linesep.join('{0}\t{1}\t90.0\t100\t1\t0\t1\t100\t1\t100\t'
+                              '1e-5\t{2}'.format(*hit) for hit in hits)
+
+    def top(**kwargs):
+        reader = B6Reader(StringIO(b6_data))
+        return [(entry.query, entry.subject) for entry in
+                top_n_hits(reader.iterate(), **kwargs)]
+
+    expected = [('query1', 'subject2'), ('query1', 'subject4'),
+                ('query1', 'subject1'), ('query2', 'subject2'),
+                ('query2', 'subject1'), ('query3', 'subject1')]
+    assert top(n=3) == expected
+    assert top(n=1) == [('query1', 'subject2'), ('query2', 'subject2'),
+                        ('query3', 'subject1')]
+
+    # Partitions reduce to the same alignments grouped by partition
+    spilled = top(n=3, max_entries=2, partitions=2)
+    assert sorted(spilled) == sorted(expected)
+    for query in ('query1', 'query2', 'query3'):
+        assert [hit for hit in spilled if hit[0] == query] == \
+            [hit for hit in expected if hit[0] == query]
+
+    assert list(top_n_hits([])) == []
+
+    # Spilled alignments are parsed again with their custom columns
+    header = ['qaccver', 'saccver', 'bitscore', 'qframe']
+    lines = ['query{0}\tsubject{1}\t{2}\t-1'.format(i % 3, i, i % 5 * 10.0)
+             for i in range(9)]
+    entries = B6Reader(StringIO(os.linesep.join(lines))).iterate(
+        header=header)
+    spilled = sorted(entry.write() for entry in
+                     top_n_hits(entries, n=2, max_entries=3, partitions=2))
+    entries = B6Reader(StringIO(os.linesep.join(lines))).iterate(
+        header=header)
+    assert spilled == sorted(entry.write() for entry in
+                             top_n_hits(entries, n=2))
+
+    # Invalid n and scores missing from entries
+    with pytest.raises(ValueError):
+        list(top_n_hits(B6Reader(StringIO(b6_data)).iterate(), n=0))
+    with pytest.raises(ValueError):
+        list(top_n_hits(B6Reader(StringIO(b6_data)).iterate(),
+                        score='qcovs'))
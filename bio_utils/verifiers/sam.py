@@ -39,7 +39,7 @@ __email__ = 'theonehyer@gmail.com'
 __license__ = 'GPLv3'
 __maintainer__ = 'Alex Hyer'
 __status__ = 'Production'
-__version__ = '2.0.0'
+__version__ = '2.0.1'
 
 
 def sam_verifier(entries, line=None):
@@ -85,7 +85,7 @@ def sam_verifier(entries, line=None):
 
     for entry in entries:
         try:
-            entry_verifier([entry.write()], regex, delimiter)
+            entry_verifier([entry.write(tags=False)], regex, delimiter)
         except FormatError as error:
             # Format info on what entry error came from
             if line:
@@ -45,9 +45,13 @@ setup(name='bio_utils',
       license='GPLv3',
       packages=['bio_utils',
                 'bio_utils.blast_tools',
+                'bio_utils.file_tools',
+                'bio_utils.gff3_tools',
                 'bio_utils.iterators',
+                'bio_utils.sam_tools',
                 'bio_utils.verifiers'
                 ],
+      install_requires=['numpy'],
       include_package_data=True,
       zip_safe=False,
       entry_points={
@@ -58,11 +62,18 @@ setup(name='bio_utils',
               'gff3_verifier = bio_utils.verifiers.gff3:main',
               'b6_verifier = bio_utils.verifiers.b6:main',
               'sam_verifier = bio_utils.verifiers.sam:main',
+              'b6_index = bio_utils.blast_tools.b6_index:main',
               'filter_b6_evalue = bio_utils.blast_tools.filter_b6_evalue:main',
+              'merge_b6 = bio_utils.blast_tools.merge_b6:main',
+              'reciprocal_best_hits = bio_utils.blast_tools.'
+                  'reciprocal_best_hits:main',
               'retrieve_query_sequences = bio_utils.blast_tools.'
                   'retrieve_query_sequences:main',
               'retrieve_subject_sequences = bio_utils.blast_tools.'
                   'retrieve_subject_sequences:main',
+              'count_features = bio_utils.sam_tools.count_features:main',
+              'sam_stats = bio_utils.sam_tools.sam_stats:main',
+              'sort_sam = bio_utils.sam_tools.sort_sam:main',
           ]
       }
       )